@@ -9,147 +9,54 @@
 # =============================================================================
 
 
-import sys
-import numpy as np
-from PySide6.QtCore import QTimer, Slot
-from PySide6.QtGui import QScreen
-from PySide6.QtWidgets import (QApplication, QMainWindow)
-from core.tracker import Tracker
-from core.ui.main import UI
-from core.threads import RemoteVideoThread, SocketThread, StatusThread
-
-
-class MainWindow(QMainWindow):
-
-    def __init__(self):
-        """App main window"""
-        super().__init__()
-        self.tracker = Tracker(self)
-        self.timer = None
-
-        # setup UI
-        self.ui = UI(self)
-        self.ui.setup()
-
-        # load model
-        self.tracker.controller.internals.toggle_model(self.tracker.model_name)
-
-        # init app
-        self.setup()
-
-        self.setWindowTitle('SERVO CAM v{} | build {} | servocam.org'.format(self.tracker.version, self.tracker.build))
-
-        # create remote video capture thread
-        self.video_thread = RemoteVideoThread(self)
-        self.video_thread.handle_video_signal.connect(self.handle_video)
-        self.video_thread.started_signal.connect(lambda: self.tracker.debug.log('[THREAD: VIDEO] Started'))
-        self.video_thread.finished_signal.connect(lambda: self.tracker.debug.log('[THREAD: VIDEO] Exited'))
-        self.video_thread.start()
-
-        # create socket connection thread
-        self.socket_thread = SocketThread(self)
-        self.socket_thread.handle_socket_signal.connect(self.handle_socket)
-        self.socket_thread.started_signal.connect(lambda: self.tracker.debug.log('[THREAD: SOCKET] Started'))
-        self.socket_thread.finished_signal.connect(lambda: self.tracker.debug.log('[THREAD: SOCKET] Exited'))
-        self.socket_thread.start()
-
-        # create serial listen thread
-        self.status_thread = StatusThread(self)
-        self.status_thread.handle_status_signal.connect(self.handle_status)
-        self.status_thread.started_signal.connect(lambda: self.tracker.debug.log('[THREAD: STATUS] Started'))
-        self.status_thread.finished_signal.connect(lambda: self.tracker.debug.log('[THREAD: STATUS] Exited'))
-        self.status_thread.start()
-
-        # show info about encryption
-        if self.tracker.encrypt.enabled_data:
-            self.tracker.debug.log("[AES ENCRYPTION] Data encryption is enabled")
-        if self.tracker.encrypt.enabled_video:
-            self.tracker.debug.log("[AES ENCRYPTION] Video stream encryption is enabled")
+import time
 
-    def setup(self):
-        """Setup app"""
-        self.tracker.controller.init(self.tracker.source)  # init tracker with default source
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update)
-        self.timer.start(self.tracker.fps)
+STARTED_AT = time.time()  # process start, for startup timeline
 
-    def update(self):
-        """On frame update"""
-        self.tracker.update()
-
-    @Slot(np.ndarray)
-    def handle_video(self, frame):
-        """
-        Handle remote video thread signal
-
-        :param frame: video frame
-        """
-        self.tracker.render.handle_thread(frame)  # handle remote video
-
-    @Slot(str, str)
-    def handle_socket(self, buff, ip):
-        """
-        Handle socket thread signal
-
-        :param buff: received data
-        :param ip: ip address
-        """
-        self.tracker.sockets.handle_thread(buff, ip)  # handle socket
-
-    @Slot(str)
-    def handle_status(self, buff):
-        """
-        Handle status thread signal
-
-        :param buff: received data
-        """
-        self.tracker.status.handle_thread(buff)  # handle status
-
-    def keyPressEvent(self, event):
-        """
-        Handle key press event
-
-        :param event: key event
-        """
-        super(MainWindow, self).keyPressEvent(event)
-        self.tracker.keyboard.on_key_press(event)
+import argparse
+import sys
 
-    def keyReleaseEvent(self, event):
-        """
-        Handle key release event
 
-        :param event: key event
-        """
-        super(MainWindow, self).keyReleaseEvent(event)
-        self.tracker.keyboard.on_key_release(event)
+def parse_args():
+    """
+    Parse console arguments
 
-    # on close event
-    def closeEvent(self, event):
-        """
-        Handle close event
+    :return: parsed arguments
+    """
+    parser = argparse.ArgumentParser(description='Servo Cam server')
+    parser.add_argument('--headless', action='store_true', help='run tracker engine without UI (no Qt)')
+    parser.add_argument('--source', choices=['cam', 'video', 'stream', 'remote'], help='video source')
+    parser.add_argument('--url', help='source address: camera idx, video file, stream URL or remote host')
+    parser.add_argument('--model', help='model name, eg. movenet_multipose')
+    parser.add_argument('--record', metavar='DIR', help='record frames, objects and servo commands to directory')
+    parser.add_argument('--replay', metavar='DIR', help='replay recording headless and print benchmark report')
+    parser.add_argument('--realtime', action='store_true', help='replay with original frame pacing')
+    parser.add_argument('--benchmark', metavar='NAME', help='run benchmark headless and exit: geometry, backends, tensorflow, encrypt')
+    parser.add_argument('--profile', metavar='FILE', help='export stage latency stats to JSON file on exit (headless)')
+    return parser.parse_args()
 
-        :param event: close event
-        """
-        self.tracker.debug.log("Closing...")
-        if self.video_thread is not None:
-            self.tracker.debug.log("Waiting for video thread to exit...")
-            self.video_thread.exiting = True
 
-        if self.socket_thread is not None:
-            self.tracker.debug.log("Waiting for socket thread to exit...")
-            self.socket_thread.exiting = True
+if __name__ == '__main__':
+    args = parse_args()
 
-        if self.status_thread is not None:
-            self.tracker.debug.log("Waiting for status thread to exit...")
-            self.status_thread.exiting = True
+    import core.profiler
+    core.profiler.STARTED_AT = STARTED_AT  # measure startup timeline from process start
 
-        self.tracker.debug.log("Exiting...")
-        event.accept()  # let the window close
+    # headless mode, PySide6 is never imported
+    if args.headless or args.replay is not None or args.benchmark is not None:
+        from core.tracker import Tracker
+        tracker = Tracker(None, True)
+        tracker.exec_console(vars(args))
+        sys.exit(0)
 
+    from PySide6.QtGui import QScreen
+    from PySide6.QtWidgets import QApplication
+    from core.window import MainWindow
 
-if __name__ == '__main__':
     app = QApplication(sys.argv)
     main_win = MainWindow()
+    if args.record is not None:
+        main_win.tracker.recorder.start(args.record)
     available_geometry = main_win.screen().availableGeometry()
     center = QScreen.availableGeometry(QApplication.primaryScreen()).center() / 2
     topLeftPoint = QScreen.availableGeometry(QApplication.primaryScreen()).topLeft()
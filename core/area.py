@@ -8,6 +8,11 @@
 # Updated At: 2023.03.27 02:00
 # =============================================================================
 
+import numpy as np
+
+from core.geometry import in_boxes
+
+
 class Area:
     def __init__(self, tracker=None):
         """
@@ -116,6 +121,26 @@ class Area:
 
         return self.tracker.keypoints.check_bounding(coords, box)
 
+    def in_area_mask(self, centers, mode):
+        """
+        Check if coords are in area (vectorized)
+
+        :param centers: N x 2 coords to check
+        :param mode: area name
+        :return: boolean mask
+        """
+        if mode not in self.enabled:
+            return np.ones(len(centers), dtype=bool)
+
+        x, y, w, h = self.areas[mode][0], self.areas[mode][1], self.areas[mode][2], self.areas[mode][3]
+
+        # if NOT world position
+        if mode not in self.world or not self.world[mode]:
+            x -= self.tracker.dx
+            y -= self.tracker.dy
+
+        return in_boxes(centers, [x, y, w, h])[:, 0]
+
     def render(self):
         """Render areas boxes on screen"""
         for mode in self.ids:
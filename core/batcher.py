@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import cv2
+
+from core.detections import Detections
+
+
+class Batcher:
+    # box color on montage tiles (BGR)
+    COLOR = (0, 255, 0)
+
+    def __init__(self, tracker=None):
+        """
+        Batched inference of all remote clients
+
+        On every prediction the latest not yet processed frame of every active remote client is stacked
+        with current (selected client) frame into one batched model call, detections are scattered back
+        to per-client objects. Selected client objects go to tracker as before.
+
+        :param tracker: tracker object
+        """
+        self.tracker = tracker
+        self.enabled = False
+        self.objects = {}  # ip: Detections of client latest frame
+        self.last = {}  # ip: last processed client frame
+        self.size = 0  # last batch size
+        self.counter = 0  # batched calls
+
+    def reset(self):
+        """Reset per-client objects (on model or source switch)"""
+        self.objects = {}
+        self.last = {}
+        self.size = 0
+
+    def is_active(self, wrapper):
+        """
+        Check if batching applies to current prediction
+
+        :param wrapper: model wrapper
+        :return: True if batching
+        """
+        return self.enabled and self.tracker.source == self.tracker.SOURCE_REMOTE \
+            and hasattr(wrapper, 'predict_batch')
+
+    def get_input_size(self, wrapper):
+        """
+        Get model input size of batched frames
+
+        :param wrapper: model wrapper
+        :return: (width, height), (0, 0) if unknown, None if not batching
+        """
+        if not self.is_active(wrapper):
+            return None
+        letterbox = getattr(wrapper, 'letterbox', None)
+        if letterbox is None:
+            return 0, 0
+        return letterbox.width, letterbox.height
+
+    def collect(self):
+        """
+        Collect latest new frame of every other active client
+
+        :return: (ips, RGB frames)
+        """
+        ips = []
+        frames = []
+        for ip, frame in list(self.tracker.remote.frames.items()):
+            if ip == self.tracker.remote_ip or frame is None or self.last.get(ip) is frame:
+                continue
+            self.last[ip] = frame
+            ips.append(ip)
+            frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+        # forget disconnected clients
+        for ip in list(self.objects.keys()):
+            if ip not in self.tracker.remote.frames:
+                self.objects.pop(ip, None)
+                self.last.pop(ip, None)
+        return ips, frames
+
+    def predict(self, wrapper, frame):
+        """
+        Predict on current frame, batched with other clients frames if enabled
+
+        :param wrapper: model wrapper
+        :param frame: current (selected client) RGB frame
+        :return: Detections of current frame
+        """
+        if not self.is_active(wrapper):
+            return wrapper.predict(frame)
+
+        ips, frames = self.collect()
+        results = wrapper.predict_batch([frame] + frames)
+        for i, ip in enumerate(ips):
+            self.objects[ip] = results[i + 1]
+        if self.tracker.remote_ip is not None:
+            self.objects[self.tracker.remote_ip] = results[0]
+        self.size = len(results)
+        self.counter += 1
+        return results[0]
+
+    def draw(self, img, ip):
+        """
+        Draw client detections on montage tile (in place)
+
+        :param img: BGR tile
+        :param ip: client IP address
+        """
+        objects = self.objects.get(ip)
+        if not self.enabled or not isinstance(objects, Detections) or len(objects) == 0:
+            return
+        h, w = img.shape[:2]
+        for x, y, bw, bh in objects.boxes.tolist():
+            cv2.rectangle(img, (int(x * w), int(y * h)), (int((x + bw) * w), int((y + bh) * h)), self.COLOR, 1)
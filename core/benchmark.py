@@ -0,0 +1,356 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import math
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from core import geometry
+from core.utils import get_rss
+
+
+class Benchmark:
+    # object counts used in micro-benchmarks
+    SIZES = [1, 10, 100]
+    REPEAT = 200
+
+    # model inference runs per backend
+    RUNS = 50
+
+    # frame size used for end-to-end (preprocess + inference) measurements
+    FRAME_SIZE = (640, 480)
+
+    # message sizes used in encryption benchmark (bytes): data command, JPEG 640x480, 1280x720, 1920x1080
+    MESSAGE_SIZES = [100, 30000, 80000, 200000]
+
+    def __init__(self, tracker=None):
+        """
+        Micro-benchmarks runner
+
+        :param tracker: tracker object
+        """
+        self.tracker = tracker
+        self.benchmarks = {
+            'geometry': self.run_geometry,
+            'backends': self.run_backends,
+            'tensorflow': self.run_tensorflow,
+            'encrypt': self.run_encrypt,
+        }
+
+    def run(self, name):
+        """
+        Run benchmark by name
+
+        :param name: benchmark name
+        :return: report (dict)
+        """
+        if name not in self.benchmarks:
+            self.tracker.debug.log("[BENCHMARK] Unknown benchmark: {}, available: {}".format(
+                name, ", ".join(self.benchmarks.keys())))
+            return None
+        return self.benchmarks[name]()
+
+    def measure(self, func, repeat=None):
+        """
+        Measure mean call time
+
+        :param func: callable
+        :param repeat: number of calls
+        :return: mean time (ms)
+        """
+        if repeat is None:
+            repeat = self.REPEAT
+        func()  # warm-up
+        start = time.perf_counter()
+        for i in range(repeat):
+            func()
+        return (time.perf_counter() - start) / repeat * 1000
+
+    def run_geometry(self):
+        """
+        Compare scalar (per object loops) and vectorized geometry at 1, 10 and 100 objects
+
+        :return: report (dict)
+        """
+        rng = np.random.default_rng(0)
+        report = {}
+        for n in self.SIZES:
+            xy = rng.random((n, 2)) * 0.8
+            boxes = np.concatenate([xy, rng.random((n, 2)) * 0.2], axis=1)
+            centers = geometry.centers(boxes)
+            keypoints = rng.random((n, 17, 3))
+            point = [0.5, 0.5]
+
+            boxes_list = boxes.tolist()
+            centers_list = centers.tolist()
+            keypoints_list = keypoints.tolist()
+
+            cases = {
+                'point_in_boxes': (
+                    lambda: [scalar_in_box(point, box) for box in boxes_list],
+                    lambda: geometry.in_boxes(point, boxes),
+                ),
+                'center_scores': (
+                    lambda: {i: scalar_distance(point, c) for i, c in enumerate(centers_list)},
+                    lambda: geometry.distances(point, centers),
+                ),
+                'distance_matrix': (
+                    lambda: [[scalar_distance(a, b) for b in centers_list] for a in centers_list],
+                    lambda: geometry.distances(centers, centers),
+                ),
+                'iou_matrix': (
+                    lambda: [[scalar_iou(a, b) for b in boxes_list] for a in boxes_list],
+                    lambda: geometry.iou(boxes, boxes),
+                ),
+                'box_from_keypoints': (
+                    lambda: [scalar_bounding(k) for k in keypoints_list],
+                    lambda: geometry.boxes_from_keypoints(keypoints),
+                ),
+                'nearest': (
+                    lambda: min(range(n), key=lambda i: scalar_distance(point, centers_list[i])),
+                    lambda: geometry.nearest(point, centers),
+                ),
+            }
+            for case, (scalar, vectorized) in cases.items():
+                t_scalar = self.measure(scalar)
+                t_vectorized = self.measure(vectorized)
+                report.setdefault(case, {})[n] = {
+                    'scalar': round(t_scalar, 4),
+                    'vectorized': round(t_vectorized, 4),
+                    'speedup': round(t_scalar / t_vectorized, 2) if t_vectorized > 0 else 0,
+                }
+
+        self.tracker.debug.log("[BENCHMARK] geometry, mean time per call (ms): scalar / vectorized (speedup)")
+        for case in report:
+            self.tracker.debug.log("[BENCHMARK] {}: {}".format(case, ", ".join(
+                "n={}: {scalar} / {vectorized} (x{speedup})".format(n, **report[case][n]) for n in report[case])))
+        return report
+
+    def run_backends(self):
+        """
+        Compare latency and memory of Movenet backends on bundled models
+
+        Backends are measured in one process (ONNX and TFLite first, TensorFlow last),
+        so memory is resident size growth after model load and inference.
+
+        :return: report (dict)
+        """
+        from wrapper.backends import BACKENDS, BACKEND_TENSORFLOW, get_backend
+        from wrapper.config import movenet as config
+
+        threads = self.tracker.models.threads
+        order = [name for name in BACKENDS if name != BACKEND_TENSORFLOW] + [BACKEND_TENSORFLOW]
+        rng = np.random.default_rng(0)
+        report = {}
+        for model_name in config['detector']:
+            dims = config['detector'][model_name]['dims']
+            image = rng.integers(0, 256, (1, dims[1], dims[0], 3), dtype=np.int32)
+            for name in order:
+                if not BACKENDS[name].is_available(model_name):
+                    self.tracker.debug.log("[BENCHMARK] {} / {}: not available, skipping".format(model_name, name))
+                    continue
+                backend = get_backend(name, threads)
+                rss = get_rss()
+                start = time.perf_counter()
+                backend.load(model_name)
+                load_time = time.perf_counter() - start
+                backend.run(image)  # warm-up
+
+                times = []
+                for i in range(self.RUNS):
+                    start = time.perf_counter()
+                    backend.run(image)
+                    times.append(time.perf_counter() - start)
+                times = np.array(times) * 1000  # ms
+                memory = get_rss()
+                backend.unload()
+
+                report.setdefault(model_name, {})[name] = {
+                    'load': round(load_time, 3),
+                    'mean': round(float(times.mean()), 3),
+                    'p50': round(float(np.percentile(times, 50)), 3),
+                    'p95': round(float(np.percentile(times, 95)), 3),
+                    'memory': round(memory - rss, 1) if rss is not None else None,
+                }
+                self.tracker.debug.log("[BENCHMARK] {} / {}: load {load}s, mean {mean} ms, p50 {p50} ms, "
+                                       "p95 {p95} ms, memory +{memory} MB".format(model_name, name,
+                                                                                  **report[model_name][name]))
+        return report
+
+    def run_encrypt(self):
+        """
+        Compare legacy (AES-CFB + base64) and binary (AES-GCM) encryption wire modes at typical message sizes
+
+        :return: report (dict)
+        """
+        from core.encrypt import Encrypt
+
+        encrypt = Encrypt(self.tracker)
+        encrypt.raw_key = 'benchmark-key'
+        encrypt.wire = Encrypt.WIRE_GCM
+        encrypt.modes['gcm'] = Encrypt.WIRE_GCM
+        rng = np.random.default_rng(0)
+        report = {}
+        for size in self.MESSAGE_SIZES:
+            raw = rng.integers(0, 256, size, dtype=np.uint8).tobytes()
+            repeat = max(10, min(self.REPEAT, 2000000 // size))
+            for mode, ip in ((Encrypt.WIRE_CFB, None), (Encrypt.WIRE_GCM, 'gcm')):
+                enc = encrypt.encrypt(raw, True, ip)
+                assert bytes(encrypt.decrypt(enc, True, ip)) == raw
+                t_encrypt = self.measure(lambda: encrypt.encrypt(raw, True, ip), repeat)
+                t_decrypt = self.measure(lambda: encrypt.decrypt(enc, True, ip), repeat)
+                report.setdefault(size, {})[mode] = {
+                    'encrypt': round(t_encrypt, 4),
+                    'decrypt': round(t_decrypt, 4),
+                    'throughput': round(size / 1000 / t_decrypt, 1) if t_decrypt > 0 else 0,  # MB/s
+                    'wire': len(enc),
+                }
+
+        self.tracker.debug.log("[BENCHMARK] encrypt, mean time per message (ms): encrypt / decrypt, "
+                               "decrypt throughput (MB/s), wire size (bytes)")
+        for size in report:
+            self.tracker.debug.log("[BENCHMARK] {} B: {}".format(size, ", ".join(
+                "{}: {encrypt} / {decrypt}, {throughput} MB/s, {wire} B".format(mode, **report[size][mode])
+                for mode in report[size])))
+        return report
+
+    def run_tensorflow(self):
+        """
+        Compare TensorFlow compile modes and thread pools configs on current (or lightning) Movenet model
+
+        TensorFlow thread pools can be set only once per process, so every config is measured
+        in fresh spawned process. Time is letterbox preprocessing + inference on 640x480 frame.
+
+        :return: report (dict)
+        """
+        from wrapper.backends import COMPILE_OFF, COMPILE_FUNCTION, COMPILE_XLA, TensorflowBackend
+        from wrapper.config import movenet as config
+
+        model_name = self.tracker.model_name
+        if model_name not in config['detector']:
+            model_name = 'movenet_single_pose_lightning_4'
+        if not TensorflowBackend.is_available(model_name):
+            self.tracker.debug.log("[BENCHMARK] {} / tensorflow: not available".format(model_name))
+            return None
+
+        # (intra-op, inter-op, OpenCV) threads
+        cores = os.cpu_count() or 1
+        pools = []
+        for pool in [(0, 0, -1), (cores, 1, 1), (max(1, cores // 2), 1, 1), (1, 1, 0)]:
+            if pool not in pools:
+                pools.append(pool)
+
+        context = multiprocessing.get_context('spawn')
+        report = {}
+        best = None
+        for mode in [COMPILE_OFF, COMPILE_FUNCTION, COMPILE_XLA]:
+            for threads, inter_threads, cv_threads in pools:
+                key = "{} / threads={} inter_threads={} cv_threads={}".format(mode, threads, inter_threads,
+                                                                               cv_threads)
+                with context.Pool(1) as pool:
+                    try:
+                        result = pool.apply(measure_tensorflow, (model_name, mode, threads, inter_threads,
+                                                                 cv_threads, self.RUNS, self.FRAME_SIZE))
+                    except Exception as e:
+                        self.tracker.debug.log("[BENCHMARK] {}: error: {}".format(key, e))
+                        continue
+                report[key] = result
+                self.tracker.debug.log("[BENCHMARK] {}: first {first} ms, mean {mean} ms, p95 {p95} ms, "
+                                       "compiled: {compiled}".format(key, **result))
+                if result['compiled'] and (best is None or result['mean'] < report[best[0]]['mean']):
+                    best = (key, mode, threads, inter_threads, cv_threads)
+
+        if best is not None:
+            key, mode, threads, inter_threads, cv_threads = best
+            self.tracker.debug.log("[BENCHMARK] Best for {}: {} ({} ms)".format(model_name, key, report[key]['mean']))
+            self.tracker.debug.log("[BENCHMARK] config.ini: inference.compile = {}, inference.threads = {}, "
+                                   "inference.inter_threads = {}, inference.cv_threads = {}".format(mode, threads, inter_threads, cv_threads))
+        return report
+
+
+def measure_tensorflow(model_name, mode, threads, inter_threads, cv_threads, runs, frame_size):
+    """
+    Measure TensorFlow Movenet config (runs in spawned process)
+
+    :param model_name: model name
+    :param mode: compile mode
+    :param threads: intra-op threads
+    :param inter_threads: inter-op threads
+    :param cv_threads: OpenCV threads
+    :param runs: number of runs
+    :param frame_size: frame size (w, h)
+    :return: times (ms)
+    """
+    import cv2
+    from wrapper.backends import BACKEND_TENSORFLOW, COMPILE_OFF, get_backend
+    from wrapper.config import movenet as config
+    from wrapper.preprocess import Letterbox
+
+    if cv_threads >= 0:
+        cv2.setNumThreads(cv_threads)
+    dims = config['detector'][model_name]['dims']
+    backend = get_backend(BACKEND_TENSORFLOW, threads, inter_threads, mode)
+    backend.load(model_name)
+    backend.compile((1, dims[1], dims[0], 3))
+    letterbox = Letterbox(dims[0], dims[1], np.int32)
+    frame = np.random.default_rng(0).integers(0, 256, (frame_size[1], frame_size[0], 3), dtype=np.uint8)
+
+    # first call includes graph tracing / XLA compilation
+    start = time.perf_counter()
+    backend.run(letterbox.apply(frame)[0])
+    first = time.perf_counter() - start
+
+    times = []
+    for i in range(runs):
+        start = time.perf_counter()
+        backend.run(letterbox.apply(frame)[0])
+        times.append(time.perf_counter() - start)
+    times = np.array(times) * 1000  # ms
+    return {
+        'first': round(first * 1000, 3),
+        'mean': round(float(times.mean()), 3),
+        'p95': round(float(np.percentile(times, 95)), 3),
+        'compiled': mode == COMPILE_OFF or backend.compiled is not None,  # False if fell back to eager
+    }
+
+
+# scalar reference implementations (per object loops, as used before geometry kernel)
+
+def scalar_in_box(coords, box):
+    return box[0] <= coords[0] <= box[0] + box[2] and box[1] <= coords[1] <= box[1] + box[3]
+
+
+def scalar_distance(p1, p2):
+    return math.sqrt(math.pow(p1[0] - p2[0], 2) + math.pow(p1[1] - p2[1], 2))
+
+
+def scalar_iou(a, b):
+    w = min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0])
+    h = min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1])
+    inter = max(w, 0) * max(h, 0)
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union > 0 else 0
+
+
+def scalar_bounding(keypoints):
+    box = [None, None, None, None]
+    for point in keypoints:
+        if box[0] is None or point[0] < box[0]:
+            box[0] = point[0]
+        if box[2] is None or point[0] > box[2]:
+            box[2] = point[0]
+        if box[1] is None or point[1] < box[1]:
+            box[1] = point[1]
+        if box[3] is None or point[1] > box[3]:
+            box[3] = point[1]
+    return [box[0], box[1], box[2] - box[0], box[3] - box[1]]
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import numpy as np
+
+from core.detections import Detections
+from core.geometry import distances, in_boxes, nearest
+
+
+class Candidates:
+    def __init__(self, tracker=None):
+        """
+        Per-frame target candidates index
+
+        Built once per frame (after sorting) and queried by Matcher and Finder:
+        centers, ids, id -> index map, target filter mask, area membership and closest mask.
+
+        :param tracker: tracker object
+        """
+        self.tracker = tracker
+        self.key = None
+        self.count = 0
+        self.centers = np.zeros((0, 2), dtype=np.float32)
+        self.ids = np.zeros(0, dtype=np.int32)
+        self.id_map = {}
+        self.allowed = np.zeros(0, dtype=bool)
+        self.in_target_area = np.zeros(0, dtype=bool)
+        self.in_action_area = np.zeros(0, dtype=bool)
+        self.closest = np.zeros(0, dtype=bool)
+
+    def get(self):
+        """
+        Get index for current frame, rebuild if objects, frame or delta (area masks are shifted by it) changed
+
+        :return: self
+        """
+        key = (id(self.tracker.objects), self.tracker.frame_id, self.tracker.dx, self.tracker.dy)
+        if key != self.key:
+            self.build()
+            self.key = key
+        return self
+
+    def build(self):
+        """Build index from current objects"""
+        objects = self.tracker.objects
+        if objects is None:
+            objects = Detections()
+        elif not isinstance(objects, Detections):
+            objects = Detections.from_list(objects)
+
+        area = self.tracker.area
+        self.count = len(objects)
+        self.centers = objects.centers
+        self.ids = objects.ids
+        self.id_map = {}
+        for idx, id in enumerate(self.ids.tolist()):
+            if id not in self.id_map:
+                self.id_map[id] = idx
+        self.allowed = self.tracker.filter.get_mask(objects, self.tracker.filter.FILTER_TARGET)
+        self.in_target_area = area.in_area_mask(self.centers, area.TYPE_TARGET)
+        self.in_action_area = area.in_area_mask(self.centers, area.TYPE_ACTION)
+
+        # allowed object is closest to itself if no other allowed object (before it) has the same center
+        self.closest = np.zeros(self.count, dtype=bool)
+        allowed = np.flatnonzero(self.allowed)
+        if len(allowed) > 0:
+            points = self.centers[allowed]
+            self.closest[allowed] = allowed[np.argmin(distances(points, points), axis=1)] == allowed
+
+    def get_closest(self, center, mask):
+        """
+        Get index of object closest to point
+
+        :param center: point [x, y]
+        :param mask: candidates mask
+        :return: object index or None
+        """
+        idx, distance = nearest(center, self.centers, mask)
+        return idx
+
+    def in_box(self, box):
+        """
+        Check which centers are in box
+
+        :param box: bounding box [x, y, w, h]
+        :return: boolean mask
+        """
+        if box is None:
+            return np.zeros(self.count, dtype=bool)
+        return in_boxes(self.centers, box)[:, 0]
@@ -167,6 +167,8 @@ class Command:
         if not self.tracker.servo.enable:
             return
 
+        self.tracker.profiler.start(self.tracker.profiler.STAGE_COMMAND)
+
         # remote servo TODO: if self.tracker.source == self.tracker.SOURCE_REMOTE and ...
         if self.tracker.servo.remote is not None:
             self.tracker.sockets.send(self.tracker.servo.remote, command)
@@ -179,6 +181,8 @@ class Command:
         if self.tracker.servo.stream is not None:
             self.tracker.stream.send_command(self.tracker.servo.stream, command)
 
+        self.tracker.profiler.stop(self.tracker.profiler.STAGE_COMMAND)
+
     def reset(self, send=False):
         """
         Reset all values
@@ -8,17 +8,121 @@
 # Updated At: 2023.03.27 02:00
 # =============================================================================
 
+import queue
+import threading
+import time
+
 import cv2
 
 
 class Console:
     def __init__(self, tracker=None):
         """
-        Console handling main class
+        Console (headless) handling main class
+
+        Runs the same capture -> process -> targeting -> command pipeline as the window app,
+        but without Qt: remote video and socket threads are plain Python threads
+        and the frame loop is paced by tracker.fps.
 
         :param tracker: tracker object
         """
         self.tracker = tracker
+        self.exiting = False
+        self.threads = []
+        self.messages = queue.Queue()
+
+    def setup(self, args):
+        """
+        Setup source and model from console arguments
+
+        :param args: console arguments (dict)
+        """
+        model = args.get('model')
+        if model is None:
+            model = self.tracker.model_name
+        self.tracker.switch_model(model)
+
+        self.tracker.remote.load()  # load remote hosts
+        self.tracker.stream.load()  # load streams
+
+        source = args.get('source')
+        if source is None:
+            source = self.tracker.source
+        url = args.get('url')
+
+        if url is not None:
+            if source == self.tracker.SOURCE_LOCAL:
+                self.tracker.camera.idx = int(url)
+            else:
+                self.tracker.switch_addr(source, url)
+
+        self.tracker.switch_source(source)
+
+        if args.get('record') is not None:
+            self.tracker.recorder.start(args['record'])
+
+        # show info about encryption
+        if self.tracker.encrypt.enabled_data:
+            self.tracker.debug.log("[AES ENCRYPTION] Data encryption is enabled")
+        if self.tracker.encrypt.enabled_video:
+            self.tracker.debug.log("[AES ENCRYPTION] Video stream encryption is enabled")
+
+    def start_threads(self):
+        """Start remote video and socket threads"""
+        self.threads = [
+            threading.Thread(target=self.run_video, name='video', daemon=True),
+            threading.Thread(target=self.run_socket, name='socket', daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def run_video(self):
+        """Remote video thread"""
+        self.tracker.debug.log('[THREAD: VIDEO] Started')
+        while not self.exiting:
+            # handle only in remote mode and if remote is active
+            if self.tracker.source != self.tracker.SOURCE_REMOTE or not self.tracker.remote.active:
+                time.sleep(0.01)
+                continue
+
+            self.tracker.handle(self.tracker.SOURCE_REMOTE)  # current client frame is passed through frame ring
+        self.tracker.debug.log('[THREAD: VIDEO] Exited')
+
+    def run_socket(self):
+        """Socket listen thread, messages are handled in main loop"""
+        self.tracker.debug.log('[THREAD: SOCKET] Started')
+        while not self.exiting:
+            # handle only in remote mode
+            if self.tracker.source != self.tracker.SOURCE_REMOTE or self.tracker.remote_ip is None:
+                time.sleep(0.01)
+                continue
+
+            buff = self.tracker.sockets.listen()
+            if buff is not None:
+                self.messages.put((buff.decode('utf-8'), self.tracker.remote_ip))
+        self.tracker.debug.log('[THREAD: SOCKET] Exited')
+
+    def handle_messages(self):
+        """Handle socket messages received from socket thread"""
+        while not self.messages.empty():
+            buff, ip = self.messages.get_nowait()
+            self.tracker.sockets.handle_thread(buff, ip)
+
+    def rewind(self):
+        """
+        Rewind video file at the end
+
+        :return: True if rewound or not a video file, False if video ended
+        """
+        if self.tracker.source != self.tracker.SOURCE_VIDEO or '-' not in self.tracker.capture:
+            return True
+        cap = self.tracker.capture['-']
+        if cap is None or int(cap.get(cv2.CAP_PROP_POS_FRAMES)) < int(cap.get(cv2.CAP_PROP_FRAME_COUNT)):
+            return True
+        if not self.tracker.video.loop:
+            return False
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        return True
 
     def handle(self, args):
         """
@@ -26,11 +130,45 @@ class Console:
 
         :param args: console arguments (dict)
         """
-        while True:
-            frame = self.tracker.render.handle()
-            self.tracker.render.cv_render(frame)
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                break
+        # run benchmark and exit
+        if args.get('benchmark') is not None:
+            self.tracker.benchmark.run(args['benchmark'])
+            return
+
+        # replay recording and exit
+        if args.get('replay') is not None:
+            self.tracker.replay.run(args['replay'], args.get('realtime', False), args.get('model'))
+            return
+
+        self.setup(args)
+        self.start_threads()
+
+        interval = self.tracker.fps / 1000  # tracker.fps is the update interval in ms
+        try:
+            while not self.exiting:
+                start = time.time()
+                self.handle_messages()
+                self.tracker.update()
+                if not self.rewind():
+                    self.tracker.debug.log("[VIDEO] End of video")
+                    break
+
+                self.tracker.debug.logs = []  # already printed to stdout, there is no debug console
+
+                delay = interval - (time.time() - start)
+                if delay > 0:
+                    time.sleep(delay)
+        except KeyboardInterrupt:
+            pass
 
+        print("Closing...")
+        self.exiting = True
+        for thread in self.threads:
+            thread.join(1)
+        self.tracker.remote.ingest.stop()
+        self.tracker.remote.decoder.stop()
+        self.tracker.inference.stop()
+        self.tracker.recorder.stop()
+        if args.get('profile') is not None:
+            self.tracker.profiler.export(args['profile'])
         self.tracker.release()
-        cv2.destroyAllWindows()
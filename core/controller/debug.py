@@ -8,6 +8,11 @@
 # Updated At: 2023.03.27 02:00
 # =============================================================================
 
+import os
+
+from core.utils import trans
+
+
 class Debug:
     def __init__(self, tracker=None):
         """
@@ -33,6 +38,12 @@ class Debug:
         # update menu
         self.update_menu()
 
+    def export_profile(self):
+        """Exports the stage latency stats to JSON file."""
+        path = os.path.join(self.tracker.storage.user_path, 'profile.json')
+        self.tracker.profiler.export(path)
+        self.tracker.window.ui.dialogs.alert(trans('dialog.info.export_profile') + path)
+
     def update_menu(self):
         """Updates the debug menu."""
         for id in self.tracker.debug.ids:
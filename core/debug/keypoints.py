@@ -23,10 +23,9 @@ class Keypoints:
         self.tracker.debug.begin(self.id)
 
         # sorter
-        self.tracker.debug.add(self.id, 'sorter.prev_boxes', str(self.tracker.sorter.prev_boxes))
-        self.tracker.debug.add(self.id, 'sorter.mapping', str(self.tracker.sorter.mapping))
-        self.tracker.debug.add(self.id, 'sorter.prev_mapping', str(self.tracker.sorter.prev_mapping))
-        self.tracker.debug.add(self.id, 'sorter.max_id', str(self.tracker.sorter.max_id))
+        self.tracker.debug.add(self.id, 'sorter.tracks', str(len(self.tracker.sorter.tracks.tracks)))
+        self.tracker.debug.add(self.id, 'sorter.mapping', str(self.tracker.sorter.tracks.mapping))
+        self.tracker.debug.add(self.id, 'sorter.next_id', str(self.tracker.sorter.tracks.next_id))
 
         # predictions
         for i, obj in enumerate(self.tracker.objects):
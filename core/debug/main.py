@@ -29,6 +29,8 @@ class Main:
         self.tracker.debug.add(self.id, 'tracker.remote_status',
                                str(self.tracker.remote_status))
         self.tracker.debug.add(self.id, 'tracker.video_dim', str(self.tracker.video_dim))
+        self.tracker.debug.add(self.id, 'tracker.frame_id', str(self.tracker.frame_id))
+        self.tracker.debug.add(self.id, 'tracker.objects_frame', str(self.tracker.objects_frame))
 
         self.tracker.debug.add(self.id, 'tracker.state', str(self.tracker.state))
         self.tracker.debug.add(self.id, 'tracker.model_name', str(self.tracker.model_name))
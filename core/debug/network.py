@@ -78,14 +78,14 @@ class Network:
             else:
                 self.tracker.debug.add(self.id, 'remote.data[' + str(i) + ']', 'None')
 
-        # montages
-        i = 0
-        for montage in self.tracker.render.montage_frames:
-            if montage is not None:
-                self.tracker.debug.add(self.id, 'render.montage_frames[' + str(i) + ']', str(montage.shape))
-            else:
-                self.tracker.debug.add(self.id, 'render.montage_frames[' + str(i) + ']', 'None')
-            i += 1
+        # montage
+        if self.tracker.montage.canvas is not None:
+            self.tracker.debug.add(self.id, 'montage.canvas', str(self.tracker.montage.canvas.shape))
+        else:
+            self.tracker.debug.add(self.id, 'montage.canvas', 'None')
+        self.tracker.debug.add(self.id, 'montage.grid', str(self.tracker.montage.grid))
+        self.tracker.debug.add(self.id, 'montage.updated', str(self.tracker.montage.updated))
+        self.tracker.debug.add(self.id, 'montage.rendered', str(self.tracker.montage.rendered))
 
         self.tracker.debug.add(self.id, 'remote.last_active_check', str(self.tracker.remote.last_active_check))
         self.tracker.debug.add(self.id, 'remote.send_conn_time', str(self.tracker.remote.send_conn_time))
@@ -94,6 +94,16 @@ class Network:
         self.tracker.debug.add(self.id, 'remote.status', str(self.tracker.remote.status))
         self.tracker.debug.add(self.id, 'remote.is_connecting', str(self.tracker.remote.is_connecting))
 
+        # ingest
+        self.tracker.debug.add(self.id, 'ingest.engine', str(self.tracker.remote.ingest.engine))
+        self.tracker.debug.add(self.id, 'ingest.received', str(self.tracker.remote.ingest.received))
+        self.tracker.debug.add(self.id, 'ingest.dropped', str(self.tracker.remote.ingest.dropped))
+        self.tracker.debug.add(self.id, 'decoder.workers', str(self.tracker.remote.decoder.workers))
+        self.tracker.debug.add(self.id, 'decoder.decoded', str(self.tracker.remote.decoder.decoded))
+        self.tracker.debug.add(self.id, 'decoder.scaled', str(self.tracker.remote.decoder.scaled))
+        self.tracker.debug.add(self.id, 'decoder.skipped', str(self.tracker.remote.decoder.skipped))
+        self.tracker.debug.add(self.id, 'decoder.errors', str(self.tracker.remote.decoder.errors))
+
         # ping
         self.tracker.debug.add(self.id, 'remote.ping_video', str(self.tracker.remote.ping_video))
         self.tracker.debug.add(self.id, 'remote.ping_data', str(self.tracker.remote.ping_data))
@@ -8,7 +8,7 @@
 # Updated At: 2023.03.27 02:00
 # =============================================================================
 
-from tensorflow.config import list_physical_devices
+from core.utils import get_gpus
 
 
 class Performance:
@@ -28,14 +28,42 @@ class Performance:
         # fps
         self.tracker.debug.add(self.id, 'tracker.fps', str(self.tracker.current_fps))
 
+        # stage latency (rolling window)
+        stats = self.tracker.profiler.get_stats()
+        for stage in stats:
+            self.tracker.debug.add(self.id, 'stage.' + stage + ' p50/p95/p99 (ms)',
+                                   "{p50} / {p95} / {p99}".format(**stats[stage]))
+
+        # inference
+        self.tracker.debug.add(self.id, 'inference.enabled', str(self.tracker.inference.enabled))
+        self.tracker.debug.add(self.id, 'inference.fps', str(self.tracker.inference.fps))
+        self.tracker.debug.add(self.id, 'inference.counter', str(self.tracker.inference.counter))
+        self.tracker.debug.add(self.id, 'inference.dropped', str(self.tracker.inference.dropped))
+        self.tracker.debug.add(self.id, 'inference.lag (frames)', str(self.tracker.inference.lag))
+        self.tracker.debug.add(self.id, 'propagator.mode', str(self.tracker.propagator.mode))
+        self.tracker.debug.add(self.id, 'propagator.counter', str(self.tracker.propagator.counter))
+        self.tracker.debug.add(self.id, 'gate.enabled', str(self.tracker.gate.enabled))
+        self.tracker.debug.add(self.id, 'gate.score', str(round(self.tracker.gate.score, 4)))
+        self.tracker.debug.add(self.id, 'gate.skipped', str(self.tracker.gate.skipped))
+        self.tracker.debug.add(self.id, 'batcher.enabled', str(self.tracker.batcher.enabled))
+        self.tracker.debug.add(self.id, 'batcher.size', str(self.tracker.batcher.size))
+        self.tracker.debug.add(self.id, 'batcher.counter', str(self.tracker.batcher.counter))
+
         # display GPU info
-        gpus = list_physical_devices('GPU')
-        if len(gpus) > 0:
-            for gpu in list_physical_devices('GPU'):
+        gpus = get_gpus()
+        if gpus is None:
+            self.tracker.debug.add(self.id, 'GPU/CPU', "TENSORFLOW NOT LOADED")
+        elif len(gpus) > 0:
+            for gpu in gpus:
                 self.tracker.debug.add(self.id, 'GPU/CPU', "[GPU] " + str(gpu.name) + ", Type:" + str(gpu.device_type))
         else:
             self.tracker.debug.add(self.id, 'GPU/CPU', "NO GPU, USING CPU")
 
+        # startup timeline
+        timeline = self.tracker.profiler.get_timeline()
+        for name in timeline:
+            self.tracker.debug.add(self.id, 'startup.' + name + ' (s)', str(timeline[name]))
+
         # ping
         self.tracker.debug.add(self.id, 'remote.ping_video (ms)', str(self.tracker.remote.ping_video))
         self.tracker.debug.add(self.id, 'remote.ping_data (ms)', str(self.tracker.remote.ping_data))
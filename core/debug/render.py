@@ -46,8 +46,7 @@ class Render:
             self.tracker.debug.add(self.id, 'render.frame', '-')
 
         # states
-        self.tracker.debug.add(self.id, 'render.montage_frames',
-                               len(self.tracker.render.montage_frames) if self.tracker.render.montage_frames is not None else 0)
+        self.tracker.debug.add(self.id, 'montage.tiles', len(self.tracker.montage.tiles))
         self.tracker.debug.add(self.id, 'render.tracking', str(self.tracker.render.tracking))
         self.tracker.debug.add(self.id, 'render.targeting', str(self.tracker.render.targeting))
         self.tracker.debug.add(self.id, 'render.bounds', str(self.tracker.render.bounds))
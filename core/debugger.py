@@ -8,9 +8,6 @@
 # Updated At: 2023.03.27 02:00
 # =============================================================================
 
-from tensorflow.config import list_physical_devices
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QTextCursor, QStandardItemModel
 from core.debug.main import Main
 from core.debug.render import Render
 from core.debug.keypoints import Keypoints
@@ -27,6 +24,7 @@ from core.debug.sockets import Sockets
 from core.debug.camera import Camera
 from core.debug.filter import Filter
 from core.debug.performance import Performance
+from core.utils import get_gpus
 
 
 class Debug:
@@ -40,6 +38,7 @@ class Debug:
         """
         self.tracker = tracker
         self.logs = []
+        self.devices_logged = False
 
         # setup workers
         self.workers = {}
@@ -71,15 +70,23 @@ class Debug:
 
         # prepare debug workers data
         for id in self.ids:
-            self.models[id] = self.create_model(self.tracker.window)
+            self.models[id] = None
+            if self.tracker.window is not None:
+                self.models[id] = self.create_model(self.tracker.window)
             self.initialized[id] = False
             self.active[id] = False
             self.idx[id] = 0
 
-        # display GPU info
-        gpus = list_physical_devices('GPU')
+    def log_devices(self):
+        """Display GPU info (only once, after TensorFlow is loaded by model wrapper)"""
+        if self.devices_logged:
+            return
+        gpus = get_gpus()
+        if gpus is None:
+            return
+        self.devices_logged = True
         if len(gpus) > 0:
-            for gpu in list_physical_devices('GPU'):
+            for gpu in gpus:
                 self.log("[GPU] " + gpu.name + ", Type:" + gpu.device_type)
         else:
             self.log("[GPU] NOT DETECTED, USING CPU MODE")
@@ -150,6 +157,8 @@ class Debug:
 
     def append_logs(self):
         """Append logs to console"""
+        from PySide6.QtGui import QTextCursor  # not imported in headless mode
+
         for text in self.logs:
             cur = self.tracker.window.console.textCursor()  # Move cursor to end of text
             cur.movePosition(QTextCursor.End)
@@ -169,6 +178,9 @@ class Debug:
         :param parent: parent widget
         :return: model instance
         """
+        from PySide6.QtCore import Qt  # not imported in headless mode
+        from PySide6.QtGui import QStandardItemModel
+
         model = QStandardItemModel(0, 2, parent)
         model.setHeaderData(self.DBG_KEY, Qt.Horizontal, "Key")
         model.setHeaderData(self.DBG_VALUE, Qt.Horizontal, "Value")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+from concurrent.futures import ThreadPoolExecutor
+
+import simplejpeg
+
+
+class Decoder:
+    def __init__(self, tracker=None):
+        """
+        Remote JPEG frames decoder
+
+        Frames received in one ingest call are decrypted and decoded in parallel on worker pool (decoder
+        releases GIL). Every frame is decoded straight to resolution its consumer needs: full resolution
+        for current client only, other clients are downscaled in DCT domain (N/8 steps) to smallest size
+        not below montage tile and batched model input. Frames not needed by any consumer are not decoded.
+
+        :param tracker: tracker object
+        """
+        self.tracker = tracker
+        self.workers = 2  # worker threads, 0 = decode on ingest thread
+        self.pool = None
+
+        # stats
+        self.decoded = 0
+        self.scaled = 0  # decoded with downscale
+        self.skipped = 0  # not needed, not decoded
+        self.errors = 0
+
+    def start(self):
+        """Start worker pool"""
+        if self.pool is None and self.workers > 0:
+            self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='decoder')
+
+    def stop(self):
+        """Stop worker pool"""
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+        self.pool = None
+
+    def get_size(self, known, ip):
+        """
+        Get min decoded size for client frame
+
+        :param known: sender client IP address or None if unknown host
+        :param ip: current client IP address
+        :return: (min width, min height), (0, 0) = full resolution, None = not needed
+        """
+        if known is None:
+            return None
+        if known == ip:
+            return 0, 0
+
+        w, h = 0, 0
+        if self.tracker.render.montage:
+            w = max(1, self.tracker.montage.width)
+        size = self.tracker.batcher.get_input_size(self.tracker.wrapper)
+        if size is not None:
+            w = max(w, size[0])
+            h = max(h, size[1])
+        if w == 0 and h == 0:
+            return None
+        return w, h
+
+    def decode(self, buffer, size, ip):
+        """
+        Decrypt and decode JPEG buffer
+
+        :param buffer: JPEG buffer (encrypted if video encryption is enabled)
+        :param size: (min width, min height)
+        :param ip: sender client IP address (encryption wire mode)
+        :return: BGR frame or None on error
+        """
+        try:
+            if self.tracker.encrypt.enabled_video:
+                buffer = self.tracker.encrypt.decrypt(buffer, True, ip)
+            return simplejpeg.decode_jpeg(buffer, colorspace='BGR', fastdct=True, fastupsample=True,
+                                          min_width=size[0], min_height=size[1])
+        except ValueError as e:
+            self.errors += 1
+            self.tracker.debug.log("[DECODER] Decode error: {}".format(e))
+            return None
+
+    def decode_all(self, messages, ip):
+        """
+        Decode received messages
+
+        :param messages: list of (data, frame, is_jpeg) from ingest
+        :param ip: current client IP address
+        :return: list of (data, frame), frame is None if not decoded
+        """
+        self.start()
+        results = []
+        jobs = []
+        for data, frame, is_jpeg in messages:
+            if not is_jpeg:
+                results.append([data, frame])
+                continue
+            known = self.tracker.remote.get_ip_by_hostname(data.split('@')[0])
+            size = self.get_size(known, ip)
+            if size is None:
+                self.skipped += 1
+                results.append([data, None])
+                continue
+            if size != (0, 0):
+                self.scaled += 1
+            self.decoded += 1
+            result = [data, None]
+            results.append(result)
+            jobs.append((result, frame, size, known))
+
+        if self.pool is None or len(jobs) < 2:
+            for result, buffer, size, known in jobs:
+                result[1] = self.decode(buffer, size, known)
+        else:
+            futures = [(result, self.pool.submit(self.decode, buffer, size, known))
+                       for result, buffer, size, known in jobs]
+            for result, future in futures:
+                result[1] = future.result()
+        return results
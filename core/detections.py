@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import numpy as np
+
+
+class Detections:
+    # objects idx, same as Tracker.IDX_*
+    IDX_X = 0
+    IDX_Y = 1
+    IDX_SCORE = 2
+    IDX_KEYPOINTS = 3
+    IDX_CLASS = 4
+    IDX_ID = 5
+    IDX_BOX = 6
+    IDX_CENTER = 7
+
+    KEYS = (IDX_SCORE, IDX_KEYPOINTS, IDX_CLASS, IDX_ID, IDX_BOX, IDX_CENTER)
+
+    def __init__(self, boxes=None, scores=None, class_ids=None, keypoints=None, labels=None):
+        """
+        Detected objects container backed by NumPy arrays
+
+        boxes: N x 4 [x, y, w, h] (normalized), centers: N x 2, scores: N, class_ids: N, ids: N,
+        keypoints: N x K x 3 [x, y, score] (K = 0 for models without keypoints)
+        Items are accessible as detections[i][Tracker.IDX_*] for compatibility with dict based objects.
+
+        :param boxes: bounding boxes
+        :param scores: scores
+        :param class_ids: class ids (index in labels)
+        :param keypoints: keypoints
+        :param labels: class labels
+        """
+        self.boxes = np.zeros((0, 4), dtype=np.float32) if boxes is None \
+            else np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        n = len(self.boxes)
+        self.centers = self.boxes[:, :2] + self.boxes[:, 2:] / 2
+        self.scores = np.ones(n, dtype=np.float32) if scores is None \
+            else np.asarray(scores, dtype=np.float32).reshape(n)
+        self.class_ids = np.zeros(n, dtype=np.int32) if class_ids is None \
+            else np.asarray(class_ids, dtype=np.int32).reshape(n)
+        self.keypoints = np.zeros((n, 0, 3), dtype=np.float32) if keypoints is None \
+            else np.asarray(keypoints, dtype=np.float32).reshape(n, -1, 3)
+        self.ids = np.arange(n, dtype=np.int32)
+        self.labels = labels if labels is not None else []
+        self.anchors = {}  # target point name: N x 2 [x, y], computed once per frame by wrapper
+
+    @classmethod
+    def from_list(cls, objects):
+        """
+        Build from list of dict based objects
+
+        :param objects: list of dicts keyed by Tracker.IDX_*
+        :return: Detections
+        """
+        labels = []
+        class_ids = []
+        for obj in objects:
+            label = obj.get(cls.IDX_CLASS)
+            if label not in labels:
+                labels.append(label)
+            class_ids.append(labels.index(label))
+        detections = cls([obj[cls.IDX_BOX] for obj in objects],
+                         [obj.get(cls.IDX_SCORE, 1) for obj in objects], class_ids, None, labels)
+        detections.ids = np.array([obj.get(cls.IDX_ID, i) for i, obj in enumerate(objects)], dtype=np.int32)
+        return detections
+
+    def __len__(self):
+        """
+        Count detected objects
+
+        :return: count
+        """
+        return len(self.boxes)
+
+    def __getitem__(self, idx):
+        """
+        Get single object (compatibility accessor)
+
+        :param idx: object index
+        :return: Detection
+        """
+        if idx < 0:
+            idx += len(self)
+        if idx < 0 or idx >= len(self):
+            raise IndexError('detection index out of range')
+        return Detection(self, idx)
+
+    def __iter__(self):
+        """
+        Iterate over objects (compatibility accessor)
+
+        :return: Detection iterator
+        """
+        for idx in range(len(self)):
+            yield Detection(self, idx)
+
+    def select(self, idx):
+        """
+        Select objects by indices or mask
+
+        :param idx: indices (in given order) or boolean mask
+        :return: new Detections
+        """
+        detections = Detections.__new__(Detections)
+        detections.boxes = self.boxes[idx]
+        detections.centers = self.centers[idx]
+        detections.scores = self.scores[idx]
+        detections.class_ids = self.class_ids[idx]
+        detections.keypoints = self.keypoints[idx]
+        detections.ids = self.ids[idx]
+        detections.labels = self.labels
+        detections.anchors = {name: points[idx] for name, points in self.anchors.items()}
+        return detections
+
+    def get_label(self, idx):
+        """
+        Get class label of object
+
+        :param idx: object index
+        :return: label
+        """
+        class_id = int(self.class_ids[idx])
+        if 0 <= class_id < len(self.labels):
+            return self.labels[class_id]
+
+    def get_anchor(self, name, idx):
+        """
+        Get cached target point of object
+
+        :param name: target point name
+        :param idx: object index
+        :return: point [x, y] or None if not available
+        """
+        if name not in self.anchors or idx >= len(self):
+            return None
+        return self.anchors[name][idx].tolist()
+
+    def to_list(self):
+        """
+        Convert to list of dict based objects
+
+        :return: list of dicts keyed by Tracker.IDX_*
+        """
+        return [obj.to_dict() for obj in self]
+
+
+class Detection:
+    def __init__(self, detections, idx):
+        """
+        Single detected object, thin dict-like view on Detections arrays
+
+        :param detections: Detections
+        :param idx: object index
+        """
+        self.detections = detections
+        self.idx = idx
+
+    def __getitem__(self, key):
+        """
+        Get object value
+
+        :param key: Tracker.IDX_*
+        :return: value
+        """
+        d = self.detections
+        if key == Detections.IDX_BOX:
+            return d.boxes[self.idx].tolist()
+        elif key == Detections.IDX_CENTER:
+            return d.centers[self.idx].tolist()
+        elif key == Detections.IDX_SCORE:
+            return float(d.scores[self.idx])
+        elif key == Detections.IDX_ID:
+            return int(d.ids[self.idx])
+        elif key == Detections.IDX_CLASS:
+            return d.get_label(self.idx)
+        elif key == Detections.IDX_KEYPOINTS:
+            return d.keypoints[self.idx]  # K x 3 view, rows are [x, y, score]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        """
+        Set object value
+
+        :param key: Tracker.IDX_*
+        :param value: value
+        """
+        d = self.detections
+        if key == Detections.IDX_ID:
+            d.ids[self.idx] = value
+        elif key == Detections.IDX_SCORE:
+            d.scores[self.idx] = value
+        elif key == Detections.IDX_BOX:
+            d.boxes[self.idx] = value
+            d.centers[self.idx] = d.boxes[self.idx, :2] + d.boxes[self.idx, 2:] / 2
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        """
+        Check if key exists
+
+        :param key: Tracker.IDX_*
+        :return: True if exists
+        """
+        return key in Detections.KEYS
+
+    def keys(self):
+        """
+        Get keys
+
+        :return: keys
+        """
+        return Detections.KEYS
+
+    def get(self, key, default=None):
+        """
+        Get value or default
+
+        :param key: Tracker.IDX_*
+        :param default: default value
+        :return: value
+        """
+        if key in Detections.KEYS:
+            return self[key]
+        return default
+
+    def to_dict(self):
+        """
+        Convert to dict
+
+        :return: dict keyed by Tracker.IDX_*
+        """
+        obj = {key: self[key] for key in Detections.KEYS}
+        obj[Detections.IDX_KEYPOINTS] = obj[Detections.IDX_KEYPOINTS].tolist()
+        return obj
@@ -15,10 +15,20 @@ from Cryptodome.Random import get_random_bytes
 
 
 class Encrypt:
+    # wire modes
+    WIRE_CFB = 'cfb'  # legacy: AES-CFB, base64 encoded
+    WIRE_GCM = 'gcm'  # binary: AES-GCM, nonce + ciphertext + tag, no base64
+
+    GCM_NONCE_SIZE = 12
+    GCM_TAG_SIZE = 16
+
     def __init__(self, tracker=None):
         """
         Encryption handling main class
 
+        Binary wire mode is offered to client on connect and used only if client confirms it in ACCEPT,
+        connect handshake itself is always in legacy mode.
+
         :param tracker: tracker object
         """
         self.tracker = tracker
@@ -27,6 +37,8 @@ class Encrypt:
         self.raw_key = None
         self.KEY = None
         self.initialized = False
+        self.wire = self.WIRE_GCM  # wire mode offered to clients
+        self.modes = {}  # ip: negotiated wire mode
 
     def init_key(self):
         """Initialize the AES encryption key from the raw key"""
@@ -34,12 +46,44 @@ class Encrypt:
             self.KEY = hashlib.sha256(self.raw_key.encode('utf8')).digest()
             self.raw_key = None
 
-    def encrypt(self, raw, bytes=False):
+    def set_mode(self, ip, mode):
+        """
+        Set wire mode negotiated with client
+
+        :param ip: client IP address
+        :param mode: wire mode confirmed by client, None if not confirmed
+        """
+        if mode is not None and mode == self.wire and mode == self.WIRE_GCM:
+            self.modes[ip] = mode
+        else:
+            self.modes.pop(ip, None)
+        self.tracker.debug.log("[ENCRYPT] Wire mode for {}: {}".format(ip, self.get_mode(ip)))
+
+    def reset_mode(self, ip):
+        """
+        Reset client wire mode to legacy (on disconnect and before new handshake)
+
+        :param ip: client IP address
+        """
+        if self.modes.pop(ip, None) is not None:
+            self.tracker.debug.log("[ENCRYPT] Wire mode for {}: {}".format(ip, self.WIRE_CFB))
+
+    def get_mode(self, ip=None):
+        """
+        Get wire mode of client
+
+        :param ip: client IP address, None for handshake
+        :return: wire mode
+        """
+        return self.modes.get(ip, self.WIRE_CFB)
+
+    def encrypt(self, raw, bytes=False, ip=None):
         """
         Encrypt data with AES
 
         :param raw: data to encrypt (string or bytes)
         :param bytes: if True, encrypt bytes, if False, encrypt string
+        :param ip: client IP address (wire mode), None for handshake
         :return: encrypted data
         """
         # init key
@@ -47,6 +91,12 @@ class Encrypt:
             self.init_key()
             self.initialized = True
 
+        # binary
+        if self.get_mode(ip) == self.WIRE_GCM:
+            if not bytes:
+                raw = raw.encode('utf8')
+            return self.encrypt_gcm(raw)
+
         # str
         if not bytes:
             BS = AES.block_size
@@ -61,12 +111,13 @@ class Encrypt:
             cipher = AES.new(key=self.KEY, mode=AES.MODE_CFB, iv=iv)
             return base64.b64encode(iv + cipher.encrypt(raw))
 
-    def decrypt(self, enc, bytes=False):
+    def decrypt(self, enc, bytes=False, ip=None):
         """
         Decrypt data with AES
 
         :param enc: encrypted data to decrypt (string or bytes)
         :param bytes: if True, decrypt from bytes, if False, decrypt from string
+        :param ip: client IP address (wire mode), None for handshake
         :return: decrypted data
         """
         # init key
@@ -74,6 +125,13 @@ class Encrypt:
             self.init_key()
             self.initialized = True
 
+        # binary
+        if self.get_mode(ip) == self.WIRE_GCM:
+            raw = self.decrypt_gcm(enc)
+            if not bytes:
+                return raw.decode('utf8')
+            return raw
+
         # str
         if not bytes:
             unpad = lambda s: s[:-ord(s[-1:])]
@@ -87,3 +145,29 @@ class Encrypt:
             iv = enc[:AES.block_size]
             cipher = AES.new(self.KEY, AES.MODE_CFB, iv)
             return cipher.decrypt(enc[AES.block_size:])
+
+    def encrypt_gcm(self, raw):
+        """
+        Encrypt bytes with AES-GCM
+
+        :param raw: data to encrypt (bytes-like)
+        :return: nonce + ciphertext + tag
+        """
+        nonce = get_random_bytes(self.GCM_NONCE_SIZE)
+        cipher = AES.new(self.KEY, AES.MODE_GCM, nonce=nonce, mac_len=self.GCM_TAG_SIZE)
+        enc, tag = cipher.encrypt_and_digest(raw)
+        return b''.join((nonce, enc, tag))
+
+    def decrypt_gcm(self, enc):
+        """
+        Decrypt and verify AES-GCM message
+
+        :param enc: nonce + ciphertext + tag (bytes-like)
+        :return: decrypted bytes
+        :raises ValueError: if message is too short or authentication fails
+        """
+        enc = memoryview(enc)
+        if len(enc) < self.GCM_NONCE_SIZE + self.GCM_TAG_SIZE:
+            raise ValueError("Message too short")
+        cipher = AES.new(self.KEY, AES.MODE_GCM, nonce=enc[:self.GCM_NONCE_SIZE], mac_len=self.GCM_TAG_SIZE)
+        return cipher.decrypt_and_verify(enc[self.GCM_NONCE_SIZE:-self.GCM_TAG_SIZE], enc[-self.GCM_TAG_SIZE:])
@@ -8,6 +8,9 @@
 # Updated At: 2023.03.27 02:00
 # =============================================================================
 
+import numpy as np
+
+
 class Filter:
     FILTER_DETECT = 'DETECT'
     FILTER_TARGET = 'TARGET'
@@ -80,6 +83,42 @@ class Filter:
         except ValueError:
             self.filters[mode]['min_score'] = 0.0
 
+    def apply(self, detections, mode):
+        """
+        Filter detected objects (vectorized version of is_allowed)
+
+        :param detections: Detections
+        :param mode: filter mode
+        :return: filtered Detections
+        """
+        mask = self.get_mask(detections, mode)
+        if mask.all():
+            return detections
+        return detections.select(mask)
+
+    def get_mask(self, detections, mode):
+        """
+        Get allowed objects mask (vectorized version of is_allowed)
+
+        :param detections: Detections
+        :param mode: filter mode
+        :return: boolean mask
+        """
+        mask = detections.scores >= self.filters[mode]['min_score']
+
+        if self.filters[mode]['classes'] is not None and len(self.filters[mode]['classes']) > 0:
+            allowed = [i for i, label in enumerate(detections.labels) if label in self.filters[mode]['classes']]
+            mask &= np.isin(detections.class_ids, allowed)
+
+        area = None
+        if mode == self.FILTER_TARGET:
+            area = self.tracker.area.TYPE_TARGET
+        elif mode == self.FILTER_ACTION:
+            area = self.tracker.area.TYPE_ACTION
+        if area is not None and self.tracker.area.is_enabled(area):
+            mask &= self.tracker.area.in_area_mask(detections.centers, area)
+        return mask
+
     def is_allowed(self, obj, mode):
         """
         Check if object is allowed to detect
@@ -8,6 +8,9 @@
 # Updated At: 2023.03.27 02:00
 # =============================================================================
 
+import numpy as np
+
+
 class Finder:
     def __init__(self, tracker=None):
         """
@@ -70,18 +73,10 @@ class Finder:
 
         :return: target index
         """
+        candidates = self.tracker.candidates.get()
         current = self.tracker.targets.center_last
-        next_idx = None
-        idx = 0
-        for obj in self.tracker.objects:
-            if self.tracker.IDX_CENTER in obj:
-                if obj[self.tracker.IDX_CENTER][0] >= current[0] \
-                        and idx != self.tracker.targets.idx:
-                    next_idx = idx
-                    break
-            idx += 1
-
-        return next_idx
+        mask = candidates.centers[:, 0] >= current[0]
+        return self.get_first(mask)
 
     def find_prev(self):
         """
@@ -89,18 +84,10 @@ class Finder:
 
         :return: target index
         """
+        candidates = self.tracker.candidates.get()
         current = self.tracker.targets.center_last
-        prev_idx = None
-        idx = 0
-        for obj in self.tracker.objects:
-            if self.tracker.IDX_CENTER in obj:
-                if obj[self.tracker.IDX_CENTER][0] <= current[0] \
-                        and idx != self.tracker.targets.idx:
-                    prev_idx = idx
-                    break
-            idx += 1
-
-        return prev_idx
+        mask = candidates.centers[:, 0] <= current[0]
+        return self.get_first(mask)
 
     def find_first(self):
         """
@@ -108,17 +95,10 @@ class Finder:
 
         :return: target index
         """
-        min = None
-        tmp_idx = None
-        idx = 0
-        for obj in self.tracker.objects:
-            if self.tracker.IDX_CENTER in obj:
-                if min is None or obj[self.tracker.IDX_CENTER][0] < min:
-                    min = obj[self.tracker.IDX_CENTER][0]
-                    tmp_idx = idx
-            idx += 1
-
-        return tmp_idx
+        candidates = self.tracker.candidates.get()
+        if candidates.count == 0:
+            return None
+        return int(np.argmin(candidates.centers[:, 0]))
 
     def find_last(self):
         """
@@ -126,14 +106,21 @@ class Finder:
 
         :return: target index
         """
-        max = None
-        tmp_idx = None
-        idx = 0
-        for obj in self.tracker.objects:
-            if self.tracker.IDX_CENTER in obj:
-                if max is None or obj[self.tracker.IDX_CENTER][0] > max:
-                    max = obj[self.tracker.IDX_CENTER][0]
-                    tmp_idx = idx
-            idx += 1
-
-        return tmp_idx
+        candidates = self.tracker.candidates.get()
+        if candidates.count == 0:
+            return None
+        return int(np.argmax(candidates.centers[:, 0]))
+
+    def get_first(self, mask):
+        """
+        Get first object index from mask, excluding current target
+
+        :param mask: candidates mask
+        :return: object index
+        """
+        if self.tracker.targets.idx is not None and self.tracker.targets.idx < len(mask):
+            mask[self.tracker.targets.idx] = False
+        matched = np.flatnonzero(mask)
+        if len(matched) == 0:
+            return None
+        return int(matched[0])
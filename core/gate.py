@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import cv2
+import numpy as np
+
+
+class Gate:
+    # motion score is computed on downscaled grayscale frame
+    WIDTH = 160
+    PIXEL_THRESHOLD = 25  # min gray level difference of changed pixel
+
+    def __init__(self, tracker=None):
+        """
+        Motion gate in front of model prediction
+
+        Frame is compared with frame of last prediction, if fraction of changed pixels is below threshold
+        then prediction is skipped and last objects are reused. Prediction is forced every N frames.
+
+        :param tracker: tracker object
+        """
+        self.tracker = tracker
+        self.enabled = False
+        self.threshold = 0.005  # min fraction of changed pixels to predict
+        self.refresh = 30  # force prediction every N frames, 0 = never
+        self.score = 0.0  # last motion score
+        self.skipped = 0  # skipped predictions
+        self.frame_id = 0  # frame id of last prediction
+
+        # downscaled grayscale buffers
+        self.frame_size = None
+        self.size = None
+        self.small = None
+        self.gray = None
+        self.reference = None
+        self.delta = None
+
+    def reset(self):
+        """Reset reference frame (next frame is predicted)"""
+        self.reference = None
+
+    def allocate(self, w, h):
+        """
+        Allocate buffers for frame size
+
+        :param w: frame width
+        :param h: frame height
+        """
+        scale = min(1.0, self.WIDTH / w)
+        self.size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        sw, sh = self.size
+        self.small = np.empty((sh, sw, 3), dtype=np.uint8) if scale < 1 else None
+        self.gray = np.empty((sh, sw), dtype=np.uint8)
+        self.reference = None
+        self.delta = np.empty((sh, sw), dtype=np.uint8)
+        self.frame_size = (w, h)
+
+    def should_predict(self, frame, frame_id):
+        """
+        Check if frame changed enough since last prediction
+
+        :param frame: RGB frame
+        :param frame_id: frame id
+        :return: True if predict
+        """
+        if not self.enabled or frame is None:
+            return True
+
+        h, w = frame.shape[:2]
+        if self.frame_size != (w, h):
+            self.allocate(w, h)
+
+        small = frame
+        if self.small is not None:
+            small = cv2.resize(frame, self.size, dst=self.small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(small, cv2.COLOR_RGB2GRAY, dst=self.gray)
+
+        if self.reference is not None and (self.refresh <= 0 or frame_id - self.frame_id < self.refresh):
+            cv2.absdiff(self.gray, self.reference, dst=self.delta)
+            cv2.threshold(self.delta, self.PIXEL_THRESHOLD, 255, cv2.THRESH_BINARY, dst=self.delta)
+            self.score = cv2.countNonZero(self.delta) / self.delta.size
+            if self.score < self.threshold:
+                self.skipped += 1
+                return False
+
+        # current frame becomes reference
+        if self.reference is None:
+            self.reference = np.empty_like(self.gray)
+        self.gray, self.reference = self.reference, self.gray
+        self.frame_id = frame_id
+        return True
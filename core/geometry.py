@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import numpy as np
+
+# Batched geometry kernel, all coords are normalized floats:
+# points: N x 2 [x, y], boxes: N x 4 [x, y, w, h], keypoints: N x K x 2+ [x, y, (score)]
+
+# max objects count for scalar (plain Python) path, NumPy call overhead is larger below
+SCALAR_MAX = 16
+
+
+def to_points(points):
+    """
+    Convert point or list of points to N x 2 array
+
+    :param points: [x, y] or list of points
+    :return: N x 2 array
+    """
+    return np.asarray(points, dtype=np.float64).reshape(-1, 2)
+
+
+def to_boxes(boxes):
+    """
+    Convert box or list of boxes to N x 4 array
+
+    :param boxes: [x, y, w, h] or list of boxes
+    :return: N x 4 array
+    """
+    return np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+
+
+def centers(boxes):
+    """
+    Get centers of boxes
+
+    :param boxes: N x 4 boxes
+    :return: N x 2 centers
+    """
+    boxes = to_boxes(boxes)
+    return boxes[:, :2] + boxes[:, 2:] / 2
+
+
+def in_boxes(points, boxes):
+    """
+    Check which points are in which boxes (edges included)
+
+    :param points: N x 2 points
+    :param boxes: M x 4 boxes
+    :return: N x M boolean matrix
+    """
+    points = to_points(points)[:, None, :]
+    boxes = to_boxes(boxes)[None, :, :]
+    return (points[..., 0] >= boxes[..., 0]) & (points[..., 0] <= boxes[..., 0] + boxes[..., 2]) \
+        & (points[..., 1] >= boxes[..., 1]) & (points[..., 1] <= boxes[..., 1] + boxes[..., 3])
+
+
+def distances(points_a, points_b):
+    """
+    Pairwise euclidean distances
+
+    :param points_a: N x 2 points
+    :param points_b: M x 2 points
+    :return: N x M distance matrix
+    """
+    diff = to_points(points_a)[:, None, :] - to_points(points_b)[None, :, :]
+    return np.sqrt((diff * diff).sum(axis=2))
+
+
+def iou(boxes_a, boxes_b):
+    """
+    Intersection over union of every pair of boxes
+
+    :param boxes_a: N x 4 [x, y, w, h]
+    :param boxes_b: M x 4 [x, y, w, h]
+    :return: N x M IoU matrix
+    """
+    a = to_boxes(boxes_a)[:, None, :]
+    b = to_boxes(boxes_b)[None, :, :]
+    w = np.minimum(a[..., 0] + a[..., 2], b[..., 0] + b[..., 2]) - np.maximum(a[..., 0], b[..., 0])
+    h = np.minimum(a[..., 1] + a[..., 3], b[..., 1] + b[..., 3]) - np.maximum(a[..., 1], b[..., 1])
+    inter = np.clip(w, 0, None) * np.clip(h, 0, None)
+    union = a[..., 2] * a[..., 3] + b[..., 2] * b[..., 3] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0)
+
+
+def boxes_from_keypoints(keypoints, min_score=None):
+    """
+    Build bounding boxes from keypoints
+
+    :param keypoints: N x K x 2+ keypoints (or K x 2+ for single object)
+    :param min_score: ignore keypoints with lower score (requires score column)
+    :return: N x 4 boxes, zero box for objects without valid keypoints
+    """
+    keypoints = np.asarray(keypoints, dtype=np.float64)
+    if keypoints.ndim == 2:
+        keypoints = keypoints[None]
+    if keypoints.shape[1] == 0:
+        return np.zeros((len(keypoints), 4), dtype=np.float64)
+
+    xy = keypoints[..., :2]
+    if min_score is not None and keypoints.shape[2] > 2:
+        valid = keypoints[..., 2] >= min_score
+    else:
+        valid = np.ones(keypoints.shape[:2], dtype=bool)
+    low = np.where(valid[..., None], xy, np.inf).min(axis=1)
+    high = np.where(valid[..., None], xy, -np.inf).max(axis=1)
+    boxes = np.concatenate([low, high - low], axis=1)
+    boxes[~valid.any(axis=1)] = 0
+    return boxes
+
+
+def box_from_keypoints(keypoints):
+    """
+    Build bounding box of single object (scalar path)
+
+    :param keypoints: K x 2+ keypoints (list)
+    :return: [x, y, w, h], zero box if no keypoints
+    """
+    if len(keypoints) == 0:
+        return [0.0, 0.0, 0.0, 0.0]
+    xs = [point[0] for point in keypoints]
+    ys = [point[1] for point in keypoints]
+    x = min(xs)
+    y = min(ys)
+    return [x, y, max(xs) - x, max(ys) - y]
+
+
+def nearest(point, points, mask=None):
+    """
+    Find nearest point
+
+    :param point: [x, y]
+    :param points: N x 2 points
+    :param mask: consider only points with True in mask
+    :return: (index, distance) or (None, None) if no points
+    """
+    distance = distances(point, points)[0]
+    if mask is not None:
+        distance = np.where(mask, distance, np.inf)
+    if len(distance) == 0 or not np.isfinite(distance).any():
+        return None, None
+    idx = int(np.argmin(distance))
+    return idx, float(distance[idx])
+
+
+def nearest_pairs(points_a, points_b):
+    """
+    Find nearest point in points_b for every point in points_a
+
+    :param points_a: N x 2 points
+    :param points_b: M x 2 points (M > 0)
+    :return: (N indices, N distances)
+    """
+    distance = distances(points_a, points_b)
+    idx = np.argmin(distance, axis=1)
+    return idx, distance[np.arange(len(idx)), idx]
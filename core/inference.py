@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import threading
+import time
+
+
+from core.detections import Detections
+
+
+class Inference:
+    # max time to wait for current prediction on model switch (seconds)
+    IDLE_TIMEOUT = 5
+
+    def __init__(self, tracker=None):
+        """
+        Asynchronous inference worker
+
+        Frames are passed through a "latest frame only" slot, so if the model is slower than the camera
+        then stale frames are dropped and the worker always predicts on the newest one.
+
+        :param tracker: tracker object
+        """
+        self.tracker = tracker
+        self.enabled = False
+        self.exiting = False
+        self.thread = None
+        self.lock = threading.Lock()
+        self.pending = threading.Event()
+        self.idle = threading.Event()
+        self.idle.set()
+
+        # frame slot
+        self.frame = None
+        self.frame_id = 0
+
+        # last completed result: (frame_id, objects)
+        self.result = None
+        self.predicted = []  # frame ids predicted since last pop_predicted(), only when recording
+
+        # stats
+        self.counter = 0
+        self.dropped = 0
+        self.fps = 0
+        self.time = 0
+        self.lag = 0
+
+    def start(self):
+        """Start worker thread"""
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.exiting = False
+        self.thread = threading.Thread(target=self.run, name='inference', daemon=True)
+        self.thread.start()
+        self.tracker.debug.log("[THREAD: INFERENCE] Started")
+
+    def stop(self):
+        """Stop worker thread"""
+        self.exiting = True
+        self.pending.set()  # wake up worker
+        if self.thread is not None:
+            self.thread.join(self.IDLE_TIMEOUT)
+        self.thread = None
+
+    def push(self, frame, frame_id):
+        """
+        Put frame into slot, previous not processed frame is dropped
+
+        :param frame: video frame (must not be modified after handoff)
+        :param frame_id: frame sequence number
+        """
+        if self.thread is None:
+            self.start()
+
+        with self.lock:
+            if self.frame is not None:
+                self.dropped += 1
+            self.frame = frame
+            self.frame_id = frame_id
+        self.pending.set()
+
+    def fetch(self):
+        """
+        Get completed result, every result is returned only once
+
+        :return: (frame_id, objects) or None if no new result
+        """
+        with self.lock:
+            result = self.result
+            self.result = None
+        if result is not None:
+            self.lag = self.frame_id - result[0]
+        return result
+
+    def pop_predicted(self):
+        """
+        Get frame ids predicted since last call, results of some may be replaced before fetch (recorder)
+
+        :return: list of frame ids
+        """
+        with self.lock:
+            predicted = self.predicted
+            self.predicted = []
+        return predicted
+
+    def reset(self):
+        """Drop pending frame and result, wait for current prediction to finish"""
+        with self.lock:
+            self.frame = None
+            self.result = None
+        self.idle.wait(self.IDLE_TIMEOUT)
+
+    def run(self):
+        """Worker loop"""
+        while not self.exiting:
+            if not self.pending.wait(0.1):
+                continue
+
+            with self.lock:
+                self.pending.clear()
+                frame = self.frame
+                frame_id = self.frame_id
+                self.frame = None
+                wrapper = self.tracker.wrapper
+                if frame is None or wrapper is None or self.tracker.disabled:
+                    continue
+                self.idle.clear()
+
+            start = time.time()
+            try:
+                objects = self.tracker.batcher.predict(wrapper, frame)
+            except Exception as e:
+                self.tracker.debug.log("[INFERENCE] Prediction error: {}".format(e))
+                objects = Detections()
+            self.time = time.time() - start
+            self.tracker.profiler.add(self.tracker.profiler.STAGE_PREDICT, self.time)
+            if self.time > 0:
+                self.fps = round(1 / self.time, 1)
+
+            with self.lock:
+                # discard if model was switched during prediction
+                if wrapper is self.tracker.wrapper:
+                    self.result = (frame_id, objects)
+                    self.counter += 1
+                    if self.tracker.recorder.enabled:
+                        self.predicted.append(frame_id)
+                self.idle.set()
+
+        self.tracker.debug.log("[THREAD: INFERENCE] Exited")
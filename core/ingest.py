@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import json
+
+import imagezmq
+import numpy as np
+import zmq
+
+
+class Ingest:
+    # engines
+    ENGINE_HUB = 'hub'  # imagezmq ImageHub (REP), one blocking frame per call
+    ENGINE_ROUTER = 'router'  # ROUTER socket with poller, all clients received without blocking
+
+    # video port (imagezmq default)
+    PORT_VIDEO = 5555
+
+    # router
+    POLL_TIMEOUT = 100  # ms
+    MAX_MESSAGES = 64  # max messages drained per call
+
+    def __init__(self, tracker=None):
+        """
+        Remote video ingest
+
+        Router engine talks to unchanged imagezmq ImageSender (REQ) clients: every frame is answered
+        immediately without blocking, so slow or lost client never stalls other clients.
+        Only latest frame of every client is kept per call.
+
+        :param tracker: tracker object
+        """
+        self.tracker = tracker
+        self.engine = self.ENGINE_ROUTER
+        self.hub = None
+        self.context = None
+        self.socket = None
+        self.poller = None
+
+        # stats
+        self.received = 0
+        self.dropped = 0
+
+    def start(self):
+        """Bind video port"""
+        if self.engine == self.ENGINE_HUB:
+            if self.hub is None:
+                self.hub = imagezmq.ImageHub()
+            return
+
+        if self.socket is not None:
+            return
+        self.context = zmq.Context()
+        self.socket = self.context.socket(zmq.ROUTER)
+        self.socket.setsockopt(zmq.LINGER, 0)  # needed to avoid blocking on exit
+        self.socket.bind("tcp://*:{}".format(self.PORT_VIDEO))
+        self.poller = zmq.Poller()
+        self.poller.register(self.socket, zmq.POLLIN)
+        self.tracker.debug.log("[INGEST] Listening on port {}".format(self.PORT_VIDEO))
+
+    def stop(self):
+        """Close video port"""
+        if self.socket is not None:
+            self.poller.unregister(self.socket)
+            self.socket.close()
+            self.context.term()
+        if self.hub is not None:
+            self.hub.close()
+        self.hub = None
+        self.socket = None
+        self.context = None
+        self.poller = None
+
+    def receive(self):
+        """
+        Receive frames
+
+        :return: list of (data, frame, is_jpeg), data is "hostname@timestamp", frame is image or JPEG buffer
+        """
+        self.start()
+        if self.engine == self.ENGINE_HUB:
+            return self.receive_hub()
+        return self.receive_router()
+
+    def receive_hub(self):
+        """
+        Receive one frame with ImageHub (blocking)
+
+        :return: list of (data, frame, is_jpeg)
+        """
+        jpeg = self.tracker.remote.STREAM_JPEG
+        if jpeg:
+            data, frame = self.hub.recv_jpg()
+        else:
+            data, frame = self.hub.recv_image()
+        self.hub.send_reply(b'OK')
+        self.received += 1
+        return [(data, frame, jpeg)]
+
+    def receive_router(self):
+        """
+        Drain all pending frames from all clients, wait max POLL_TIMEOUT if none
+
+        :return: list of (data, frame, is_jpeg), latest frame of every client
+        """
+        if not self.poller.poll(self.POLL_TIMEOUT):
+            return []
+
+        latest = {}
+        for i in range(self.MAX_MESSAGES):
+            try:
+                parts = self.socket.recv_multipart(zmq.NOBLOCK, copy=False)
+            except zmq.Again:
+                break
+
+            # [identity, empty delimiter, imagezmq metadata (JSON), image or JPEG buffer]
+            identity = parts[0].bytes
+            try:
+                self.socket.send_multipart([identity, b'', b'OK'], zmq.NOBLOCK)  # client may send next frame
+            except zmq.ZMQError:
+                pass  # client gone
+            if len(parts) < 4:
+                continue
+
+            message = self.parse(parts[2].bytes, parts[3].buffer)
+            if message is None:
+                continue
+            hostname = message[0].split('@')[0]
+            if hostname in latest:
+                self.dropped += 1
+            latest[hostname] = message
+            self.received += 1
+        return list(latest.values())
+
+    def parse(self, metadata, buffer):
+        """
+        Parse imagezmq message
+
+        :param metadata: JSON metadata
+        :param buffer: image or JPEG buffer
+        :return: (data, frame, is_jpeg) or None if invalid
+        """
+        try:
+            md = json.loads(metadata)
+        except ValueError:
+            return None
+
+        # send_image() adds dtype and shape, send_jpg() sends only message
+        if 'shape' in md:
+            frame = np.frombuffer(buffer, dtype=md['dtype']).reshape(md['shape'])
+            return md['msg'], frame, False
+        return md['msg'], buffer, True
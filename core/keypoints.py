@@ -10,6 +10,10 @@
 
 import math
 
+import numpy as np
+
+from core import geometry
+
 
 class Keypoints:
     def __init__(self, tracker=None):
@@ -27,24 +31,9 @@ class Keypoints:
         :param keypoints: object keypoints
         :return: bounding box
         """
-        # build bounding box
-        box = [None, None, None, None]
-        for point in keypoints:
-            tmp = point[self.tracker.IDX_X]
-            if box[0] is None or tmp < box[0]:
-                box[0] = tmp
-            if box[2] is None or tmp > box[2]:
-                box[2] = tmp
-
-            tmp = point[self.tracker.IDX_Y]
-            if box[1] is None or tmp < box[1]:
-                box[1] = tmp
-            if box[3] is None or tmp > box[3]:
-                box[3] = tmp
-
-        box[2] = box[2] - box[0]  # make width
-        box[3] = box[3] - box[1]  # make height
-        return box
+        if hasattr(keypoints, 'tolist'):
+            keypoints = keypoints.tolist()
+        return geometry.box_from_keypoints(keypoints)
 
     def build_center_point(self, idx):
         """
@@ -57,10 +46,7 @@ class Keypoints:
             box = self.tracker.objects[idx][self.tracker.IDX_BOX]
         else:
             box = self.build_bounding(self.tracker.objects[idx][self.tracker.IDX_KEYPOINTS])
-        return [
-            box[0] + (box[2] / 2),
-            box[1] + (box[3] / 2)
-        ]
+        return self.build_center(box)
 
     def in_bounding(self, coords, box, idx=None):
         """
@@ -79,6 +65,8 @@ class Keypoints:
             if idx in box:
                 return self.check_bounding(coords, box[idx])
         else:
+            if len(box) > geometry.SCALAR_MAX:
+                return bool(geometry.in_boxes(coords, [box[n] for n in box]).any())
             for n in box:
                 if self.check_bounding(coords, box[n]):
                     return True
@@ -96,13 +84,7 @@ class Keypoints:
         :param box: bounding box
         :return: scores dict
         """
-        scores = {}
-        i = 0
-        for item in box:
-            if self.check_bounding(coords, item):
-                scores[i] = self.get_bounding_score(coords, item)
-            i += 1
-        return scores
+        return self.build_bounding_scores(coords, range(len(box)), box)
 
     def get_bounding_scores_dict(self, coords, box):
         """
@@ -115,12 +97,8 @@ class Keypoints:
         :param box: bounding box
         :return: scores dict
         """
-        scores = {}
-        for i in box:
-            if self.check_bounding(coords, box[i]['box']):
-                scores[i] = self.get_bounding_score(coords, box[i]['box'])
-            i += 1
-        return scores
+        keys = list(box.keys())
+        return self.build_bounding_scores(coords, keys, [box[i]['box'] for i in keys])
 
     def get_center_scores(self, coords, center):
         """
@@ -133,12 +111,29 @@ class Keypoints:
         :param center: center of bounding box
         :return: scores dict
         """
-        scores = {}
-        i = 0
-        for item in center:
-            scores[i] = self.get_center_score(coords, item)
-            i += 1
-        return scores
+        if len(center) <= geometry.SCALAR_MAX:
+            return {i: self.get_center_score(coords, item) for i, item in enumerate(center)}
+        distance = geometry.distances(coords, center)[0]
+        return dict(enumerate(distance.tolist()))
+
+    def build_bounding_scores(self, coords, keys, boxes):
+        """
+        Build scores dict for boxes containing coords
+
+        :param coords: coords of object center
+        :param keys: scores keys (one per box)
+        :param boxes: bounding boxes
+        :return: scores dict
+        """
+        keys = list(keys)
+        if len(keys) == 0:
+            return {}
+        if len(keys) <= geometry.SCALAR_MAX:
+            return {keys[i]: self.get_bounding_score(coords, box) for i, box in enumerate(boxes)
+                    if self.check_bounding(coords, box)}
+        inside = geometry.in_boxes(coords, boxes)[0]
+        distance = geometry.distances(coords, geometry.centers(boxes))[0]
+        return {keys[i]: float(distance[i]) for i in np.flatnonzero(inside)}
 
     def check_bounding(self, coords, box):
         """
@@ -160,12 +155,8 @@ class Keypoints:
         :param box: bounding box
         :return: score
         """
-        middle = [
-            box[0] + (box[2] / 2),
-            box[1] + (box[3] / 2)
-        ]
-        return math.sqrt(
-            math.pow(coords[0] - middle[0], 2) + math.pow(coords[1] - middle[1], 2))  # TODO check if no reverse
+        middle = self.build_center(box)
+        return math.hypot(coords[0] - middle[0], coords[1] - middle[1])
 
     def get_center_score(self, coords, center):
         """
@@ -175,7 +166,7 @@ class Keypoints:
         :param center: center of bounding box
         :return: score
         """
-        return math.sqrt(math.pow(coords[0] - center[0], 2) + math.pow(coords[1] - center[1], 2))
+        return math.hypot(coords[0] - center[0], coords[1] - center[1])
 
     def build_center(self, box):
         """
@@ -196,7 +187,7 @@ class Keypoints:
         :param y2: Y coord of second point
         :return: distance between points
         """
-        return math.sqrt(math.pow(x1 - x2, 2) + math.pow(y1 - y2, 2))
+        return math.hypot(x1 - x2, y1 - y2)
 
     def get_mean_point(self, coords):
         """
@@ -207,12 +198,9 @@ class Keypoints:
         """
         if len(coords) == 0:
             return None
-        x = 0
-        y = 0
-        for coord in coords:
-            x += coord[0]
-            y += coord[1]
-        return [x / len(coords), y / len(coords)]
+        if len(coords) <= geometry.SCALAR_MAX:
+            return [sum(coord[0] for coord in coords) / len(coords), sum(coord[1] for coord in coords) / len(coords)]
+        return geometry.to_points(coords).mean(axis=0).tolist()
 
     def get_coord_distance(self, p1, p2):
         """
@@ -222,4 +210,4 @@ class Keypoints:
         :param p2: coords of point 2
         :return: distance between points
         """
-        return math.sqrt(math.pow(p1[0] - p2[0], 2) + math.pow(p1[1] - p2[1], 2))
+        return math.hypot(p1[0] - p2[0], p1[1] - p2[1])
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class Loader:
+    # warm-up frame size (w, h) if no frame was grabbed yet
+    WARMUP_SIZE = (640, 480)
+
+    def __init__(self, tracker=None):
+        """
+        Background model loader with LRU cache of loaded models
+
+        Model is loaded and warmed up (first prediction traces graph) on background thread,
+        current model keeps running and new one is swapped in on the main thread only when ready.
+
+        :param tracker: tracker object
+        """
+        self.tracker = tracker
+        self.size = 2  # max loaded models kept in memory
+        self.cache = OrderedDict()  # model_name: wrapper
+        self.lock = threading.Lock()
+        self.threads = {}  # model_name: background loading thread
+        self.requested = None  # model requested by last load()
+        self.ready = None  # (model_name, wrapper) waiting for swap
+
+    def load(self, model_name, wait=False):
+        """
+        Load model and swap it in
+
+        :param model_name: model name
+        :param wait: load on current thread (or wait for background load) and swap immediately
+        """
+        with self.lock:
+            self.requested = model_name
+            self.ready = None
+            wrapper = self.cache.get(model_name)
+            thread = self.threads.get(model_name)  # already loading on background
+
+            # load on background thread
+            if not wait and thread is None and model_name in self.tracker.MODELS and wrapper is None:
+                thread = threading.Thread(target=self.run, args=(model_name,), name='loader', daemon=True)
+                self.threads[model_name] = thread
+                thread.start()
+                self.tracker.debug.log("[MODEL] Loading in background: {}".format(model_name))
+                return
+
+        # no model or already loaded
+        if model_name not in self.tracker.MODELS or wrapper is not None:
+            self.swap(model_name, wrapper)
+            return
+
+        if thread is not None:
+            if wait:
+                thread.join()
+                self.update()  # swap if loaded
+            return
+
+        wrapper = self.prepare(model_name)
+        if wrapper is not None:
+            self.swap(model_name, wrapper)
+
+    def run(self, model_name):
+        """
+        Load model on background thread
+
+        :param model_name: model name
+        """
+        wrapper = self.prepare(model_name)
+        with self.lock:
+            self.threads.pop(model_name, None)
+            if wrapper is None:
+                return
+            if self.requested == model_name:
+                self.ready = (model_name, wrapper)
+            else:
+                self.add(model_name, wrapper)  # switched to another model meanwhile, keep for later
+
+    def prepare(self, model_name):
+        """
+        Create wrapper, load model and run warm-up prediction
+
+        :param model_name: model name
+        :return: wrapper or None on error
+        """
+        try:
+            wrapper = self.tracker.get_wrapper(self.tracker.MODELS[model_name])
+            wrapper.prepare(model_name)
+        except Exception as e:
+            self.tracker.debug.log("[MODEL] Load error: {}, {}".format(model_name, e))
+            return None
+
+        try:
+            self.warmup(wrapper)
+        except Exception as e:
+            self.tracker.debug.log("[MODEL] Warm-up error: {}, {}".format(model_name, e))
+        return wrapper
+
+    def warmup(self, wrapper):
+        """
+        Run prediction on dummy frame, so first real prediction is not slowed by graph tracing
+
+        :param wrapper: wrapper
+        """
+        w, h = self.tracker.render.size  # last grabbed frame of any source
+        if w <= 0 or h <= 0:
+            if self.tracker.source == self.tracker.SOURCE_LOCAL:
+                w, h = self.tracker.camera.width, self.tracker.camera.height
+            if w is None or h is None or w <= 0 or h <= 0:
+                w, h = self.WARMUP_SIZE
+        wrapper.predict(np.zeros((h, w, 3), dtype=np.uint8))
+        if hasattr(wrapper, 'reset'):
+            wrapper.reset()
+
+    def update(self):
+        """Swap in loaded model (handle every frame on main thread)"""
+        with self.lock:
+            ready = self.ready
+            self.ready = None
+        if ready is not None:
+            self.swap(*ready)
+
+    def swap(self, model_name, wrapper):
+        """
+        Swap current model
+
+        :param model_name: model name
+        :param wrapper: loaded wrapper or None
+        """
+        self.tracker.inference.reset()  # wait for current async prediction
+        self.tracker.sorter.reset()
+        self.tracker.propagator.reset()
+        self.tracker.batcher.reset()
+        self.tracker.gate.reset()
+        self.tracker.objects = []
+        self.tracker.wrapper = wrapper
+        self.tracker.model_name = model_name
+        if wrapper is not None:
+            if hasattr(wrapper, 'reset'):
+                wrapper.reset()
+            with self.lock:
+                self.add(model_name, wrapper)
+            self.tracker.debug.log_devices()
+        self.tracker.profiler.mark(self.tracker.profiler.STARTUP_MODEL)
+        self.tracker.controller.internals.update_model()
+        self.tracker.debug.log("[MODEL] SWITCHED TO: " + str(model_name))
+
+    def add(self, model_name, wrapper):
+        """
+        Add model to cache, least recently used models over size are unloaded
+
+        :param model_name: model name
+        :param wrapper: wrapper
+        """
+        self.cache[model_name] = wrapper
+        self.cache.move_to_end(model_name)
+        while len(self.cache) > max(1, self.size):
+            # never unload current model
+            name = next((name for name in self.cache if self.cache[name] is not self.tracker.wrapper), None)
+            if name is None:
+                break
+            self.cache.pop(name).unload()
+            self.tracker.debug.log("[MODEL] Unloaded from cache: {}".format(name))
+
+    def clear(self):
+        """Unload all cached models except current"""
+        with self.lock:
+            for name in list(self.cache.keys()):
+                if self.cache[name] is not self.tracker.wrapper:
+                    self.cache.pop(name).unload()
@@ -8,6 +8,9 @@
 # Updated At: 2023.03.27 02:00
 # =============================================================================
 
+import numpy as np
+
+
 class Matcher:
     def __init__(self, tracker=None):
         """
@@ -27,30 +30,24 @@ class Matcher:
         :param check_bounds: check if object is in bounding box
         :return: object index
         """
-        tmp_idx = None
-        n = 0
         if self.tracker.objects is None:
-            return tmp_idx
-
-        for obj in self.tracker.objects:
-            # check score and rest of filters (min score is defined in filter)
-            if not self.tracker.filter.is_allowed(obj, self.tracker.filter.FILTER_TARGET):
-                n += 1
-                continue
-
-            if self.tracker.IDX_CENTER not in obj:
-                n += 1
-                continue
+            return None
 
-            if idx is None or (idx is not None and n == idx):
-                if self.tracker.IDX_ID in obj and (
-                        identifier is None or obj[self.tracker.IDX_ID] == identifier):
-                    if (not check_bounds or self.tracker.keypoints.in_bounding(
-                            obj[self.tracker.IDX_CENTER], bounding)) and self.is_closest(n):
-                        tmp_idx = n
-                        break
-            n += 1
-        return tmp_idx
+        candidates = self.tracker.candidates.get()
+        mask = candidates.allowed & candidates.closest
+        if idx is not None:
+            if idx >= candidates.count:
+                return None
+            mask = mask & (np.arange(candidates.count) == idx)
+        if identifier is not None:
+            mask = mask & (candidates.ids == identifier)
+        if check_bounds:
+            mask = mask & candidates.in_box(bounding)
+
+        matched = np.flatnonzero(mask)
+        if len(matched) == 0:
+            return None
+        return int(matched[0])
 
     def match_closest(self, center=None, identifier=None):
         """
@@ -60,44 +57,14 @@ class Matcher:
         :param identifier: match closest object with this identifier
         :return: object index
         """
-        if center is None:
-            return None
-
-        tmp_idx = None
-        if self.tracker.objects is None:
-            return tmp_idx
-
-        centers = []
-        n = 0
-        for obj in self.tracker.objects:
-
-            # check score and rest of filters (min score is defined in filter)
-            if not self.tracker.filter.is_allowed(obj, self.tracker.filter.FILTER_TARGET):
-                n += 1
-                continue
-
-            if self.tracker.IDX_CENTER not in obj:
-                n += 1
-                continue
-
-            if identifier is not None:
-                if self.tracker.IDX_ID in obj \
-                        and obj[self.tracker.IDX_ID] != identifier:
-                    n += 1
-                    continue
-            centers.insert(n, obj[self.tracker.IDX_CENTER])
-            n += 1
-
-        if len(centers) == 0:
+        if center is None or self.tracker.objects is None:
             return None
 
-        scores = self.tracker.keypoints.get_center_scores(center, centers)
-        idx = self.find_best_score(scores)
-        if idx is not None:
-            if idx < len(self.tracker.objects):
-                tmp_idx = idx
-
-        return tmp_idx
+        candidates = self.tracker.candidates.get()
+        mask = candidates.allowed
+        if identifier is not None:
+            mask = mask & (candidates.ids == identifier)
+        return candidates.get_closest(center, mask)
 
     def is_closest(self, idx):
         """
@@ -109,34 +76,10 @@ class Matcher:
         if self.tracker.objects is None:
             return True
 
-        centers = []
-        current = None
-        n = 0
-        for obj in self.tracker.objects:
-            if self.tracker.IDX_CENTER not in obj:
-                n += 1
-                continue
-
-            # check score and rest of filters (min score is defined in filter)
-            if not self.tracker.filter.is_allowed(obj, self.tracker.filter.FILTER_TARGET):
-                n += 1
-                continue
-
-            if n == idx:
-                current = obj[self.tracker.IDX_CENTER]
-
-            centers.insert(n, obj[self.tracker.IDX_CENTER])
-            n += 1
-
-        if len(centers) == 0:
+        candidates = self.tracker.candidates.get()
+        if idx is None or idx >= candidates.count:
             return False
-
-        scores = self.tracker.keypoints.get_center_scores(current, centers)
-        best_idx = self.find_best_score(scores)
-        if best_idx is not None and best_idx == idx:
-            return True
-
-        return False
+        return bool(candidates.closest[idx])
 
     def find_best_score(self, scores):
         """
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import cv2
+
+
+class Models:
+    def __init__(self, tracker=None):
+        """
+        Model wrappers config
+
+        Filled by Storage from config, applied by wrappers on prepare (wrappers are created lazily by loader).
+
+        :param tracker: tracker object
+        """
+        self.tracker = tracker
+        self.backend = 'tensorflow'  # model backend: tensorflow, tflite, onnx
+        self.threads = 0  # CPU threads used by backend, 0 = default
+        self.inter_threads = 0  # TensorFlow inter-op threads, 0 = default
+        self.cv_threads = -1  # OpenCV threads, -1 = default, 0 = single thread
+        self.compile = 'off'  # TensorFlow graph: off, function (fixed-shape tf.function), xla (with XLA JIT)
+        self.crop = True  # single pose models: infer on region around previous pose
+        self.movement_engine = 'avg'  # movement detector background subtraction: avg, mog2, knn
+        self.movement_width = 400  # movement detector working width, 0 = frame width
+        self.movement_min_area = 0.001  # movement detector min contour area (fraction of frame)
+        self.movement_merge = 0.02  # movement detector merge distance (fraction of frame width)
+        self.movement_egomotion = 'off'  # movement detector camera movement compensation: off, servo, phase
+
+    def configure(self):
+        """Apply OpenCV thread pool config (TensorFlow pools are applied on first model load)"""
+        if self.cv_threads >= 0:
+            cv2.setNumThreads(self.cv_threads)
+            self.tracker.debug.log("[MODEL] OpenCV threads: {}".format(self.cv_threads))
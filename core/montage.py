@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import math
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class Montage:
+    # hostname label on tile (BGR)
+    LABEL_COLOR = (0, 0, 255)
+
+    def __init__(self, tracker=None):
+        """
+        Incremental tiled montage of remote clients
+
+        Montage is kept on persistent RGB canvas, every client owns one tile which is updated in place
+        (resize + label + color conversion of this tile only) when client frame arrives. Canvas is pushed
+        to display not more often than every `interval` ms, independently of frames ingest.
+
+        :param tracker: tracker object
+        """
+        self.tracker = tracker
+        self.columns = 2
+        self.rows = 2  # min rows, grid grows when more clients than tiles
+        self.width = 400  # tile width
+        self.interval = 100  # min ms between display refreshes, 0 = every frame
+        self.lock = threading.Lock()
+
+        self.canvas = None  # RGB canvas
+        self.tile = None  # BGR tile buffer
+        self.tile_size = None  # (w, h)
+        self.grid = (0, 0)  # allocated (columns, rows)
+        self.tiles = {}  # ip: tile index
+        self.dirty = False
+        self.last_render = 0
+
+        # stats
+        self.updated = 0  # tile updates
+        self.rendered = 0  # display refreshes
+
+    def reset(self):
+        """Drop canvas and tiles (on grid config change)"""
+        with self.lock:
+            self.canvas = None
+            self.tile = None
+            self.tile_size = None
+            self.grid = (0, 0)
+            self.tiles = {}
+            self.dirty = False
+
+    def allocate(self, columns, rows):
+        """
+        Allocate canvas for grid, already drawn tiles are kept
+
+        :param columns: grid columns
+        :param rows: grid rows
+        """
+        tw, th = self.tile_size
+        canvas = np.zeros((rows * th, columns * tw, 3), dtype=np.uint8)
+        if self.canvas is not None and self.grid[0] == columns:
+            h = min(self.canvas.shape[0], canvas.shape[0])
+            canvas[:h] = self.canvas[:h]
+        self.canvas = canvas
+        self.grid = (columns, rows)
+        self.dirty = True
+
+    def get_index(self, ip):
+        """
+        Get client tile index, new client gets first free tile
+
+        :param ip: client IP address
+        :return: tile index
+        """
+        if ip in self.tiles:
+            return self.tiles[ip]
+        used = set(self.tiles.values())
+        idx = 0
+        while idx in used:
+            idx += 1
+        self.tiles[ip] = idx
+        return idx
+
+    def update(self, ip, hostname, frame):
+        """
+        Update client tile with new frame (video thread)
+
+        :param ip: client IP address
+        :param hostname: client hostname (tile label)
+        :param frame: BGR frame
+        """
+        if frame is None:
+            return
+        columns = max(1, self.columns)
+        with self.lock:
+            if self.tile_size is None:
+                h, w = frame.shape[:2]
+                tw = max(1, self.width)
+                self.tile_size = (tw, max(1, int(h * tw / w)))
+                self.tile = np.empty((self.tile_size[1], tw, 3), dtype=np.uint8)
+
+            idx = self.get_index(ip)
+            rows = max(self.rows, math.ceil((max(self.tiles.values()) + 1) / columns))
+            if self.canvas is None or self.grid != (columns, rows):
+                self.allocate(columns, rows)
+
+            tw, th = self.tile_size
+            cv2.resize(frame, self.tile_size, dst=self.tile, interpolation=cv2.INTER_AREA)
+            self.tracker.batcher.draw(self.tile, ip)  # client detections
+            cv2.putText(self.tile, hostname, (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.5, self.LABEL_COLOR, 2)
+
+            # convert to RGB directly into canvas tile
+            x = (idx % columns) * tw
+            y = (idx // columns) * th
+            cv2.cvtColor(self.tile, cv2.COLOR_BGR2RGB, dst=self.canvas[y:y + th, x:x + tw])
+            self.dirty = True
+            self.updated += 1
+
+    def remove(self, ip):
+        """
+        Remove client tile
+
+        :param ip: client IP address
+        """
+        with self.lock:
+            idx = self.tiles.pop(ip, None)
+            if idx is None or self.canvas is None:
+                return
+            columns = self.grid[0]
+            tw, th = self.tile_size
+            x = (idx % columns) * tw
+            y = (idx // columns) * th
+            self.canvas[y:y + th, x:x + tw] = 0
+            self.dirty = True
+
+    def get_frame(self):
+        """
+        Get canvas snapshot to display if changed and refresh interval elapsed (main thread)
+
+        :return: RGB frame or None if display is up to date
+        """
+        now = time.time()
+        if not self.dirty or (now - self.last_render) * 1000 < self.interval:
+            return None
+        with self.lock:
+            frame = self.canvas.copy()
+            self.dirty = False
+        self.last_render = now
+        self.rendered += 1
+        return frame
@@ -8,7 +8,6 @@
 # Updated At: 2023.03.27 02:00
 # =============================================================================
 
-from datetime import datetime
 import cv2
 from core.utils import trans
 
@@ -197,6 +196,8 @@ class Overlay:
         :param label: Label name
         :param text: Label text
         """
+        if self.tracker.window is None:
+            return
         if label in self.prev_status and self.prev_status[label] == text:
             return
         self.tracker.window.container_video.label[label].setText(text)
@@ -211,6 +212,8 @@ class Overlay:
 
         :param label: Label name
         """
+        if self.tracker.window is None:
+            return
         if label in self.prev_status and self.prev_status[label] is None:
             return
         self.tracker.window.container_video.label[label].setVisible(False)
@@ -218,6 +221,9 @@ class Overlay:
 
     def draw_info(self):
         """Draw info on the video, like status, mode, etc."""
+        if self.tracker.window is None:
+            return
+
         # remote status
         if self.tracker.remote.status is None:
             self.hide_video_label('remote')
@@ -341,14 +347,14 @@ class Overlay:
 
     def draw_debug_boxes(self):
         """Draw debug boxes on the video."""
-        for id in self.tracker.sorter.prev_boxes:
-            label = str(id) + ' (' + str(
-                (datetime.now() - self.tracker.sorter.prev_boxes[id]['dt']).seconds) + ')' + ' x' + str(
-                self.tracker.sorter.prev_boxes[id]['c'])
-            self.draw_rectangle(self.tracker.sorter.prev_boxes[id]['box'][0],
-                                self.tracker.sorter.prev_boxes[id]['box'][1],
-                                self.tracker.sorter.prev_boxes[id]['box'][2],
-                                self.tracker.sorter.prev_boxes[id]['box'][3], 50, 205, 50, 1, label, 1, (50, 205, 50),
+        tracks = self.tracker.sorter.tracks.tracks
+        for id in tracks:
+            label = str(id) + ' ' + tracks[id]['state'] + ' (' + str(tracks[id]['misses']) + ')' + ' x' + str(
+                tracks[id]['hits'])
+            self.draw_rectangle(tracks[id]['box'][0],
+                                tracks[id]['box'][1],
+                                tracks[id]['box'][2],
+                                tracks[id]['box'][3], 50, 205, 50, 1, label, 1, (50, 205, 50),
                                 False)
 
         for id in self.tracker.targets.box_last:
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+class Presenter:
+    def __init__(self, tracker=None):
+        """
+        No-op presenter used in headless mode
+
+        Stands in for UI bound classes (controller, mouse, keyboard), so every call like
+        tracker.controller.servo.update_remote() is silently ignored when there is no window.
+
+        :param tracker: tracker object
+        """
+        self.tracker = tracker
+
+    def __getattr__(self, name):
+        """
+        Return presenter for any attribute
+
+        :param name: attribute name
+        :return: self
+        """
+        return self
+
+    def __call__(self, *args, **kwargs):
+        """Ignore call"""
+        return None
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import json
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# process start, may be overwritten by app entry point
+STARTED_AT = time.time()
+
+
+class Profiler:
+    # stages
+    STAGE_FRAME = 'frame'
+    STAGE_GRAB = 'grab'
+    STAGE_INPUT_FILTER = 'input_filter'
+    STAGE_GATE = 'gate'
+    STAGE_PREDICT = 'predict'
+    STAGE_PROPAGATE = 'propagate'
+    STAGE_SORTER = 'sorter'
+    STAGE_TARGETING = 'targeting'
+    STAGE_OVERLAY = 'overlay'
+    STAGE_RENDER = 'render'
+    STAGE_COMMAND = 'command'
+    STAGE_UI = 'ui'
+
+    # startup timeline
+    STARTUP_IMPORT = 'import'
+    STARTUP_CONFIG = 'config'
+    STARTUP_CAMERA = 'camera'
+    STARTUP_MODEL = 'model'
+    STARTUP_FIRST_FRAME = 'first_frame'
+
+    # rolling window size (samples per stage)
+    SIZE = 300
+
+    def __init__(self, tracker=None):
+        """
+        Per-stage latency profiler
+
+        Stage times are summed per frame between start() / stop() calls and pushed
+        into rolling windows on commit(), so one stage may be measured in several places.
+
+        :param tracker: tracker object
+        """
+        self.tracker = tracker
+        self.stages = [
+            self.STAGE_FRAME,
+            self.STAGE_GRAB,
+            self.STAGE_INPUT_FILTER,
+            self.STAGE_GATE,
+            self.STAGE_PREDICT,
+            self.STAGE_PROPAGATE,
+            self.STAGE_SORTER,
+            self.STAGE_TARGETING,
+            self.STAGE_OVERLAY,
+            self.STAGE_RENDER,
+            self.STAGE_COMMAND,
+            self.STAGE_UI,
+        ]
+        self.samples = {stage: deque(maxlen=self.SIZE) for stage in self.stages}
+        self.lock = threading.Lock()
+        self.started = {}
+        self.current = {}
+
+        # startup timeline: [(name, timestamp)]
+        self.timeline = []
+        self.startup_done = False
+
+    def mark(self, name):
+        """
+        Mark startup timeline point, only first occurrence of every point is stored
+
+        :param name: point name
+        """
+        if self.startup_done or name in [point[0] for point in self.timeline]:
+            return
+        self.timeline.append((name, time.time()))
+        if name == self.STARTUP_FIRST_FRAME:
+            self.startup_done = True
+            self.tracker.debug.log("[STARTUP] " + ", ".join(
+                "{}: +{}s".format(k, v) for k, v in self.get_timeline().items()))
+
+    def get_timeline(self):
+        """
+        Get startup timeline
+
+        :return: dict with time (s) spent since previous point
+        """
+        timeline = {}
+        prev = STARTED_AT
+        for name, ts in self.timeline:
+            timeline[name] = round(ts - prev, 3)
+            prev = ts
+        return timeline
+
+    def start(self, stage):
+        """
+        Start stage timer
+
+        :param stage: stage name
+        """
+        self.started[stage] = time.perf_counter()
+
+    def stop(self, stage):
+        """
+        Stop stage timer and add time to current frame
+
+        :param stage: stage name
+        """
+        if stage not in self.started:
+            return
+        elapsed = time.perf_counter() - self.started.pop(stage)
+        self.current[stage] = self.current.get(stage, 0) + elapsed
+
+    def add(self, stage, value):
+        """
+        Add sample directly (for stages measured outside the frame loop, eg. in inference thread)
+
+        :param stage: stage name
+        :param value: time in seconds
+        """
+        with self.lock:
+            self.samples[stage].append(value)
+
+    def commit(self):
+        """Push current frame stage times into rolling windows"""
+        with self.lock:
+            for stage in self.current:
+                self.samples[stage].append(self.current[stage])
+        self.current = {}
+
+    def reset(self):
+        """Clear all samples"""
+        with self.lock:
+            for stage in self.samples:
+                self.samples[stage].clear()
+        self.started = {}
+        self.current = {}
+
+    def get_stats(self):
+        """
+        Get percentiles for every measured stage
+
+        :return: dict with p50, p95, p99, mean, max (ms) and count per stage
+        """
+        stats = {}
+        for stage in self.stages:
+            with self.lock:
+                values = np.array(self.samples[stage]) * 1000  # ms
+            if len(values) == 0:
+                continue
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            stats[stage] = {
+                'p50': round(float(p50), 3),
+                'p95': round(float(p95), 3),
+                'p99': round(float(p99), 3),
+                'mean': round(float(values.mean()), 3),
+                'max': round(float(values.max()), 3),
+                'count': len(values),
+            }
+        return stats
+
+    def export(self, path):
+        """
+        Export stats to JSON file
+
+        :param path: file path
+        """
+        data = {
+            'time': time.time(),
+            'fps': self.tracker.current_fps,
+            'model_name': self.tracker.model_name,
+            'source': self.tracker.source,
+            'startup': self.get_timeline(),
+            'stages': self.get_stats(),
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=4)
+        self.tracker.debug.log("[PROFILER] Stats exported to: {}".format(path))
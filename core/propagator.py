@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from core.detections import Detections
+
+
+class Propagator:
+    # propagation modes
+    MODE_OFF = 'off'
+    MODE_VELOCITY = 'velocity'
+    MODE_FLOW = 'flow'
+
+    # optical flow
+    WIDTH = 320  # flow is computed on downscaled grayscale frame
+    HISTORY = 30  # grayscale frames kept to bring late (async) results to current frame
+    MIN_SCORE = 0.3  # min keypoint score to track keypoint
+    GRID = 3  # points per axis sampled inside box
+    LK_PARAMS = dict(winSize=(15, 15), maxLevel=3,
+                     criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+
+    def __init__(self, tracker=None):
+        """
+        Objects propagation between inference frames
+
+        Model predicts on keyframes only (every N frames in sync mode, when worker is free in async mode),
+        on other frames boxes and keypoints are moved with sparse optical flow or constant velocity,
+        so targeting runs at camera rate.
+
+        :param tracker: tracker object
+        """
+        self.tracker = tracker
+        self.mode = self.MODE_OFF
+        self.interval = 1  # sync mode: predict every N frames
+        self.counter = 0  # propagated frames
+
+        self.frame_id = 0  # frame current objects are valid for
+        self.current_id = 0  # last stored frame
+        self.history = OrderedDict()  # frame_id: grayscale frame
+        self.size = (0, 0)  # grayscale frame size (w, h)
+
+        # flow features
+        self.points = None  # P x 1 x 2 points (px)
+        self.owners = None  # P object idx
+        self.kp_idx = None  # P keypoint idx, -1 for box points
+
+        # constant velocity
+        self.last = {}  # id: (center, frame_id)
+        self.velocity = {}  # id: [dx, dy] per frame
+
+    def reset(self):
+        """Reset state (on model or source switch)"""
+        self.frame_id = 0
+        self.current_id = 0
+        self.history.clear()
+        self.points = None
+        self.owners = None
+        self.kp_idx = None
+        self.last = {}
+        self.velocity = {}
+
+    def is_enabled(self):
+        """
+        Check if propagation is enabled
+
+        :return: True if enabled
+        """
+        return self.mode in [self.MODE_VELOCITY, self.MODE_FLOW]
+
+    def should_predict(self, frame_id, objects_frame):
+        """
+        Check if model should predict on frame (sync mode)
+
+        :param frame_id: current frame id
+        :param objects_frame: frame id of last prediction
+        :return: True if predict
+        """
+        if not self.is_enabled() or self.interval <= 1:
+            return True
+        return frame_id - objects_frame >= self.interval
+
+    def update(self, frame, frame_id):
+        """
+        Store frame (handle every frame)
+
+        :param frame: RGB frame
+        :param frame_id: frame id
+        """
+        self.current_id = frame_id
+        if self.mode != self.MODE_FLOW or frame is None:
+            return
+
+        h, w = frame.shape[:2]
+        scale = min(1.0, self.WIDTH / w)
+        size = (int(w * scale), int(h * scale))
+        if size != self.size:
+            self.history.clear()
+            self.points = None
+            self.size = size
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA) if scale < 1 else frame
+        self.history[frame_id] = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+        while len(self.history) > self.HISTORY:
+            self.history.popitem(last=False)
+
+    def keyframe(self, objects, frame_id):
+        """
+        Handle new predictions and bring them to current frame
+
+        :param objects: Detections
+        :param frame_id: frame id objects were predicted on
+        """
+        if not self.is_enabled() or not isinstance(objects, Detections):
+            return
+
+        # velocity of every track, per frame
+        last = {}
+        for idx, id in enumerate(objects.ids.tolist()):
+            center = objects.centers[idx].copy()
+            if id in self.last and frame_id > self.last[id][1]:
+                self.velocity[id] = (center - self.last[id][0]) / (frame_id - self.last[id][1])
+            last[id] = (center, frame_id)
+        self.velocity = {id: self.velocity[id] for id in last if id in self.velocity}
+        self.last = last
+
+        self.frame_id = frame_id
+        if self.mode == self.MODE_FLOW:
+            self.build_features(objects, frame_id)
+        self.apply(objects, False)
+
+    def apply(self, objects, count=True):
+        """
+        Move objects from frame they are valid for to current frame
+
+        :param objects: Detections
+        :param count: count as propagated frame
+        """
+        if not self.is_enabled() or not isinstance(objects, Detections) or len(objects) == 0:
+            return
+        if self.frame_id >= self.current_id:
+            return
+
+        if self.mode == self.MODE_FLOW:
+            self.move_flow(objects)
+            if self.points is None:
+                self.build_features(objects, self.current_id)  # keyframe was not in history
+        else:
+            steps = self.current_id - self.frame_id
+            displacement = np.array([self.velocity.get(id, [0, 0]) for id in objects.ids.tolist()],
+                                    dtype=np.float32).reshape(-1, 2) * steps
+            self.shift(objects, displacement)
+        self.frame_id = self.current_id
+        if count:
+            self.counter += 1
+
+    def build_features(self, objects, frame_id):
+        """
+        Sample points to track: visible keypoints and grid inside every box
+
+        :param objects: Detections
+        :param frame_id: frame id objects were predicted on
+        """
+        self.points = None
+        if frame_id not in self.history:
+            return
+
+        w, h = self.size
+        points = []
+        owners = []
+        kp_idx = []
+        grid = (np.arange(self.GRID) + 0.5) / self.GRID * 0.5 + 0.25  # inner half of box
+        for i in range(len(objects)):
+            for k in np.flatnonzero(objects.keypoints[i, :, 2] >= self.MIN_SCORE):
+                points.append(objects.keypoints[i, k, :2] * [w, h])
+                owners.append(i)
+                kp_idx.append(k)
+            x, y, bw, bh = objects.boxes[i]
+            for gy in grid:
+                for gx in grid:
+                    points.append([(x + bw * gx) * w, (y + bh * gy) * h])
+                    owners.append(i)
+                    kp_idx.append(-1)
+
+        if len(points) == 0:
+            return
+        self.points = np.array(points, dtype=np.float32).reshape(-1, 1, 2)
+        self.owners = np.array(owners, dtype=np.int32)
+        self.kp_idx = np.array(kp_idx, dtype=np.int32)
+
+    def move_flow(self, objects):
+        """
+        Move objects with sparse optical flow
+
+        :param objects: Detections
+        """
+        if self.points is None or self.frame_id not in self.history or self.current_id not in self.history \
+                or self.owners.max() >= len(objects):
+            return
+
+        points, status, err = cv2.calcOpticalFlowPyrLK(self.history[self.frame_id], self.history[self.current_id],
+                                                       self.points, None, **self.LK_PARAMS)
+        status = status.reshape(-1).astype(bool)
+        flow = (points - self.points).reshape(-1, 2)
+
+        w, h = self.size
+        displacement = np.zeros((len(objects), 2), dtype=np.float32)
+        for i in range(len(objects)):
+            ok = status & (self.owners == i)
+            if ok.any():
+                displacement[i] = np.median(flow[ok], axis=0) / [w, h]
+
+        self.shift(objects, displacement)
+
+        # tracked keypoints follow own flow
+        tracked = status & (self.kp_idx >= 0)
+        if tracked.any():
+            objects.keypoints[self.owners[tracked], self.kp_idx[tracked], :2] = points.reshape(-1, 2)[tracked] / [w, h]
+            if len(objects.anchors) > 0 and hasattr(self.tracker.wrapper, 'build_anchors'):
+                objects.anchors = self.tracker.wrapper.build_anchors(objects.keypoints)
+
+        # lost points follow object
+        lost = ~status
+        points = points.reshape(-1, 2)
+        points[lost] = self.points.reshape(-1, 2)[lost] + displacement[self.owners[lost]] * [w, h]
+        self.points = points.reshape(-1, 1, 2).astype(np.float32)
+
+    def shift(self, objects, displacement):
+        """
+        Shift objects (in place)
+
+        :param objects: Detections
+        :param displacement: N x 2 normalized displacement
+        """
+        objects.boxes[:, :2] += displacement
+        objects.centers += displacement
+        if objects.keypoints.shape[1] > 0:
+            objects.keypoints[:, :, :2] += displacement[:, None, :]
+        for name in objects.anchors:
+            objects.anchors[name] = objects.anchors[name] + displacement
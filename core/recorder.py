@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import json
+import os
+import time
+
+import cv2
+
+
+class Recorder:
+    # recording files
+    FILE_META = 'meta.json'
+    FILE_RECORDS = 'records.jsonl'
+    DIR_FRAMES = 'frames'
+
+    def __init__(self, tracker=None):
+        """
+        Pipeline recorder
+
+        Saves input frames (lossless PNG) with capture timestamps, detected objects
+        and servo command output, so the session can be replayed later by Replay.
+
+        :param tracker: tracker object
+        """
+        self.tracker = tracker
+        self.enabled = False
+        self.path = None
+        self.file = None
+        self.counter = 0
+
+        # current frame
+        self.frame = None
+        self.ts = 0
+
+    def start(self, path):
+        """
+        Start recording
+
+        :param path: recording directory
+        """
+        if self.enabled:
+            self.stop()
+
+        # model may be still loading on background, record from first frame with requested model
+        model_name = self.tracker.loader.requested
+        if model_name is not None and model_name != self.tracker.model_name:
+            self.tracker.switch_model(model_name, True)
+
+        os.makedirs(os.path.join(path, self.DIR_FRAMES), exist_ok=True)
+        meta = {
+            'version': self.tracker.version,
+            'source': self.tracker.source,
+            'model_name': self.tracker.model_name,
+            'target_mode': self.tracker.target_mode,
+            'target_point': self.tracker.target_point,
+            'fps': self.tracker.fps,
+            'inference_async': bool(self.tracker.inference.enabled),
+            'started_at': time.time(),
+        }
+        with open(os.path.join(path, self.FILE_META), 'w') as f:
+            json.dump(meta, f, indent=4)
+
+        self.path = path
+        self.file = open(os.path.join(path, self.FILE_RECORDS), 'w')
+        self.counter = 0
+        self.frame = None
+        self.enabled = True
+        self.tracker.debug.log("[RECORDER] Recording to: {}".format(path))
+
+    def stop(self):
+        """Stop recording"""
+        if not self.enabled:
+            return
+        self.enabled = False
+        self.file.close()
+        self.file = None
+        self.frame = None
+        self.tracker.debug.log("[RECORDER] Stopped, recorded {} frame(s)".format(self.counter))
+
+    def capture(self, frame):
+        """
+        Capture input frame (before input filters)
+
+        :param frame: RGB frame
+        """
+        if not self.enabled or frame is None:
+            return
+        self.frame = frame
+        self.ts = time.time()
+
+    def append(self):
+        """Append captured frame with current objects and command to recording"""
+        if not self.enabled or self.frame is None:
+            return
+
+        name = '{:06d}.png'.format(self.counter + 1)
+        cv2.imwrite(os.path.join(self.path, self.DIR_FRAMES, name),
+                    cv2.cvtColor(self.frame, cv2.COLOR_RGB2BGR),
+                    [cv2.IMWRITE_PNG_COMPRESSION, 1])
+
+        # frame ids: objects of async inference come from earlier frame (objects_frame), async worker
+        # may predict frames which results are replaced before fetch (predicted)
+        record = {
+            'frame': name,
+            'ts': self.ts,
+            'frame_id': self.tracker.frame_id,
+            'objects_frame': self.tracker.objects_frame,
+            'predicted': self.tracker.inference.pop_predicted(),
+            'objects': self.tracker.objects,
+            'command': self.tracker.command.current,
+        }
+        self.file.write(json.dumps(record, default=self.encode) + "\n")
+        self.counter += 1
+        self.frame = None
+
+    @staticmethod
+    def encode(value):
+        """
+        Encode numpy values to JSON
+
+        :param value: value (numpy array or Detections)
+        :return: encoded value
+        """
+        if hasattr(value, 'to_list'):
+            return value.to_list()
+        if hasattr(value, 'tolist'):
+            return value.tolist()
+        return str(value)
@@ -8,16 +8,14 @@
 # Updated At: 2023.03.27 02:00
 # =============================================================================
 
-from imutils import build_montages
 from datetime import datetime
-import imagezmq
 import socket
 import time
 import os
-import imutils
-import cv2
-import simplejpeg
 from core.client import Client
+from core.decoder import Decoder
+from core.ingest import Ingest
+from core.ring import FrameRing
 from core.utils import trans
 
 
@@ -45,16 +43,16 @@ class Remote:
         :param tracker: tracker object
         """
         self.tracker = tracker
-        self.imageHub = imagezmq.ImageHub()
+        self.ingest = Ingest(tracker)
+        self.decoder = Decoder(tracker)
         self.clients = {}
         self.data = {}
+        self.frames = {}  # ip: latest raw (BGR) client frame, for batched inference
+        self.ring = FrameRing()  # current client frames handoff to render loop
         self.last_active_check = datetime.now()
         self.send_conn_time = {}
         self.conn_timer = datetime.now()
         self.is_connecting = False
-        self.montage_columns = 2
-        self.montage_rows = 2
-        self.montage_width = 400
         self.active = False
         self.status = None
 
@@ -142,7 +140,8 @@ class Remote:
         """
         self.status = None
         if ip is None:
-            self.tracker.window.ui.dialogs.alert(trans('alert.remote.invalid_ip'))
+            if self.tracker.window is not None:
+                self.tracker.window.ui.dialogs.alert(trans('alert.remote.invalid_ip'))
             self.tracker.debug.log("[REMOTE] CONNECT: Empty IP address! ABORTING!")
             self.status = self.STATE_DISCONNECTED
             if ip in self.clients.keys():
@@ -204,7 +203,8 @@ class Remote:
             if 0 < self.CLIENT_INACTIVE_TIME < (
                     datetime.now() - self.clients[ip].last_active_time).seconds:
                 self.tracker.debug.log("[REMOTE] Lost connection to {}".format(ip))
-                self.tracker.window.ui.dialogs.alert(trans('alert.remote.disconnected'))
+                if self.tracker.window is not None:
+                    self.tracker.window.ui.dialogs.alert(trans('alert.remote.disconnected'))
                 self.status = self.STATE_DISCONNECTED
                 self.dispose(ip)
                 return False
@@ -248,6 +248,9 @@ class Remote:
         # remove from clients
         if ip in self.data:
             self.data.pop(ip)
+        self.frames.pop(ip, None)
+        self.tracker.montage.remove(ip)
+        self.tracker.encrypt.reset_mode(ip)
 
         # clear
         if ip == self.tracker.remote_ip:
@@ -290,6 +293,9 @@ class Remote:
         # remove from clients
         if ip in self.data:
             self.data.pop(ip)
+        self.frames.pop(ip, None)
+        self.tracker.montage.remove(ip)
+        self.tracker.encrypt.reset_mode(ip)
 
         # disconnect servo
         if self.tracker.servo.remote == ip:
@@ -319,6 +325,9 @@ class Remote:
         # remove from clients
         if ip in self.data:
             self.data.pop(ip)
+        self.frames.pop(ip, None)
+        self.tracker.montage.remove(ip)
+        self.tracker.encrypt.reset_mode(ip)
 
         # disconnect servo
         if self.tracker.servo.remote == ip:
@@ -377,6 +386,7 @@ class Remote:
             if cmd == "ACCEPT":
                 hostname = buff['hostname']
                 self.add(ip, hostname)
+                self.tracker.encrypt.set_mode(ip, buff.get('wire'))  # None if client has no binary wire mode
                 self.tracker.sockets.packets_wait -= 1  # decrease packets wait
                 self.status = None
                 self.is_connecting = False
@@ -503,15 +513,33 @@ class Remote:
             if self.tracker.servo.remote != ip:
                 self.toggle_servo(ip)
 
-        # receive image from client
-        if self.STREAM_JPEG:
-            data, frame = self.imageHub.recv_jpg()
-        else:
-            data, frame = self.imageHub.recv_image()
+        # receive images from clients
+        for data, frame in self.decoder.decode_all(self.ingest.receive(), ip):
+            self.process(ip, data, frame)
 
-        # send reply
-        self.imageHub.send_reply(b'OK')
+        # check last active hosts
+        if 0 < self.CLIENT_INACTIVE_TIME < (datetime.now() - self.last_active_check).seconds:
+            for ip in self.clients:
+                if self.clients[ip].last_active_time is not None and (
+                        datetime.now() - self.clients[ip].last_active_time).seconds > self.CLIENT_INACTIVE_TIME:
+                    self.tracker.debug.log("[REMOTE] Lost connection to {}".format(ip))
+                    if self.tracker.window is not None:
+                        self.tracker.window.ui.dialogs.alert(trans('alert.remote.disconnected'))
+                    self.clients[ip].state = self.STATE_TIMEOUT
+                    self.status = self.STATE_DISCONNECTED
+                    self.dispose(ip)
+            self.last_active_check = datetime.now()
+
+        return self.data
+
+    def process(self, ip, data, frame):
+        """
+        Process frame received from client
 
+        :param ip: Current client IP address
+        :param data: Received data (hostname@timestamp)
+        :param frame: Decoded BGR image, None if not decoded (not needed)
+        """
         # get hostname and timestamp
         data_parts = data.split('@')
         hostname = data_parts[0]
@@ -519,59 +547,48 @@ class Remote:
         ping = round(time.time() * 1000) - int(timestamp)
         if ping < 0:
             ping = 0
-        self.ping_video = ping
+
+        # sender client, activity of unknown hosts is assigned to current client
+        known = self.get_ip_by_hostname(hostname)
+        sender = known if known is not None else ip
+        if sender == ip:
+            self.ping_video = ping
 
         # store in client
-        if ip in self.clients:
-            self.clients[ip].ping_video = ping
+        if sender in self.clients:
+            self.clients[sender].ping_video = ping
             self.status = None
 
-        # if JPEG compression
-        if self.STREAM_JPEG:
-            # decrypt
-            if self.tracker.encrypt.enabled_video:
-                frame = self.tracker.encrypt.decrypt(frame, True)
-            frame = simplejpeg.decode_jpeg(frame, colorspace='BGR', fastdct=True, fastupsample=True)
-
         # update active time
-        self.update_client_by_ip(ip)
+        self.update_client_by_ip(sender)
 
         # reset state on list
-        if ip in self.clients:
-            self.clients[ip].state = None
-
-        # add frame to data, if montage is enabled then add to montage frames, if not then add only host frame
-        w, h = 0, 0
-        if self.tracker.render.montage:
-            for tmp_ip in self.clients:
-                if self.clients[tmp_ip].hostname == hostname:
-                    frame = imutils.resize(frame, width=self.montage_width)
-                    (h, w) = frame.shape[:2]
-                    cv2.putText(frame, hostname, (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
-                    self.data[tmp_ip] = frame
-                    break
-        else:
-            if ip is not None and self.clients[ip].hostname == hostname:
-                self.data[ip] = frame
+        if sender in self.clients:
+            self.clients[sender].state = None
 
-        # build montage view
-        if self.tracker.render.montage:
-            self.tracker.render.montage_frames = build_montages(self.data.values(), (w, h),
-                                                                (self.montage_columns, self.montage_rows))
+        # keep raw frame of every client for batched inference, pass current client frame to render loop
+        if known is not None:
+            self.frames[known] = frame
+            if known == ip and frame is not None:
+                self.ring.publish(frame)
 
-        # check last active hosts
-        if 0 < self.CLIENT_INACTIVE_TIME < (datetime.now() - self.last_active_check).seconds:
-            for ip in self.clients:
-                if self.clients[ip].last_active_time is not None and (
-                        datetime.now() - self.clients[ip].last_active_time).seconds > self.CLIENT_INACTIVE_TIME:
-                    self.tracker.debug.log("[REMOTE] Lost connection to {}".format(ip))
-                    self.tracker.window.ui.dialogs.alert(trans('alert.remote.disconnected'))
-                    self.clients[ip].state = self.STATE_TIMEOUT
-                    self.status = self.STATE_DISCONNECTED
-                    self.dispose(ip)
-            self.last_active_check = datetime.now()
+        # add host frame to data, if montage is enabled then update client tile
+        if ip is not None and known == ip and frame is not None:
+            self.data[ip] = frame
+        if self.tracker.render.montage and known is not None:
+            self.tracker.montage.update(known, hostname, frame)
 
-        return self.data
+    def get_ip_by_hostname(self, hostname):
+        """
+        Get client IP by hostname
+
+        :param hostname: Client hostname
+        :return: Client IP address or None
+        """
+        for ip in self.clients:
+            if self.clients[ip].hostname == hostname:
+                return ip
+        return None
 
     def host2ip(self, hostname):
         """
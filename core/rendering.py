@@ -10,7 +10,6 @@
 
 import cv2
 import numpy as np
-from PySide6.QtGui import QImage, QPixmap
 
 
 class Rendering:
@@ -22,8 +21,8 @@ class Rendering:
         """
         self.tracker = tracker
         self.orig_frame = None
-        self.frame = None
-        self.montage_frames = []
+        self.frame = None  # last remote frame (RGB)
+        self.frame_seq = 0  # remote frame sequence number
         self.pixmap = None
         self.tracking = True
         self.targeting = True
@@ -40,15 +39,19 @@ class Rendering:
         self.montage = False
         self.size = (0, 0)
 
-    def handle_thread(self, frame):
+    def get_remote_frame(self):
         """
-        Handle video from remote video thread
+        Get latest remote frame, converted to RGB once per received frame
 
-        :param frame: frame
+        Returned frame is shared (with inference worker, recorder) and must not be modified in place.
+
+        :return: RGB frame or None
         """
-        if frame is None:
-            return
-        self.frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        seq, frame = self.tracker.remote.ring.latest()
+        if frame is not None and seq != self.frame_seq:
+            self.frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            self.frame_seq = seq
+        return self.frame
 
     def get_frame(self):
         """
@@ -56,6 +59,8 @@ class Rendering:
 
         :return: frame
         """
+        self.tracker.profiler.start(self.tracker.profiler.STAGE_GRAB)
+
         # get frame
         frame = None
         success = False
@@ -70,22 +75,23 @@ class Rendering:
                 if self.tracker.capture[ip] is not None and type(self.tracker.capture[ip]) is not np.ndarray:
                     success, self.orig_frame = self.tracker.capture[ip].read()
                 if success:
-                    # only if window app
-                    if self.tracker.window is not None:
-                        frame = cv2.cvtColor(self.orig_frame, cv2.COLOR_BGR2RGB)
-                    else:
-                        frame = self.orig_frame.copy()
-
+                    frame = cv2.cvtColor(self.orig_frame, cv2.COLOR_BGR2RGB)
                     self.size = (frame.shape[1], frame.shape[0])
         else:
             # remote video frame
-            if self.tracker.remote.active and self.frame is not None:
-                frame = self.frame.copy()
+            if self.tracker.remote.active:
+                frame = self.get_remote_frame()
+            if frame is not None:
                 self.size = (frame.shape[1], frame.shape[0])
 
+        self.tracker.recorder.capture(frame)  # record raw input frame
+        self.tracker.profiler.stop(self.tracker.profiler.STAGE_GRAB)
+
         # video filter apply (input)
         if self.tracker.video_filter.has_input_filter():
+            self.tracker.profiler.start(self.tracker.profiler.STAGE_INPUT_FILTER)
             frame = self.tracker.video_filter.apply_input(frame)
+            self.tracker.profiler.stop(self.tracker.profiler.STAGE_INPUT_FILTER)
 
         return frame
 
@@ -106,6 +112,11 @@ class Rendering:
                 frame = self.tracker.run(frame)  # run AI model
             self.tracker.processing = False
 
+            # headless mode, nothing to display, output is drawn by overlay in place and input frame is shared
+            # with async inference and recorder
+            if self.tracker.window is None:
+                return frame.copy(), frame.shape[1], frame.shape[0]
+
             # max_width is max label width, max_height is max label height
             max_width, max_height = self.get_max_size()
 
@@ -132,12 +143,14 @@ class Rendering:
             # resize video to max label width
             frame = self.resize(frame, resize_width, resize_height)  # resize output to max label width
 
+            self.tracker.profiler.start(self.tracker.profiler.STAGE_OVERLAY)
             if self.tracking and self.tracker.wrapper is not None:  # if view render tracking enabled
                 frame = self.tracker.wrapper.append(frame)  # add overlays to image
 
             # append debug boxes
             if self.tracker.debug.active['keypoints']:
                 self.tracker.overlay.draw_debug_boxes()
+            self.tracker.profiler.stop(self.tracker.profiler.STAGE_OVERLAY)
 
         return frame, label_width, label_height
 
@@ -155,6 +168,7 @@ class Rendering:
 
         # render in video label - only if window app
         if self.tracker.window is not None:
+            from PySide6.QtGui import QImage, QPixmap  # not imported in headless mode
             image = QImage(frame, frame.shape[1], frame.shape[0],
                            frame.strides[0], QImage.Format_RGB888)
             self.pixmap = QPixmap.fromImage(image).scaled(w, h)
@@ -205,6 +219,7 @@ class Rendering:
 
             # render in video label - only if window app
             if self.tracker.window is not None:
+                from PySide6.QtGui import QImage, QPixmap  # not imported in headless mode
                 image = QImage(frame, frame.shape[1], frame.shape[0],
                                frame.strides[0], QImage.Format_RGB888)
                 self.pixmap = QPixmap.fromImage(image).scaled(label_width, label_height)
@@ -214,10 +229,11 @@ class Rendering:
 
     def append_montage(self):
         """Append montage render to window"""
-        if self.montage_frames is not None:
-            for (i, montage) in enumerate(self.montage_frames):
-                montage = cv2.cvtColor(montage, cv2.COLOR_BGR2RGB)
-                self.render_montage(montage)
+        if self.tracker.window is None:
+            return
+        frame = self.tracker.montage.get_frame()  # None if not changed or refresh interval not elapsed
+        if frame is not None:
+            self.render_montage(frame)
 
     def apply_zoom(self, frame, zoom):
         """
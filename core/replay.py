@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from core.recorder import Recorder
+
+
+class Player:
+    def __init__(self, path, records):
+        """
+        Recorded frames capture, can be used in place of cv2.VideoCapture
+
+        :param path: recording directory
+        :param records: list of records
+        """
+        self.path = path
+        self.records = records
+        self.pos = 0
+
+    def read(self):
+        """
+        Read next frame
+
+        :return: (success, BGR frame)
+        """
+        if self.pos >= len(self.records):
+            return False, None
+        frame = cv2.imread(os.path.join(self.path, Recorder.DIR_FRAMES, self.records[self.pos]['frame']))
+        self.pos += 1
+        return frame is not None, frame
+
+    def release(self):
+        """Release capture"""
+        self.pos = 0
+
+
+class Replay:
+    STAGES = ['get_frame', 'process', 'targeting', 'command']
+
+    # max frames between predicted frame and frame its objects were applied on (async inference lag)
+    MAX_LAG = 30
+
+    # max difference of recorded and replayed box coords
+    BOX_TOLERANCE = 1e-4
+
+    def __init__(self, tracker=None):
+        """
+        Recording replay driver
+
+        Pushes recorded frames through get_frame -> process -> targeting -> command
+        and compares servo command stream with recording. Predictions are made on the same frames
+        and applied on the same frames as in recording, so recordings made with async inference
+        replay deterministically.
+
+        :param tracker: tracker object
+        """
+        self.tracker = tracker
+        self.meta = {}
+        self.records = []
+        self.enabled = False  # predict on recorded schedule
+        self.record = None  # current record
+        self.frames = {}  # replay frame_id: recent frames
+        self.results = {}  # replay frame_id: predicted objects not applied yet
+        self.objects_frame = 0  # recorded frame id of current objects
+
+    def load(self, path):
+        """
+        Load recording
+
+        :param path: recording directory
+        """
+        with open(os.path.join(path, Recorder.FILE_META), 'r') as f:
+            self.meta = json.load(f)
+
+        self.records = []
+        with open(os.path.join(path, Recorder.FILE_RECORDS), 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line == '':
+                    continue
+                record = json.loads(line)
+
+                # JSON object keys are strings, restore int keys
+                if record['objects'] is not None:
+                    record['objects'] = [{int(k): v for k, v in obj.items()} for obj in record['objects']]
+                self.records.append(record)
+        self.tracker.debug.log("[REPLAY] Loaded {} frame(s) from: {}".format(len(self.records), path))
+
+    def prepare(self, path, model=None):
+        """
+        Prepare tracker for replay
+
+        :param path: recording directory
+        :param model: model name, recorded model is used if None
+        """
+        if model is None:
+            model = self.meta['model_name']
+        self.tracker.switch_model(model, True)
+
+        self.tracker.inference.enabled = False  # deterministic, predict on main thread
+        self.tracker.servo.enable = False  # never send commands to devices
+        self.tracker.target_mode = self.meta['target_mode']
+        self.tracker.target_point = self.meta['target_point']
+        self.tracker.release()
+        self.tracker.source = self.tracker.SOURCE_VIDEO
+        self.tracker.capture = {'-': Player(path, self.records)}
+        self.tracker.sorter.reset()
+        self.tracker.propagator.reset()
+        self.tracker.gate.reset()
+        self.tracker.command.reset()
+        self.tracker.objects = []
+        self.tracker.objects_frame = 0
+
+        # recordings without frame ids are predicted on every frame (sync mode)
+        self.enabled = len(self.records) > 0 and 'objects_frame' in self.records[0]
+        self.frames = {}
+        self.results = {}
+        self.objects_frame = 0
+
+    def predict(self, frame):
+        """
+        Predict on recorded schedule: objects are predicted on the frame they were predicted on
+        in recording and applied on the frame they were applied on
+
+        :param frame: frame
+        """
+        tracker = self.tracker
+        record = self.record
+        offset = tracker.frame_id - record['frame_id']  # replay frame_id - recorded frame_id
+        self.frames[tracker.frame_id] = frame
+        self.frames.pop(tracker.frame_id - self.MAX_LAG, None)
+        self.results.pop(tracker.frame_id - self.MAX_LAG, None)
+
+        # all predictions made by async worker in this frame, in order (model may keep state between frames)
+        tracker.profiler.start(tracker.profiler.STAGE_PREDICT)
+        for frame_id in record.get('predicted', []):
+            frame_id += offset
+            self.results[frame_id] = tracker.batcher.predict(tracker.wrapper, self.frames.get(frame_id, frame))
+        tracker.profiler.stop(tracker.profiler.STAGE_PREDICT)
+
+        # no new objects on this frame
+        if record['objects_frame'] == self.objects_frame:
+            tracker.propagate(False)
+            return
+
+        # predicted frame, frames before recording start are not available, current is used
+        self.objects_frame = record['objects_frame']
+        frame_id = record['objects_frame'] + offset
+        tracker.profiler.start(tracker.profiler.STAGE_PREDICT)
+        if frame_id in self.results:
+            tracker.objects = self.results.pop(frame_id)
+        else:
+            tracker.objects = tracker.batcher.predict(tracker.wrapper, self.frames.get(frame_id, frame))
+        tracker.objects_frame = frame_id
+        tracker.profiler.stop(tracker.profiler.STAGE_PREDICT)
+
+        tracker.profiler.start(tracker.profiler.STAGE_SORTER)
+        tracker.sorter.apply()
+        tracker.profiler.stop(tracker.profiler.STAGE_SORTER)
+        tracker.propagate(True)
+
+    def compare_objects(self, objects, recorded):
+        """
+        Compare objects boxes with recorded objects
+
+        :param objects: objects
+        :param recorded: recorded objects (list of dicts)
+        :return: True if equal
+        """
+        objects = list(objects or [])
+        recorded = recorded or []
+        if len(objects) != len(recorded):
+            return False
+        key = self.tracker.IDX_BOX
+        for obj, rec in zip(objects, recorded):
+            box = obj[key]
+            if (box is None) != (rec.get(key) is None):
+                return False
+            if box is not None and not np.allclose(box, rec[key], rtol=0, atol=self.BOX_TOLERANCE):
+                return False
+        return True
+
+    def run(self, path, realtime=False, model=None):
+        """
+        Replay recording
+
+        :param path: recording directory
+        :param realtime: keep original frame pacing, as fast as possible if False
+        :param model: model name, recorded model is used if None
+        :return: report (dict)
+        """
+        self.load(path)
+        self.prepare(path, model)
+
+        times = {stage: [] for stage in self.STAGES}
+        mismatch_commands = 0
+        mismatch_objects = 0
+        first_ts = self.records[0]['ts'] if len(self.records) > 0 else 0
+        start = time.time()
+
+        for i, record in enumerate(self.records):
+            if realtime:
+                delay = (record['ts'] - first_ts) - (time.time() - start)
+                if delay > 0:
+                    time.sleep(delay)
+
+            ts = time.perf_counter()
+            frame = self.tracker.render.get_frame()
+            times['get_frame'].append(time.perf_counter() - ts)
+
+            ts = time.perf_counter()
+            self.record = record
+            self.tracker.output, w, h = self.tracker.render.process(frame)
+            self.tracker.overlay.img = self.tracker.output
+            times['process'].append(time.perf_counter() - ts)
+
+            ts = time.perf_counter()
+            if self.tracker.target_mode != self.tracker.TARGET_MODE_OFF:
+                self.tracker.targeting.update()
+            times['targeting'].append(time.perf_counter() - ts)
+
+            ts = time.perf_counter()
+            self.tracker.command.update()
+            times['command'].append(time.perf_counter() - ts)
+
+            # verify with recording
+            if self.tracker.command.current != record['command']:
+                mismatch_commands += 1
+                if mismatch_commands <= 10:
+                    self.tracker.debug.log("[REPLAY] Command mismatch at frame {}: {} != {}".format(
+                        i + 1, self.tracker.command.current, record['command']))
+            if not self.compare_objects(self.tracker.objects, record['objects']):
+                mismatch_objects += 1
+
+        total = time.time() - start
+        self.enabled = False
+        self.frames = {}
+        self.results = {}
+        report = {
+            'frames': len(self.records),
+            'time': round(total, 3),
+            'fps': round(len(self.records) / total, 1) if total > 0 else 0,
+            'mismatch_commands': mismatch_commands,
+            'mismatch_objects': mismatch_objects,
+            'stages': {},
+        }
+        for stage in self.STAGES:
+            values = np.array(times[stage]) * 1000  # ms
+            if len(values) == 0:
+                continue
+            report['stages'][stage] = {
+                'mean': round(float(values.mean()), 3),
+                'p50': round(float(np.percentile(values, 50)), 3),
+                'p95': round(float(np.percentile(values, 95)), 3),
+                'max': round(float(values.max()), 3),
+            }
+
+        self.tracker.debug.log("[REPLAY] {} frame(s) in {}s, {} FPS".format(report['frames'], report['time'],
+                                                                         report['fps']))
+        for stage in report['stages']:
+            self.tracker.debug.log("[REPLAY] {}: mean {mean} ms, p50 {p50} ms, p95 {p95} ms, max {max} ms".format(
+                stage, **report['stages'][stage]))
+        self.tracker.debug.log("[REPLAY] Command mismatches: {}, object mismatches: {}".format(
+            mismatch_commands, mismatch_objects))
+        return report
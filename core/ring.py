@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+
+class FrameRing:
+    def __init__(self, size=4):
+        """
+        Single producer ring of latest frames with sequence numbers
+
+        Producer (video thread) publishes frame into next slot and then the sequence number, consumer reads
+        latest slot without locks (slot and sequence are single reference assignments). Published frames
+        are never modified, so they are handed over without copy.
+
+        :param size: number of slots
+        """
+        self.size = size
+        self.slots = [None] * size  # (seq, frame)
+        self.seq = 0  # last published sequence number
+
+    def publish(self, frame):
+        """
+        Publish frame (producer)
+
+        :param frame: frame, must not be modified after publish
+        :return: sequence number
+        """
+        seq = self.seq + 1
+        self.slots[seq % self.size] = (seq, frame)
+        self.seq = seq  # publish after slot is written
+        return seq
+
+    def latest(self):
+        """
+        Get latest frame (consumer)
+
+        :return: (seq, frame) or (0, None) if no frame was published
+        """
+        entry = self.slots[self.seq % self.size]
+        if entry is None:
+            return 0, None
+        return entry
+
+    def get(self, seq):
+        """
+        Get frame by sequence number if still in ring
+
+        :param seq: sequence number
+        :return: frame or None
+        """
+        entry = self.slots[seq % self.size]
+        if entry is None or entry[0] != seq:
+            return None
+        return entry[1]
+
+    def clear(self):
+        """Drop all frames (sequence numbers keep growing)"""
+        self.slots = [None] * self.size
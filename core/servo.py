@@ -191,3 +191,30 @@ class Servo:
             round(float((0.5 - coords[0]) * self.tracker.camera.fov[0] * self.ANGLE_MULTIPLIER_X)),
             -round(float((0.5 - coords[1]) * self.tracker.camera.fov[1] * self.ANGLE_MULTIPLIER_Y))
         ]
+
+    def angle_to_point(self, angle, real=False):
+        """
+        Convert servo angle to point coords (inverse of point_to_angle, without rounding)
+
+        :param angle: servo angle (x, y) relative to current position
+        :param real: use real camera params
+        :return: coords of point camera is turned to
+        """
+        # video file, for video FOV is always 100%, from 0 to 1
+        if self.tracker.source == self.tracker.SOURCE_VIDEO or not self.map_fov:
+            if self.use_limit or real:
+                return [
+                    0.5 - angle[0] / self.ANGLE_LIMIT_MAX_X,
+                    0.5 + angle[1] / self.ANGLE_LIMIT_MAX_Y
+                ]
+            else:
+                return [
+                    0.5 - angle[0] / self.ANGLE_MAX_X,
+                    0.5 + angle[1] / self.ANGLE_MAX_Y
+                ]
+
+        # camera, real camera params
+        return [
+            0.5 - angle[0] / (self.tracker.camera.fov[0] * self.ANGLE_MULTIPLIER_X),
+            0.5 + angle[1] / (self.tracker.camera.fov[1] * self.ANGLE_MULTIPLIER_Y)
+        ]
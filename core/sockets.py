@@ -119,8 +119,12 @@ class Sockets:
 
         tmp_socket = None
         try:
-            # temporary socket to only send server ip
-            cmd = to_json('NEW', "CONN")
+            # temporary socket to only send server ip, offer encryption wire mode (handshake is in legacy mode)
+            self.tracker.encrypt.reset_mode(ip)  # client answers new handshake in legacy mode
+            extra = None
+            if self.tracker.encrypt.enabled_data or self.tracker.encrypt.enabled_video:
+                extra = {'wire': self.tracker.encrypt.wire}
+            cmd = to_json('NEW', "CONN", extra)
             if self.tracker.encrypt.enabled_data:
                 msg = self.tracker.encrypt.encrypt(cmd)  # as bytes
             else:
@@ -176,9 +180,13 @@ class Sockets:
             time.sleep(0.1)
             return
 
-        # decrypt
+        # decrypt, drop truncated or forged message
         if result is not None and self.tracker.encrypt.enabled_data:
-            result = bytes(self.tracker.encrypt.decrypt(result), 'UTF-8')  # as bytes
+            try:
+                result = bytes(self.tracker.encrypt.decrypt(result, ip=ip), 'UTF-8')  # as bytes
+            except ValueError as e:
+                self.tracker.debug.log("[SOCKET] Failed to decrypt data from {}: {}".format(ip, e))
+                return
 
         self.is_recv = True
         return result
@@ -210,7 +218,7 @@ class Sockets:
             try:
                 # encrypt
                 if self.tracker.encrypt.enabled_data:
-                    data = self.tracker.encrypt.encrypt(data)
+                    data = self.tracker.encrypt.encrypt(data, ip=ip)
                     result = self.push_socket[ip].send(data)  # already bytes
                 else:
                     result = self.push_socket[ip].send(bytes(data, 'UTF-8'))
@@ -89,6 +89,51 @@ class Storage:
         self.tracker.is_debug = self.get_cfg('app.debug', self.TYPE_BOOL)
         self.tracker.disabled = self.get_cfg('app.disabled', self.TYPE_BOOL)
 
+        # inference
+        self.tracker.inference.enabled = self.get_cfg('inference.async', self.TYPE_BOOL)
+        backend = self.get_cfg('inference.backend')
+        if backend is not None:
+            self.tracker.models.backend = backend
+        self.tracker.models.threads = self.get_cfg('inference.threads', self.TYPE_INT)
+        if self.config.has_option("CONFIG", 'inference.inter_threads'):
+            self.tracker.models.inter_threads = self.get_cfg('inference.inter_threads', self.TYPE_INT)
+        if self.config.has_option("CONFIG", 'inference.cv_threads'):
+            self.tracker.models.cv_threads = self.get_cfg('inference.cv_threads', self.TYPE_INT)
+        compile_mode = self.get_cfg('inference.compile')
+        if compile_mode is not None:
+            self.tracker.models.compile = compile_mode
+        cache = self.get_cfg('inference.cache', self.TYPE_INT)
+        if cache > 0:
+            self.tracker.loader.size = cache
+        if self.config.has_option("CONFIG", 'inference.crop'):
+            self.tracker.models.crop = self.get_cfg('inference.crop', self.TYPE_BOOL)
+        propagate = self.get_cfg('inference.propagate')
+        if propagate is not None:
+            self.tracker.propagator.mode = propagate
+        self.tracker.propagator.interval = max(1, self.get_cfg('inference.interval', self.TYPE_INT))
+        if self.config.has_option("CONFIG", 'inference.batch'):
+            self.tracker.batcher.enabled = self.get_cfg('inference.batch', self.TYPE_BOOL)
+
+        # motion gate
+        if self.config.has_option("CONFIG", 'gate.enabled'):
+            self.tracker.gate.enabled = self.get_cfg('gate.enabled', self.TYPE_BOOL)
+            self.tracker.gate.threshold = self.get_cfg('gate.threshold', self.TYPE_FLOAT)
+            self.tracker.gate.refresh = self.get_cfg('gate.refresh', self.TYPE_INT)
+
+        # movement detector
+        engine = self.get_cfg('movement.engine')
+        if engine is not None:
+            self.tracker.models.movement_engine = engine
+        if self.config.has_option("CONFIG", 'movement.width'):
+            self.tracker.models.movement_width = self.get_cfg('movement.width', self.TYPE_INT)
+        if self.config.has_option("CONFIG", 'movement.min_area'):
+            self.tracker.models.movement_min_area = self.get_cfg('movement.min_area', self.TYPE_FLOAT)
+        if self.config.has_option("CONFIG", 'movement.merge'):
+            self.tracker.models.movement_merge = self.get_cfg('movement.merge', self.TYPE_FLOAT)
+        egomotion = self.get_cfg('movement.egomotion')
+        if egomotion is not None:
+            self.tracker.models.movement_egomotion = egomotion
+
         # target
         self.tracker.target_mode = self.get_cfg('target.mode')
         self.tracker.target_point = self.get_cfg('target.point')
@@ -143,9 +188,11 @@ class Storage:
         self.tracker.render.text = self.get_cfg('render.text', self.TYPE_BOOL)
         self.tracker.render.bounds = self.get_cfg('render.bounds', self.TYPE_BOOL)
         self.tracker.render.console = self.get_cfg('render.console', self.TYPE_BOOL)
-        self.tracker.render.montage_columns = self.get_cfg('render.montage.cols', self.TYPE_INT)
-        self.tracker.render.montage_rows = self.get_cfg('render.montage.rows', self.TYPE_INT)
-        self.tracker.render.montage_width = self.get_cfg('render.montage.width', self.TYPE_INT)
+        self.tracker.montage.columns = self.get_cfg('render.montage.cols', self.TYPE_INT)
+        self.tracker.montage.rows = self.get_cfg('render.montage.rows', self.TYPE_INT)
+        self.tracker.montage.width = self.get_cfg('render.montage.width', self.TYPE_INT)
+        if self.config.has_option("CONFIG", 'render.montage.interval'):
+            self.tracker.montage.interval = self.get_cfg('render.montage.interval', self.TYPE_INT)
         self.tracker.render.simulator = self.get_cfg('servo.simulator', self.TYPE_BOOL)
 
         # render / overlay
@@ -187,11 +234,18 @@ class Storage:
         self.tracker.remote.CLIENT_HANG_TIME = self.get_cfg('clients.hang_time', self.TYPE_INT)
         self.tracker.remote.CLIENT_INACTIVE_TIME = self.get_cfg('clients.inactive_time', self.TYPE_INT)
         self.tracker.remote.STREAM_JPEG = self.get_cfg('clients.stream.jpeg', self.TYPE_BOOL)
+        ingest = self.get_cfg('clients.stream.ingest')
+        if ingest is not None:
+            self.tracker.remote.ingest.engine = ingest
+        if self.config.has_option("CONFIG", 'clients.stream.decoders'):
+            self.tracker.remote.decoder.workers = self.get_cfg('clients.stream.decoders', self.TYPE_INT)
 
         # encryption
         self.tracker.encrypt.enabled_video = self.tracker.storage.get_cfg('security.aes.video', self.TYPE_BOOL)
         self.tracker.encrypt.enabled_data = self.tracker.storage.get_cfg('security.aes.data', self.TYPE_BOOL)
         self.tracker.encrypt.raw_key = self.tracker.storage.get_cfg('security.aes.key')
+        if self.config.has_option("CONFIG", 'security.aes.wire'):
+            self.tracker.encrypt.wire = self.get_cfg('security.aes.wire')
 
         # REQUIRED: auto-enable JPEG compression if encryption is enabled
         if self.tracker.encrypt.enabled_video:
@@ -402,6 +456,31 @@ class Storage:
         cfg['CONFIG']['app.disabled'] = str(int(self.tracker.disabled))
         cfg['CONFIG']['app.ai'] = str(int(self.tracker.ai_enabled))
 
+        # inference
+        cfg['CONFIG']['inference.async'] = str(int(self.tracker.inference.enabled))
+        cfg['CONFIG']['inference.backend'] = str(self.tracker.models.backend)
+        cfg['CONFIG']['inference.threads'] = str(self.tracker.models.threads)
+        cfg['CONFIG']['inference.inter_threads'] = str(self.tracker.models.inter_threads)
+        cfg['CONFIG']['inference.cv_threads'] = str(self.tracker.models.cv_threads)
+        cfg['CONFIG']['inference.compile'] = str(self.tracker.models.compile)
+        cfg['CONFIG']['inference.crop'] = str(int(self.tracker.models.crop))
+        cfg['CONFIG']['inference.cache'] = str(self.tracker.loader.size)
+        cfg['CONFIG']['inference.propagate'] = str(self.tracker.propagator.mode)
+        cfg['CONFIG']['inference.interval'] = str(self.tracker.propagator.interval)
+        cfg['CONFIG']['inference.batch'] = str(int(self.tracker.batcher.enabled))
+
+        # motion gate
+        cfg['CONFIG']['gate.enabled'] = str(int(self.tracker.gate.enabled))
+        cfg['CONFIG']['gate.threshold'] = str(self.tracker.gate.threshold)
+        cfg['CONFIG']['gate.refresh'] = str(self.tracker.gate.refresh)
+
+        # movement detector
+        cfg['CONFIG']['movement.engine'] = str(self.tracker.models.movement_engine)
+        cfg['CONFIG']['movement.width'] = str(self.tracker.models.movement_width)
+        cfg['CONFIG']['movement.min_area'] = str(self.tracker.models.movement_min_area)
+        cfg['CONFIG']['movement.merge'] = str(self.tracker.models.movement_merge)
+        cfg['CONFIG']['movement.egomotion'] = str(self.tracker.models.movement_egomotion)
+
         # camera
         cfg['CONFIG']['camera.idx'] = str(self.tracker.camera.idx)
         cfg['CONFIG']['camera.fov.x'] = str(int(self.tracker.camera.fov[0]))
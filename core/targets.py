@@ -8,6 +8,12 @@
 # Updated At: 2023.03.27 02:00
 # =============================================================================
 
+import numpy as np
+
+from core.detections import Detections
+from core.geometry import in_boxes
+
+
 class Targets:
     def __init__(self, tracker=None):
         """
@@ -147,7 +153,11 @@ class Targets:
         if self.tracker.wrapper is None:
             return target
 
-        tmp = self.tracker.wrapper.get_target_point(name, idx)
+        # target points cached for current frame
+        if isinstance(self.tracker.objects, Detections) and name in self.tracker.objects.anchors:
+            tmp = self.tracker.objects.get_anchor(name, idx)
+        else:
+            tmp = self.tracker.wrapper.get_target_point(name, idx)
         if tmp is not None:
             target = tmp
 
@@ -195,13 +205,15 @@ class Targets:
         if self.tracker.render.simulator:
             coords[0] -= self.tracker.dx
             coords[1] -= self.tracker.dy
-        idx = 0
-        for obj in self.tracker.objects:
-            if self.tracker.IDX_BOX in obj.keys():
-                if self.tracker.keypoints.check_bounding(coords, obj[self.tracker.IDX_BOX]):
-                    self.switch_target(idx)
-                    return
-            idx += 1
+        if self.tracker.objects is None or len(self.tracker.objects) == 0:
+            return
+        if isinstance(self.tracker.objects, Detections):
+            boxes = self.tracker.objects.boxes
+        else:
+            boxes = [obj.get(self.tracker.IDX_BOX, [0, 0, -1, -1]) for obj in self.tracker.objects]
+        matched = np.flatnonzero(in_boxes(coords, boxes)[0])
+        if len(matched) > 0:
+            self.switch_target(int(matched[0]))
 
     def enable_lock(self):
         """Enable lock mode"""
@@ -9,7 +9,6 @@
 # =============================================================================
 
 import time
-import numpy as np
 from PySide6.QtCore import QThread, Signal
 
 
@@ -26,7 +25,6 @@ class RemoteVideoThread(QThread):
 
     started_signal = Signal()
     finished_signal = Signal()
-    handle_video_signal = Signal(np.ndarray)
 
     def run(self):
         """Run thread"""
@@ -40,13 +38,11 @@ class RemoteVideoThread(QThread):
                 time.sleep(0.01)
                 continue
 
+            # current client frame is passed to render loop through frame ring, montages are handled in separate way
             if self.window.tracker.remote.active:
-                self.window.tracker.capture = self.window.tracker.handle(self.window.tracker.SOURCE_REMOTE)
-                for ip in self.window.tracker.capture:
-                    # single view only, show only current. montages are handled in separate way
-                    if ip == self.window.tracker.remote_ip:
-                        frame = self.window.tracker.capture[ip]
-                        self.handle_video_signal.emit(frame)  # signal to handle video frame
+                self.window.tracker.handle(self.window.tracker.SOURCE_REMOTE)
+            else:
+                time.sleep(0.01)
 
         self.finished_signal.emit()  # send signal on thread exit
 
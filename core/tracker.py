@@ -11,10 +11,7 @@
 import numpy as np
 import time
 import re
-from wrapper.movenet import Movenet
-from wrapper.mobilenet import Mobilenet
-from wrapper.opencv_movement_detector import OpenCVMovementDetector
-from core.controller.main import Controller
+from importlib import import_module
 from core.remote import Remote
 from core.rendering import Rendering
 from core.keypoints import Keypoints
@@ -33,22 +30,33 @@ from core.targets import Targets
 from core.target import Target
 from core.finder import Finder
 from core.matcher import Matcher
+from core.candidates import Candidates
 from core.filter import Filter
 from core.area import Area
 from core.patrol import Patrol
 from core.action import Action
 from core.sorter import Sorter
-from core.mouse import Mouse
 from core.serial import Serial
 from core.command import Command
 from core.info import Info
 from core.drawing import Drawing
 from core.video_filter import VideoFilter
 from core.configurator import Configurator
-from core.keyboard import Keyboard
 from core.status import Status
 from core.encrypt import Encrypt
 from core.updater import Updater
+from core.inference import Inference
+from core.models import Models
+from core.propagator import Propagator
+from core.batcher import Batcher
+from core.gate import Gate
+from core.montage import Montage
+from core.loader import Loader
+from core.presenter import Presenter
+from core.profiler import Profiler
+from core.recorder import Recorder
+from core.replay import Replay
+from core.benchmark import Benchmark
 
 
 class Tracker:
@@ -108,6 +116,23 @@ class Tracker:
     IDX_BOX = 6
     IDX_CENTER = 7
 
+    # model wrappers registry, name: (module, class), wrapper module (and TensorFlow) is imported on first use
+    WRAPPERS = {
+        'movenet': ('wrapper.movenet', 'Movenet'),
+        'mobilenet': ('wrapper.mobilenet', 'Mobilenet'),
+        'opencv_movement_detect': ('wrapper.opencv_movement_detector', 'OpenCVMovementDetector'),
+    }
+
+    # models, model name: wrapper name
+    MODELS = {
+        'movenet_single_pose_lightning_4': 'movenet',
+        'movenet_single_pose_thunder_4': 'movenet',
+        'movenet_multi_pose_lightning_1': 'movenet',
+        'mobilenet': 'mobilenet',
+        'opencv_movement_detect_single': 'opencv_movement_detect',
+        'opencv_movement_detect_multi': 'opencv_movement_detect',
+    }
+
     # states
     STATE_IDLE = 'IDLE'
     STATE_SEARCHING = 'SEARCHING'
@@ -116,10 +141,11 @@ class Tracker:
     STATE_TARGET = 'TARGET'
     STATE_ACTION = 'ACTION'
 
-    def __init__(self, window=None):
+    def __init__(self, window=None, headless=False):
         """
         App main core class
         :param window: main window
+        :param headless: run without UI (no Qt imports)
         """
         self.version = None
         self.build = None
@@ -127,20 +153,18 @@ class Tracker:
         self.email = "info@servocam.org"
         self.www = "https://servocam.org"
 
-        self.wrappers = {}
         self.filters = {}
         self.devices = {}
         self.remote_status = {}
         self.remote_status['-'] = None
 
-        self.wrappers['movenet'] = Movenet(self)
-        self.wrappers['mobilenet'] = Mobilenet(self)
-        self.wrappers['opencv_movement_detect'] = OpenCVMovementDetector(self)
-
         self.wrapper = None
         self.window = window
+        self.headless = headless
 
         # classes
+        self.profiler = Profiler(self)
+        self.profiler.mark(self.profiler.STARTUP_IMPORT)
         self.render = Rendering(self)
         self.keypoints = Keypoints(self)
         self.remote = Remote(self)
@@ -149,10 +173,8 @@ class Tracker:
         self.video = Video(self)
         self.stream = Webstream(self)
         self.manual = Manual(self)
-        self.mouse = Mouse(self)
         self.debug = Debug(self)
         self.overlay = Overlay(self)
-        self.controller = Controller(self)
         self.console = Console(self)
         self.storage = Storage(self)
         self.servo = Servo(self)
@@ -161,6 +183,7 @@ class Tracker:
         self.target = Target(self)
         self.finder = Finder(self)
         self.matcher = Matcher(self)
+        self.candidates = Candidates(self)
         self.filter = Filter(self)
         self.area = Area(self)
         self.sorter = Sorter(self)
@@ -172,10 +195,32 @@ class Tracker:
         self.drawing = Drawing(self)
         self.video_filter = VideoFilter(self)
         self.configurator = Configurator(self)
-        self.keyboard = Keyboard(self)
         self.status = Status(self)
         self.encrypt = Encrypt(self)
         self.updater = Updater(self)
+        self.inference = Inference(self)
+        self.models = Models(self)
+        self.propagator = Propagator(self)
+        self.batcher = Batcher(self)
+        self.gate = Gate(self)
+        self.montage = Montage(self)
+        self.loader = Loader(self)
+        self.recorder = Recorder(self)
+        self.replay = Replay(self)
+        self.benchmark = Benchmark(self)
+
+        # UI bound classes, in headless mode UI work goes to no-op presenter and Qt is never imported
+        if not self.headless:
+            from core.controller.main import Controller
+            from core.mouse import Mouse
+            from core.keyboard import Keyboard
+            self.controller = Controller(self)
+            self.mouse = Mouse(self)
+            self.keyboard = Keyboard(self)
+        else:
+            self.controller = Presenter(self)
+            self.mouse = Presenter(self)
+            self.keyboard = Presenter(self)
 
         self.source = self.SOURCE_LOCAL
         self.output = None
@@ -184,6 +229,8 @@ class Tracker:
         self.dy = 0
         self.video_dim = (0, 0)
         self.objects = None
+        self.objects_frame = 0
+        self.frame_id = 0
         self.model_name = None
         self.video_url = None
         self.stream_url = None
@@ -217,36 +264,21 @@ class Tracker:
         }
 
         self.storage.init()  # load and append config.ini
+        self.models.configure()  # apply thread pools config
         self.load_version()  # load version and build info
+        self.profiler.mark(self.profiler.STARTUP_CONFIG)
 
-    def prepare(self, model_name=None):
+    def get_wrapper(self, name):
         """
-        Prepare model by name
+        Create model wrapper by name, wrapper module is imported on first use
 
-        :param model_name: model name
-        """
-        # unload current model, clear memory, etc.
-        if self.wrapper is not None:
-            self.wrapper.unload()
-        self.sorter.reset()
-
-        # prepare wrapper for model
-        if model_name == 'movenet_single_pose_lightning_4' \
-                or model_name == 'movenet_single_pose_thunder_4' \
-                or model_name == 'movenet_multi_pose_lightning_1':
-            self.wrapper = self.wrappers['movenet']
-        elif model_name == 'mobilenet':
-            self.wrapper = self.wrappers['mobilenet']
-        elif model_name == 'opencv_movement_detect_single' \
-                or model_name == 'opencv_movement_detect_multi':
-            self.wrapper = self.wrappers['opencv_movement_detect']
-        else:
-            self.wrapper = None
+        Every loaded model has its own wrapper instance (kept in loader cache).
 
-        # init model
-        if self.wrapper is not None:
-            self.wrapper.prepare(model_name)
-        self.model_name = model_name
+        :param name: wrapper name
+        :return: wrapper instance
+        """
+        module, cls = self.WRAPPERS[name]
+        return getattr(import_module(module), cls)(self)
 
     def init(self, source, app=False):
         """
@@ -282,11 +314,11 @@ class Tracker:
 
     def exec_console(self, args):
         """
-        Console mode
+        Console (headless) mode
 
         :param args: console arguments
         """
-        print("Servo Cam console mode started. Type 'q' for exit.")
+        print("Servo Cam headless mode started. Press Ctrl+C to exit.")
         self.console.handle(args)  # app loop
 
     def handle(self, mode):
@@ -296,14 +328,17 @@ class Tracker:
         :param mode: source name
         :return: source handle
         """
+        capture = None
         if mode == self.SOURCE_LOCAL:
-            return self.camera.handle(self.camera.idx)
+            capture = self.camera.handle(self.camera.idx)
         elif mode == self.SOURCE_VIDEO:
-            return self.video.handle(self.video_url)
+            capture = self.video.handle(self.video_url)
         elif mode == self.SOURCE_STREAM:
-            return self.stream.handle(self.stream_url)
+            capture = self.stream.handle(self.stream_url)
         elif mode == self.SOURCE_REMOTE:
-            return self.remote.handle(self.remote_ip)
+            capture = self.remote.handle(self.remote_ip)
+        self.profiler.mark(self.profiler.STARTUP_CAMERA)  # source opened
+        return capture
 
     def run(self, frame):
         """
@@ -312,14 +347,81 @@ class Tracker:
         :param frame: frame
         :return: frame
         """
-        self.objects = []
-        if self.ai_enabled and not self.disabled and self.wrapper is not None:
-            self.wrapper.predict(frame)
+        self.frame_id += 1
+        if not self.ai_enabled or self.disabled or self.wrapper is None:
+            self.objects = []
+            return frame
+
+        if self.propagator.is_enabled():
+            self.profiler.start(self.profiler.STAGE_PROPAGATE)
+            self.propagator.update(frame, self.frame_id)
+            self.profiler.stop(self.profiler.STAGE_PROPAGATE)
+        else:
+            self.propagator.update(frame, self.frame_id)  # frame id only
+
+        if self.replay.enabled:
+            self.replay.predict(frame)  # recorded predictions schedule
+        elif self.inference.enabled:
+            # async mode, use the most recent completed predictions
+            if self.check_gate(frame):
+                self.inference.push(frame, self.frame_id)
+            result = self.inference.fetch()
+            if result is not None:
+                self.objects_frame, self.objects = result
+                self.profiler.start(self.profiler.STAGE_SORTER)
+                self.sorter.apply()
+                self.profiler.stop(self.profiler.STAGE_SORTER)
+                self.propagate(True)
+            elif self.objects is None:
+                self.objects = []
+            else:
+                self.propagate(False)
+        elif self.propagator.should_predict(self.frame_id, self.objects_frame) and self.check_gate(frame):
+            self.profiler.start(self.profiler.STAGE_PREDICT)
+            self.objects = self.batcher.predict(self.wrapper, frame)
+            self.objects_frame = self.frame_id
+            self.profiler.stop(self.profiler.STAGE_PREDICT)
+
+            self.profiler.start(self.profiler.STAGE_SORTER)
             self.sorter.apply()
+            self.profiler.stop(self.profiler.STAGE_SORTER)
+            self.propagate(True)
+        else:
+            self.propagate(False)
         return frame
 
+    def check_gate(self, frame):
+        """
+        Check motion gate, static scene frames are not predicted
+
+        :param frame: frame
+        :return: True if predict
+        """
+        self.profiler.start(self.profiler.STAGE_GATE)
+        result = self.gate.should_predict(frame, self.frame_id)
+        self.profiler.stop(self.profiler.STAGE_GATE)
+        return result
+
+    def propagate(self, keyframe):
+        """
+        Propagate objects to current frame
+
+        :param keyframe: True if objects were just predicted
+        """
+        if not self.propagator.is_enabled():
+            return
+        self.profiler.start(self.profiler.STAGE_PROPAGATE)
+        if keyframe:
+            self.propagator.keyframe(self.objects, self.objects_frame)
+        else:
+            self.propagator.apply(self.objects)
+        self.profiler.stop(self.profiler.STAGE_PROPAGATE)
+
     def update(self):
         """Update frame, process, etc. (handle every frame)"""
+        self.profiler.start(self.profiler.STAGE_FRAME)
+        self.loader.update()  # swap in model loaded in background
+
         # get current active source frame
         if not self.paused and not self.disabled:
             self.output = self.render.get_frame()
@@ -328,19 +430,23 @@ class Tracker:
         self.output, w, h = self.render.process(self.output)
 
         # collect UI data, status, etc.
+        self.profiler.start(self.profiler.STAGE_UI)
         self.controller.collect()
 
         # update controls
         self.manual.update()
         self.controller.update()
         self.mouse.update()
+        self.profiler.stop(self.profiler.STAGE_UI)
 
         # append output to overlay renderer
         self.overlay.img = self.output
 
         # update targeting
         if self.target_mode != self.TARGET_MODE_OFF:
+            self.profiler.start(self.profiler.STAGE_TARGETING)
             self.targeting.update()
+            self.profiler.stop(self.profiler.STAGE_TARGETING)
 
         # update source handlers
         if self.source == self.SOURCE_REMOTE:
@@ -352,23 +458,31 @@ class Tracker:
         if not self.disabled:
             self.command.update()
 
+        # append frame, objects and command to recording
+        self.recorder.append()
+
         # update remote status
+        self.profiler.start(self.profiler.STAGE_OVERLAY)
         self.overlay.draw_remote_status()
         self.overlay.draw_info()
 
         # on video overlay drawing
         if self.drawing.enabled:
             self.drawing.update()
+        self.profiler.stop(self.profiler.STAGE_OVERLAY)
 
         # render view
+        self.profiler.start(self.profiler.STAGE_RENDER)
         if self.output is not None:
             self.render.render(self.output, w, h)
 
         # montage view (multiple cameras preview)
         if self.source == self.SOURCE_REMOTE and self.render.montage:
             self.render.append_montage()
+        self.profiler.stop(self.profiler.STAGE_RENDER)
 
         # update debug and clients
+        self.profiler.start(self.profiler.STAGE_UI)
         if self.window is not None:
             if self.is_debug:
                 self.debug.update()
@@ -377,9 +491,9 @@ class Tracker:
             # update remote clients
             self.window.ui.toolbox.remote.update()
 
-        # video controls update (play/pause, etc.)
-        if self.window.controls_tabs.currentIndex() == 4:  # 4 = video tab
-            self.controller.video.update()
+            # video controls update (play/pause, etc.)
+            if self.window.controls_tabs.currentIndex() == 4:  # 4 = video tab
+                self.controller.video.update()
 
         # update device status
         if not self.disabled:
@@ -387,15 +501,22 @@ class Tracker:
 
         # update status
         self.controller.status.handle()
+        self.profiler.stop(self.profiler.STAGE_UI)
 
         # reset state indicator
         self.sockets.reset_state()
         self.serial.reset_state()
 
+        if self.output is not None:
+            self.profiler.mark(self.profiler.STARTUP_FIRST_FRAME)
+
         # fps / ts calculation
         self.current_fps = round(1 / (time.time() - self.current_ts), 1)
         self.current_ts = time.time()
 
+        self.profiler.stop(self.profiler.STAGE_FRAME)
+        self.profiler.commit()
+
     def release(self):
         """Release all captures"""
         for ip in self.capture:
@@ -407,16 +528,16 @@ class Tracker:
         self.capture = {}
         time.sleep(0.01)
 
-    def switch_model(self, model):
+    def switch_model(self, model, wait=False):
         """
         Switch model by name
 
+        Model is loaded on background thread and swapped in when ready, current model runs meanwhile.
+
         :param model: model name
+        :param wait: block until model is loaded
         """
-        self.disabled = True
-        self.prepare(model)
-        self.disabled = False
-        self.debug.log("[MODEL] SWITCHED TO: " + str(model))
+        self.loader.load(model, wait)
 
     def switch_cam(self, idx):
         """
@@ -508,6 +629,8 @@ class Tracker:
 
         if self.wrapper is not None:
             self.wrapper.reset()
+        self.inference.reset()
+        self.objects = []
 
     def count_detected(self):
         """
@@ -556,6 +679,8 @@ class Tracker:
 
         if self.wrapper is not None:
             self.wrapper.reset()
+        self.inference.reset()
+        self.objects = []
 
     def load_version(self):
         """Load version info from __init__.py"""
@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import numpy as np
+
+from core.geometry import iou, distances
+
+
+def assign(cost):
+    """
+    Solve linear assignment problem (Hungarian method, minimal total cost)
+
+    :param cost: N x M cost matrix
+    :return: list of (row, col) pairs
+    """
+    n, m = cost.shape
+    if n == 0 or m == 0:
+        return []
+
+    transposed = n > m
+    if transposed:
+        cost = cost.T
+        n, m = m, n
+
+    # potentials and matching, 1-based with column 0 as virtual start
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)
+    way = np.zeros(m + 1, dtype=np.int64)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            cur = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (cur < minv[1:])
+            minv[1:][better] = cur[better]
+            way[1:][better] = j0
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[1:][free] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while True:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+            if j0 == 0:
+                break
+
+    pairs = []
+    for j in range(1, m + 1):
+        if p[j] > 0:
+            if transposed:
+                pairs.append((j - 1, int(p[j]) - 1))
+            else:
+                pairs.append((int(p[j]) - 1, j - 1))
+    return pairs
+
+
+class Tracks:
+    # track states
+    STATE_TENTATIVE = 'TENTATIVE'
+    STATE_CONFIRMED = 'CONFIRMED'
+    STATE_LOST = 'LOST'
+
+    # cost weights and gating
+    WEIGHT_IOU = 0.5
+    WEIGHT_DISTANCE = 0.5
+    MAX_DISTANCE = 0.2  # max center distance (normalized) to match
+    MAX_COST = 0.9
+
+    # lifecycle
+    MIN_HITS = 3  # matches needed to confirm track
+    MAX_AGE = 90  # frames to keep lost track
+
+    def __init__(self, tracker=None):
+        """
+        Multi object tracker
+
+        Detections are matched to tracks by global assignment on IoU / center distance cost,
+        tracks go through tentative -> confirmed -> lost lifecycle and IDs are never reused.
+
+        :param tracker: tracker object
+        """
+        self.tracker = tracker
+        self.tracks = {}  # id: track
+        self.mapping = {}  # id: detection idx in current frame
+        self.next_id = 1
+        self.frame = 0
+
+    def reset(self):
+        """Remove all tracks (IDs are not reused)"""
+        self.tracks = {}
+        self.mapping = {}
+
+    def predict(self, ids):
+        """
+        Predict track boxes for current frame (constant velocity)
+
+        :param ids: track ids
+        :return: N x 4 boxes
+        """
+        if len(ids) == 0:
+            return np.zeros((0, 4), dtype=np.float32)
+        boxes = np.array([self.tracks[id]['box'] for id in ids], dtype=np.float32)
+        velocity = np.array([self.tracks[id]['velocity'] for id in ids], dtype=np.float32)
+        misses = np.array([self.tracks[id]['misses'] for id in ids], dtype=np.float32)
+        boxes[:, :2] += velocity * (misses[:, None] + 1)
+        return boxes
+
+    def get_cost(self, boxes, centers, predicted):
+        """
+        Build cost matrix (tracks x detections)
+
+        :param boxes: detections boxes
+        :param centers: detections centers
+        :param predicted: predicted tracks boxes
+        :return: cost matrix
+        """
+        predicted_centers = predicted[:, :2] + predicted[:, 2:] / 2
+        distance = distances(predicted_centers, centers)
+        cost = self.WEIGHT_IOU * (1 - iou(predicted, boxes)) \
+            + self.WEIGHT_DISTANCE * np.minimum(distance / self.MAX_DISTANCE, 1)
+        cost[distance > self.MAX_DISTANCE] = self.MAX_COST + 1  # gating
+        return cost
+
+    def update(self, detections):
+        """
+        Match detections with tracks and assign IDs
+
+        :param detections: Detections
+        """
+        self.frame += 1
+        ids = list(self.tracks.keys())
+        predicted = self.predict(ids)
+        cost = self.get_cost(detections.boxes, detections.centers, predicted)
+
+        matched_tracks = set()
+        matched_detections = set()
+        self.mapping = {}
+        for row, col in assign(cost):
+            if cost[row, col] > self.MAX_COST:
+                continue
+            id = ids[row]
+            track = self.tracks[id]
+            box = detections.boxes[col]
+            track['velocity'] = ((box[:2] - np.asarray(track['box'][:2])) / (track['misses'] + 1)).tolist()
+            track['box'] = box.tolist()
+            track['hits'] += 1
+            track['misses'] = 0
+            if track['state'] != self.STATE_TENTATIVE or track['hits'] >= self.MIN_HITS:
+                track['state'] = self.STATE_CONFIRMED
+            matched_tracks.add(id)
+            matched_detections.add(col)
+            self.mapping[id] = col
+
+        # lost tracks
+        for id in ids:
+            if id in matched_tracks:
+                continue
+            track = self.tracks[id]
+            track['misses'] += 1
+            if track['state'] == self.STATE_TENTATIVE or track['misses'] > self.MAX_AGE:
+                del self.tracks[id]
+            else:
+                track['state'] = self.STATE_LOST
+
+        # new tracks
+        for col in range(len(detections)):
+            if col in matched_detections:
+                continue
+            id = self.next_id
+            self.next_id += 1
+            self.tracks[id] = {
+                'box': detections.boxes[col].tolist(),
+                'velocity': [0.0, 0.0],
+                'hits': 1,
+                'misses': 0,
+                'state': self.STATE_TENTATIVE,
+            }
+            self.mapping[id] = col
+
+        for id, col in self.mapping.items():
+            detections.ids[col] = id
@@ -276,6 +276,7 @@ class UIMenu:
         self.window.menu['debug.sockets'] = QAction(trans("menu.debug.sockets"), self.window, checkable=True)
         self.window.menu['debug.camera'] = QAction(trans("menu.debug.camera"), self.window, checkable=True)
         self.window.menu['debug.filter'] = QAction(trans("menu.debug.filter"), self.window, checkable=True)
+        self.window.menu['debug.export_profile'] = QAction(trans("menu.debug.export_profile"), self.window)
 
         self.window.menu['debug.performance'].triggered.connect(
             lambda: self.window.tracker.controller.debug.toggle('performance'))
@@ -309,6 +310,8 @@ class UIMenu:
             lambda: self.window.tracker.controller.debug.toggle('camera'))
         self.window.menu['debug.filter'].triggered.connect(
             lambda: self.window.tracker.controller.debug.toggle('filter'))
+        self.window.menu['debug.export_profile'].triggered.connect(
+            lambda: self.window.tracker.controller.debug.export_profile())
 
         debug_menu = self.window.menuBar().addMenu(trans("menu.debug"))
         debug_menu.addAction(self.window.menu['debug.performance'])
@@ -327,6 +330,8 @@ class UIMenu:
         debug_menu.addAction(self.window.menu['debug.sockets'])
         debug_menu.addAction(self.window.menu['debug.camera'])
         debug_menu.addAction(self.window.menu['debug.filter'])
+        debug_menu.addSeparator()
+        debug_menu.addAction(self.window.menu['debug.export_profile'])
 
     def setup_config(self):
         """Setup the config menu."""
@@ -13,6 +13,7 @@ import io
 import json
 import time
 import os
+import sys
 import cv2
 from core.storage import Storage
 
@@ -20,6 +21,31 @@ TRANSLATIONS = None
 STORAGE = Storage()
 
 
+def get_gpus():
+    """
+    List GPU devices, TensorFlow is never imported here
+
+    :return: list of GPU devices or None if TensorFlow is not loaded
+    """
+    if 'tensorflow' not in sys.modules:
+        return None
+    return sys.modules['tensorflow'].config.list_physical_devices('GPU')
+
+
+def get_rss():
+    """
+    Get resident memory of current process
+
+    :return: memory in MB or None if not supported (non Linux)
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
 def json_decode(data):
     """
     Convert json to dict
@@ -63,15 +89,19 @@ def from_json(json_data, key='CMD'):
         return None
 
 
-def to_json(data, key='CMD'):
+def to_json(data, key='CMD', extra=None):
     """
     Convert data to json
 
     :param data: data to convert
     :param key: key to use
+    :param extra: additional fields (dict)
     :return: json
     """
-    return json.dumps({'k': key, 'v': data, 't': round(time.time() * 1000)})
+    msg = {'k': key, 'v': data, 't': round(time.time() * 1000)}
+    if extra is not None:
+        msg.update(extra)
+    return json.dumps(msg)
 
 
 def trans(text):
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class DebugLog:
+    def __init__(self):
+        """Debug log collector"""
+        self.logs = []
+
+    def log(self, msg):
+        """
+        Collect log message
+
+        :param msg: message
+        """
+        self.logs.append(msg)
+
+
+@pytest.fixture
+def tracker():
+    """Minimal tracker with debug log only, tests attach modules they need"""
+    return SimpleNamespace(debug=DebugLog())
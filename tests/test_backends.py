@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import pytest
+
+from wrapper.backends import BACKENDS, Backend, get_backend
+
+
+def test_incomplete_backend_fails_on_create():
+    class Incomplete(Backend):
+        NAME = 'incomplete'
+
+        def load(self, model_name):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+    with pytest.raises(TypeError):
+        Backend()
+
+
+@pytest.mark.parametrize('name', list(BACKENDS))
+def test_backends_are_complete(name):
+    backend = get_backend(name, 2, 1)
+    assert backend.NAME == name
+    assert backend.threads == 2
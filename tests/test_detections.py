@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import json
+
+import numpy as np
+import pytest
+
+from core.detections import Detections
+
+BOXES = [[0.1, 0.2, 0.2, 0.4], [0.5, 0.5, 0.1, 0.1]]
+
+
+def make_detections():
+    keypoints = np.arange(2 * 17 * 3, dtype=np.float32).reshape(2, 17, 3) / 100
+    return Detections(BOXES, [0.9, 0.6], [1, 0], keypoints, ['person', 'car'])
+
+
+def test_compatibility_view():
+    detections = make_detections()
+    assert len(detections) == 2
+    obj = detections[0]
+    assert obj[Detections.IDX_BOX] == pytest.approx(BOXES[0])
+    assert obj[Detections.IDX_CENTER] == pytest.approx([0.2, 0.4])
+    assert obj[Detections.IDX_SCORE] == pytest.approx(0.9)
+    assert obj[Detections.IDX_CLASS] == 'car'
+    assert obj[Detections.IDX_ID] == 0
+    assert obj[Detections.IDX_KEYPOINTS].shape == (17, 3)
+    assert detections[-1][Detections.IDX_CLASS] == 'person'
+    assert Detections.IDX_BOX in obj
+    assert Detections.IDX_X not in obj
+    assert obj.get(Detections.IDX_X, 'default') == 'default'
+    with pytest.raises(KeyError):
+        obj[Detections.IDX_X]
+    with pytest.raises(IndexError):
+        detections[2]
+    assert [o[Detections.IDX_ID] for o in detections] == [0, 1]
+
+
+def test_setitem_writes_arrays():
+    detections = make_detections()
+    obj = detections[1]
+    obj[Detections.IDX_ID] = 7
+    obj[Detections.IDX_BOX] = [0.0, 0.0, 0.5, 0.5]
+    assert detections.ids[1] == 7
+    assert detections.centers[1].tolist() == pytest.approx([0.25, 0.25])
+    with pytest.raises(KeyError):
+        obj[Detections.IDX_CLASS] = 'dog'
+
+
+def test_empty():
+    detections = Detections()
+    assert len(detections) == 0
+    assert detections.boxes.shape == (0, 4)
+    assert detections.keypoints.shape == (0, 0, 3)
+    assert detections.to_list() == []
+    assert list(detections) == []
+
+
+def test_select_keeps_anchors_and_labels():
+    detections = make_detections()
+    detections.anchors['head'] = np.array([[0.1, 0.1], [0.2, 0.2]], dtype=np.float32)
+    selected = detections.select([1, 0])
+    np.testing.assert_allclose(selected.boxes, np.array(BOXES[::-1]), rtol=1e-6)
+    assert selected.get_anchor('head', 0) == pytest.approx([0.2, 0.2])
+    assert selected.get_anchor('missing', 0) is None
+    assert selected[1][Detections.IDX_CLASS] == 'car'
+
+    masked = detections.select(detections.scores > 0.7)
+    assert len(masked) == 1
+    assert masked[0][Detections.IDX_SCORE] == pytest.approx(0.9)
+
+
+def test_list_round_trip():
+    detections = make_detections()
+    detections.ids[:] = [3, 4]
+    objects = json.loads(json.dumps(detections.to_list()))  # as recorded
+    objects = [{int(key): value for key, value in obj.items()} for obj in objects]
+    restored = Detections.from_list(objects)
+    np.testing.assert_allclose(restored.boxes, detections.boxes)
+    assert restored.ids.tolist() == [3, 4]
+    assert [o[Detections.IDX_CLASS] for o in restored] == ['car', 'person']
+    assert restored.scores.tolist() == pytest.approx([0.9, 0.6])
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+from types import SimpleNamespace
+
+import pytest
+
+from core.servo import Servo
+from wrapper.egomotion import Egomotion
+
+W, H = 640, 480
+
+
+def make_egomotion(tracker, map_fov):
+    tracker.SOURCE_VIDEO = 'video'
+    tracker.source = 'camera'
+    tracker.camera = SimpleNamespace(fov=[60, 40])
+    tracker.render = SimpleNamespace(simulator=False)
+    tracker.command = SimpleNamespace(next_cmd=[Servo.ANGLE_START_X, Servo.ANGLE_START_Y])
+    tracker.servo = Servo(tracker)
+    tracker.servo.map_fov = map_fov
+    egomotion = Egomotion(tracker)
+    egomotion.mode = Egomotion.MODE_SERVO
+    egomotion.predict_servo(W, H)  # store initial command
+    return egomotion
+
+
+def turn_to(tracker, point):
+    """Step servo to point camera at image point"""
+    angle = tracker.servo.point_to_angle(point)
+    tracker.command.next_cmd = [tracker.command.next_cmd[0] + angle[0], tracker.command.next_cmd[1] + angle[1]]
+
+
+@pytest.mark.parametrize('map_fov', [False, True])
+@pytest.mark.parametrize('point', [(0.75, 0.8), (0.25, 0.2), (0.7, 0.3), (0.4, 0.6)])
+def test_servo_step_moves_target_to_center(tracker, map_fov, point):
+    egomotion = make_egomotion(tracker, map_fov)
+    turn_to(tracker, point)
+    assert tracker.command.next_cmd != [Servo.ANGLE_START_X, Servo.ANGLE_START_Y]
+    x, y = egomotion.predict_servo(W, H)
+
+    # target point is at frame center after camera turned to it
+    assert (x > 0) == (point[0] < 0.5)
+    assert (y > 0) == (point[1] < 0.5)
+    tolerance = [W / (tracker.camera.fov[0] if map_fov else Servo.ANGLE_MAX_X),
+                 H / (tracker.camera.fov[1] if map_fov else Servo.ANGLE_MAX_Y)]  # angle rounding
+    assert point[0] * W + x == pytest.approx(W / 2, abs=tolerance[0])
+    assert point[1] * H + y == pytest.approx(H / 2, abs=tolerance[1])
+
+
+def test_no_shift_without_servo_move(tracker):
+    egomotion = make_egomotion(tracker, True)
+    assert egomotion.predict_servo(W, H) == (0.0, 0.0)
+
+
+@pytest.mark.parametrize('case', ['simulator', 'video', 'disabled'])
+def test_no_shift_for_unmoved_camera(tracker, case):
+    egomotion = make_egomotion(tracker, True)
+    if case == 'simulator':
+        tracker.render.simulator = True
+    elif case == 'video':
+        tracker.source = tracker.SOURCE_VIDEO
+    else:
+        tracker.servo.enable = False
+    turn_to(tracker, (0.8, 0.8))
+    assert egomotion.predict_servo(W, H) == (0.0, 0.0)
+
+
+def test_disabled_axis(tracker):
+    egomotion = make_egomotion(tracker, True)
+    tracker.servo.y = False
+    turn_to(tracker, (0.8, 0.8))
+    x, y = egomotion.predict_servo(W, H)
+    assert x < 0
+    assert y == 0.0
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import json
+
+import pytest
+
+from core.encrypt import Encrypt
+
+IP = '192.168.1.10'
+
+
+def make_encrypt(tracker, key='secret'):
+    encrypt = Encrypt(tracker)
+    encrypt.raw_key = key
+    encrypt.enabled_data = True
+    encrypt.enabled_video = True
+    tracker.encrypt = encrypt
+    return encrypt
+
+
+@pytest.mark.parametrize('mode', [None, Encrypt.WIRE_GCM])
+def test_round_trip(tracker, mode):
+    encrypt = make_encrypt(tracker)
+    encrypt.set_mode(IP, mode)
+
+    assert encrypt.decrypt(encrypt.encrypt('{"k": "CMD"}', ip=IP), ip=IP) == '{"k": "CMD"}'
+    raw = bytes(range(256)) * 4
+    assert bytes(encrypt.decrypt(encrypt.encrypt(raw, True, IP), True, IP)) == raw
+
+
+def test_gcm_is_binary(tracker):
+    encrypt = make_encrypt(tracker)
+    encrypt.set_mode(IP, Encrypt.WIRE_GCM)
+    raw = b'\x00' * 100
+    enc = encrypt.encrypt(raw, True, IP)
+    assert len(enc) == len(raw) + Encrypt.GCM_NONCE_SIZE + Encrypt.GCM_TAG_SIZE
+
+
+@pytest.mark.parametrize('enc', [
+    b'short',
+    b'\x00' * 64,
+])
+def test_gcm_rejects_invalid(tracker, enc):
+    encrypt = make_encrypt(tracker)
+    encrypt.set_mode(IP, Encrypt.WIRE_GCM)
+    with pytest.raises(ValueError):
+        encrypt.decrypt(enc, True, IP)
+
+
+def test_gcm_rejects_tampered(tracker):
+    encrypt = make_encrypt(tracker)
+    encrypt.set_mode(IP, Encrypt.WIRE_GCM)
+    enc = bytearray(encrypt.encrypt(b'frame', True, IP))
+    enc[Encrypt.GCM_NONCE_SIZE] ^= 1
+    with pytest.raises(ValueError):
+        encrypt.decrypt(bytes(enc), True, IP)
+
+
+def test_gcm_rejects_other_key(tracker):
+    encrypt = make_encrypt(tracker)
+    encrypt.set_mode(IP, Encrypt.WIRE_GCM)
+    other = Encrypt(tracker)
+    other.raw_key = 'other'
+    other.set_mode(IP, Encrypt.WIRE_GCM)
+    with pytest.raises(ValueError):
+        encrypt.decrypt(other.encrypt(b'frame', True, IP), True, IP)
+
+
+@pytest.mark.parametrize('offered, confirmed, expected', [
+    (Encrypt.WIRE_GCM, Encrypt.WIRE_GCM, Encrypt.WIRE_GCM),
+    (Encrypt.WIRE_GCM, None, Encrypt.WIRE_CFB),  # client without binary wire mode
+    (Encrypt.WIRE_GCM, 'unknown', Encrypt.WIRE_CFB),
+    (Encrypt.WIRE_CFB, Encrypt.WIRE_GCM, Encrypt.WIRE_CFB),  # not offered
+])
+def test_negotiation(tracker, offered, confirmed, expected):
+    encrypt = make_encrypt(tracker)
+    encrypt.wire = offered
+    encrypt.set_mode(IP, confirmed)
+    assert encrypt.get_mode(IP) == expected
+    assert encrypt.get_mode('192.168.1.11') == Encrypt.WIRE_CFB
+    assert encrypt.get_mode() == Encrypt.WIRE_CFB  # handshake
+
+
+class Client:
+    def __init__(self, key, wire):
+        """
+        Simulated remote client (legacy handshake, optional binary wire mode)
+
+        :param key: AES key
+        :param wire: supported wire mode or None
+        """
+        self.encrypt = Encrypt(None)
+        self.encrypt.raw_key = key
+        self.wire = wire
+        self.mode = None
+        self.queue = []  # ACCEPT sent over data socket instead of handshake socket
+        self.via_data = False
+
+    def accept(self, msg):
+        """
+        Answer CONN with ACCEPT (both in legacy mode)
+
+        :param msg: encrypted CONN message
+        :return: encrypted ACCEPT message
+        """
+        conn = json.loads(self.encrypt.decrypt(msg))
+        assert conn['k'] == 'CONN'
+        accept = {'k': 'CMD', 'v': 'ACCEPT', 'hostname': 'client', 't': 0}
+        if self.wire is not None and conn.get('wire') == self.wire:
+            accept['wire'] = self.wire
+        return self.encrypt.encrypt(json.dumps(accept)), accept.get('wire')
+
+
+class PullSocket:
+    # data socket replacement, receives queued client messages
+    closed = False
+
+    def __init__(self, client):
+        self.client = client
+
+    def recv(self):
+        return self.client.queue.pop(0)
+
+
+class TmpSocket:
+    # handshake socket replacement, answers with simulated client
+    client = None
+
+    def __init__(self, *args, **kwargs):
+        self.response = None
+
+    def settimeout(self, timeout):
+        pass
+
+    def setsockopt(self, *args):
+        pass
+
+    def connect(self, address):
+        pass
+
+    def send(self, msg):
+        client = TmpSocket.client
+        response, client.mode = client.accept(msg)
+        if client.via_data:
+            client.queue.append(response)
+        else:
+            self.response = response
+
+    def recv(self, size):
+        if self.response is None:
+            raise TimeoutError('timed out')
+        return self.response
+
+    def close(self):
+        pass
+
+
+def make_remote(tracker, monkeypatch, client):
+    pytest.importorskip('zmq')
+    pytest.importorskip('imagezmq')
+    pytest.importorskip('simplejpeg')
+    from core import sockets as sockets_module
+    from core.remote import Remote
+    from core.sockets import Sockets
+
+    TmpSocket.client = client
+    monkeypatch.setattr(sockets_module.socket, 'socket', TmpSocket)
+
+    make_encrypt(tracker)
+    tracker.SOURCE_REMOTE = 'remote'
+    tracker.source = tracker.SOURCE_REMOTE
+    tracker.remote_ip = IP
+    tracker.remote_host = None
+    tracker.servo = type('Servo', (), {'remote': None})()
+    tracker.montage = type('Montage', (), {'remove': lambda self, ip: None})()
+    tracker.remote = Remote(tracker)
+    tracker.sockets = Sockets(tracker)
+    monkeypatch.setattr(tracker.sockets, 'init', lambda ip=None, force=False: None)
+    tracker.sockets.pull_socket[IP] = PullSocket(client)
+    return tracker.remote, tracker.sockets
+
+
+def test_reconnect_after_disconnect(tracker, monkeypatch):
+    client = Client('secret', Encrypt.WIRE_GCM)
+    remote, sockets = make_remote(tracker, monkeypatch, client)
+
+    sockets.connect(IP)
+    assert tracker.encrypt.get_mode(IP) == Encrypt.WIRE_GCM
+    assert client.mode == Encrypt.WIRE_GCM
+
+    remote.disconnect(IP)
+    assert tracker.encrypt.get_mode(IP) == Encrypt.WIRE_CFB
+
+    # client answers new handshake in legacy mode, server must read it
+    sockets.connect(IP)
+    assert tracker.encrypt.get_mode(IP) == Encrypt.WIRE_GCM
+    assert not any('Failed' in msg for msg in tracker.debug.logs)
+
+
+def test_reconnect_without_disconnect(tracker, monkeypatch):
+    client = Client('secret', Encrypt.WIRE_GCM)
+    remote, sockets = make_remote(tracker, monkeypatch, client)
+
+    sockets.connect(IP)
+    assert tracker.encrypt.get_mode(IP) == Encrypt.WIRE_GCM
+
+    # client restarted without binary wire mode support, stale mode is dropped on new CONN
+    client.wire = None
+    sockets.connect(IP)
+    assert tracker.encrypt.get_mode(IP) == Encrypt.WIRE_CFB
+    assert remote.clients[IP].hostname == 'client'
+
+
+def test_reconnect_accept_over_data_socket(tracker, monkeypatch):
+    client = Client('secret', Encrypt.WIRE_GCM)
+    remote, sockets = make_remote(tracker, monkeypatch, client)
+
+    sockets.connect(IP)
+    assert tracker.encrypt.get_mode(IP) == Encrypt.WIRE_GCM
+
+    # new handshake without disconnect, legacy ACCEPT arrives on data socket
+    client.via_data = True
+    sockets.connect(IP)
+    result = sockets.listen()
+    assert result is not None
+    sockets.handle_thread(result.decode('UTF-8'), IP)
+    assert tracker.encrypt.get_mode(IP) == Encrypt.WIRE_GCM
+
+    # binary data after negotiation
+    client.encrypt.modes[IP] = Encrypt.WIRE_GCM
+    client.queue.append(client.encrypt.encrypt('{"k": "CMD", "v": "OK"}', ip=IP))
+    assert json.loads(sockets.listen())['v'] == 'OK'
+
+
+@pytest.mark.parametrize('method', ['dispose', 'remove'])
+def test_mode_reset_on_client_drop(tracker, monkeypatch, method):
+    client = Client('secret', Encrypt.WIRE_GCM)
+    remote, sockets = make_remote(tracker, monkeypatch, client)
+    monkeypatch.setattr(remote, 'toggle_servo', lambda ip: None)
+
+    sockets.connect(IP)
+    assert tracker.encrypt.get_mode(IP) == Encrypt.WIRE_GCM
+    getattr(remote, method)(IP)
+    assert tracker.encrypt.get_mode(IP) == Encrypt.WIRE_CFB
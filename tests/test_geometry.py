@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import math
+
+import numpy as np
+import pytest
+
+from core import geometry
+from core.keypoints import Keypoints
+
+SIZES = [1, 3, 16, 17, 50]
+
+
+def scalar_iou(a, b):
+    w = min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0])
+    h = min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1])
+    inter = max(w, 0) * max(h, 0)
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union > 0 else 0
+
+
+def make_data(n, seed=0):
+    rng = np.random.default_rng(seed + n)
+    xy = rng.random((n, 2)) * 0.8
+    boxes = np.concatenate([xy, rng.random((n, 2)) * 0.2], axis=1)
+    boxes[0] = [0.4, 0.4, 0.1, 0.1]  # point [0.5, 0.5] on the edge
+    keypoints = rng.random((n, 17, 3))
+    return boxes, keypoints
+
+
+@pytest.fixture(params=['scalar', 'vectorized'])
+def keypoints(request, monkeypatch):
+    """Keypoints helpers forced to scalar or vectorized path"""
+    monkeypatch.setattr(geometry, 'SCALAR_MAX', 10 ** 6 if request.param == 'scalar' else 0)
+    return Keypoints()
+
+
+@pytest.mark.parametrize('n', SIZES)
+def test_iou_and_distances_match_scalar(n):
+    boxes, _ = make_data(n)
+    expected = [[scalar_iou(a, b) for b in boxes.tolist()] for a in boxes.tolist()]
+    np.testing.assert_allclose(geometry.iou(boxes, boxes), expected, atol=1e-12)
+
+    centers = geometry.centers(boxes)
+    expected = [[math.hypot(a[0] - b[0], a[1] - b[1]) for b in centers.tolist()] for a in centers.tolist()]
+    np.testing.assert_allclose(geometry.distances(centers, centers), expected, atol=1e-12)
+
+
+@pytest.mark.parametrize('n', SIZES)
+def test_boxes_from_keypoints_match_scalar(n):
+    _, keypoints = make_data(n)
+    vectorized = geometry.boxes_from_keypoints(keypoints)
+    for i in range(n):
+        np.testing.assert_allclose(vectorized[i], geometry.box_from_keypoints(keypoints[i].tolist()))
+    assert geometry.box_from_keypoints([]) == [0.0, 0.0, 0.0, 0.0]
+    assert geometry.boxes_from_keypoints(np.zeros((2, 0, 3))).tolist() == [[0.0] * 4] * 2
+
+
+def test_boxes_from_keypoints_min_score():
+    keypoints = np.array([[[0.1, 0.1, 0.9], [0.9, 0.9, 0.1], [0.3, 0.5, 0.8]],
+                          [[0.1, 0.1, 0.1], [0.2, 0.2, 0.1], [0.3, 0.3, 0.1]]])
+    boxes = geometry.boxes_from_keypoints(keypoints, 0.5)
+    np.testing.assert_allclose(boxes, [[0.1, 0.1, 0.2, 0.4], [0, 0, 0, 0]])
+
+
+@pytest.mark.parametrize('n', SIZES)
+def test_keypoints_paths_are_equivalent(keypoints, n):
+    boxes, kp = make_data(n)
+    point = [0.5, 0.5]
+    boxes_list = boxes.tolist()
+    centers = geometry.centers(boxes).tolist()
+
+    np.testing.assert_allclose(keypoints.build_bounding(kp[0]), geometry.boxes_from_keypoints(kp[0])[0])
+    np.testing.assert_allclose(keypoints.build_bounding(kp[0].tolist()), geometry.boxes_from_keypoints(kp[0])[0])
+
+    inside = geometry.in_boxes(point, boxes)[0]
+    distance = geometry.distances(point, centers)[0]
+    scores = keypoints.get_bounding_scores(point, boxes_list)
+    assert sorted(scores) == np.flatnonzero(inside).tolist()
+    assert 0 in scores  # edge is inside
+    for i, score in scores.items():
+        assert score == pytest.approx(distance[i])
+
+    scores = keypoints.get_bounding_scores_dict(point, {10 + i: {'box': box} for i, box in enumerate(boxes_list)})
+    assert sorted(scores) == [10 + i for i in np.flatnonzero(inside)]
+
+    scores = keypoints.get_center_scores(point, centers)
+    assert list(scores) == list(range(n))
+    np.testing.assert_allclose(list(scores.values()), distance)
+
+    boxes_dict = dict(enumerate(boxes_list))
+    assert keypoints.in_bounding(point, boxes_dict, '*') is True
+    assert keypoints.in_bounding([2.0, 2.0], boxes_dict, '*') is False
+    assert keypoints.in_bounding(point, {}, '*') is False
+    assert keypoints.in_bounding(point, boxes_dict, 0) is True
+
+    np.testing.assert_allclose(keypoints.get_mean_point(centers), np.mean(centers, axis=0))
+    assert keypoints.get_mean_point([]) is None
+
+
+def test_nearest():
+    points = [[0.1, 0.1], [0.5, 0.6], [0.9, 0.9]]
+    assert geometry.nearest([0.5, 0.5], points) == (1, pytest.approx(0.1))
+    assert geometry.nearest([0.5, 0.5], points, [True, False, True])[0] == 0
+    assert geometry.nearest([0.5, 0.5], points, [False, False, False]) == (None, None)
+    assert geometry.nearest([0.5, 0.5], np.zeros((0, 2))) == (None, None)
+    idx, distance = geometry.nearest_pairs([[0.0, 0.0], [1.0, 1.0]], points)
+    assert idx.tolist() == [0, 2]
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import json
+import socket
+import threading
+
+import numpy as np
+import pytest
+
+zmq = pytest.importorskip('zmq')
+imagezmq = pytest.importorskip('imagezmq')
+
+from core.ingest import Ingest  # noqa: E402
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def ingest(tracker, monkeypatch):
+    monkeypatch.setattr(Ingest, 'PORT_VIDEO', free_port())
+    ingest = Ingest(tracker)
+    ingest.start()
+    yield ingest
+    ingest.stop()
+
+
+def metadata(msg, image=None):
+    md = {'msg': msg}
+    if image is not None:
+        md.update(dtype=str(image.dtype), shape=image.shape)
+    return json.dumps(md).encode()
+
+
+def test_parse_image(tracker):
+    image = np.arange(2 * 3 * 3, dtype=np.uint8).reshape(2, 3, 3)
+    data, frame, is_jpeg = Ingest(tracker).parse(metadata('host@1', image), image.tobytes())
+    assert data == 'host@1'
+    assert is_jpeg is False
+    np.testing.assert_array_equal(frame, image)
+
+
+def test_parse_jpeg(tracker):
+    data, frame, is_jpeg = Ingest(tracker).parse(metadata('host@1'), b'\xff\xd8jpeg')
+    assert data == 'host@1'
+    assert is_jpeg is True
+    assert bytes(frame) == b'\xff\xd8jpeg'
+
+
+def test_parse_invalid_metadata(tracker):
+    assert Ingest(tracker).parse(b'not json', b'') is None
+
+
+def test_receive_nothing(ingest):
+    assert ingest.receive() == []
+
+
+def test_router_keeps_latest_frame_per_client(ingest):
+    context = zmq.Context.instance()
+    clients = []
+    for hostname in ['cam1', 'cam2']:
+        client = context.socket(zmq.DEALER)
+        client.setsockopt(zmq.LINGER, 0)
+        client.connect('tcp://127.0.0.1:{}'.format(Ingest.PORT_VIDEO))
+        for i in range(3):
+            client.send_multipart([b'', metadata('{}@{}'.format(hostname, i)), b'jpeg'])
+        clients.append(client)
+    client = clients[0]
+    client.send_multipart([b'', b'broken'])  # too short, answered and skipped
+
+    messages = []
+    for _ in range(20):
+        messages += ingest.receive()
+        if ingest.received == 6:
+            break
+    latest = {data.split('@')[0]: data for data, frame, is_jpeg in messages}
+    assert latest == {'cam1': 'cam1@2', 'cam2': 'cam2@2'}
+    assert ingest.received == 6
+    assert ingest.dropped == 6 - len(messages)  # older frames of client received in same call
+
+    # every message is answered, so REQ clients are never blocked
+    assert client.poll(1000)
+    replies = 0
+    while client.poll(100):
+        assert client.recv_multipart() == [b'', b'OK']
+        replies += 1
+    assert replies == 4
+    for client in clients:
+        client.close()
+
+
+def test_router_with_image_sender(ingest):
+    image = np.full((4, 6, 3), 7, dtype=np.uint8)
+    replies = []
+
+    def send():
+        sender = imagezmq.ImageSender('tcp://127.0.0.1:{}'.format(Ingest.PORT_VIDEO))
+        replies.append(sender.send_image('cam@1', image))
+        sender.close()
+
+    thread = threading.Thread(target=send)
+    thread.start()
+    messages = []
+    for _ in range(20):
+        messages = ingest.receive()
+        if messages:
+            break
+    thread.join(5)
+    assert replies == [b'OK']
+    data, frame, is_jpeg = messages[0]
+    assert data == 'cam@1'
+    assert is_jpeg is False
+    np.testing.assert_array_equal(frame, image)
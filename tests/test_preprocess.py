@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import numpy as np
+import pytest
+
+from wrapper.preprocess import Letterbox
+
+
+def frame_with_dot(w, h, x, y):
+    r = max(2, w // 64)  # dot stays visible after downscale
+    img = np.zeros((h, w, 3), dtype=np.uint8)
+    img[y - r:y + r + 1, x - r:x + r + 1] = 255
+    return img
+
+
+def find_dot(buffer):
+    """Dot center in buffer, normalized to model input"""
+    ys, xs = np.nonzero(buffer[0, :, :, 0] > 127)
+    return np.array([[(xs.mean() + 0.5) / buffer.shape[2], (ys.mean() + 0.5) / buffer.shape[1]]])
+
+
+@pytest.mark.parametrize('size', [(640, 480), (480, 640), (1280, 720), (192, 192), (100, 60)])
+@pytest.mark.parametrize('dot', [(0.25, 0.3), (0.5, 0.5), (0.8, 0.75)])
+def test_apply_maps_points_back(size, dot):
+    w, h = size
+    x, y = int(dot[0] * w), int(dot[1] * h)
+    letterbox = Letterbox(192, 192, np.int32)
+    buffer, scale, offset = letterbox.apply(frame_with_dot(w, h, x, y))
+    assert buffer.shape == (1, 192, 192, 3)
+    assert buffer.dtype == np.int32
+
+    point = letterbox.unmap_points(find_dot(buffer))[0]
+    tolerance = 2 / min(letterbox.size)  # resize rounding
+    assert point[0] == pytest.approx((x + 0.5) / w, abs=tolerance)
+    assert point[1] == pytest.approx((y + 0.5) / h, abs=tolerance)
+
+
+def test_apply_pads_and_centers():
+    letterbox = Letterbox(192, 192)
+    buffer, scale, offset = letterbox.apply(np.full((480, 640, 3), 255, dtype=np.uint8))
+    assert letterbox.size == (192, 144)
+    assert offset == (0, 24)
+    assert (buffer[0, :24] == 0).all() and (buffer[0, -24:] == 0).all()
+    assert (buffer[0, 24:168] == 255).all()
+
+
+@pytest.mark.parametrize('region', [
+    [300, 200, 150, 150],  # inside
+    [-50, 100, 200, 300],  # left part outside frame
+    [500, 380, 200, 200],  # right bottom part outside frame
+])
+def test_apply_region_maps_points_back(region):
+    w, h = 640, 480
+    x = int(max(0, region[0]) + min(w, region[0] + region[2])) // 2
+    y = int(max(0, region[1]) + min(h, region[1] + region[3])) // 2
+    letterbox = Letterbox(192, 192)
+    result = letterbox.apply_region(frame_with_dot(w, h, x, y), region)
+    assert result is not None
+    point = letterbox.unmap_points(find_dot(result[0]))[0]
+    assert point[0] * w == pytest.approx(x + 0.5, abs=2)
+    assert point[1] * h == pytest.approx(y + 0.5, abs=2)
+
+
+def test_apply_after_region_clears_buffer():
+    letterbox = Letterbox(192, 192)
+    white = np.full((480, 640, 3), 255, dtype=np.uint8)
+    letterbox.apply_region(white, [0, 0, 100, 100])
+    buffer = letterbox.apply(white)[0]
+    assert (buffer[0, :24] == 0).all()
+
+
+def test_apply_region_outside_frame():
+    letterbox = Letterbox(192, 192)
+    assert letterbox.apply_region(np.zeros((480, 640, 3), dtype=np.uint8), [700, 500, 100, 100]) is None
+
+
+def test_unmap_boxes():
+    w, h = 640, 480
+    letterbox = Letterbox(192, 192)
+    letterbox.apply(np.zeros((h, w, 3), dtype=np.uint8))
+    box = np.array([[0.25, 0.25, 0.5, 0.5]])  # in model input: 48..144 px, padding 24 px on y
+    letterbox.unmap_boxes(box)
+    np.testing.assert_allclose(box[0], [0.25, (48 - 24) / 144, 0.5, 96 / 144], atol=1e-6)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import itertools
+
+import numpy as np
+import pytest
+
+from core.detections import Detections
+from core.tracks import Tracks, assign
+
+
+def brute_force(cost):
+    """Min total cost of assignment of min(N, M) pairs"""
+    n, m = cost.shape
+    if n <= m:
+        return min(sum(cost[i, cols[i]] for i in range(n)) for cols in itertools.permutations(range(m), n))
+    return min(sum(cost[rows[j], j] for j in range(m)) for rows in itertools.permutations(range(n), m))
+
+
+@pytest.mark.parametrize('shape', [(1, 1), (2, 2), (3, 3), (5, 5), (2, 5), (5, 2), (4, 6), (6, 3)])
+def test_assign_matches_brute_force(shape):
+    rng = np.random.default_rng(sum(shape))
+    for _ in range(20):
+        cost = rng.random(shape)
+        pairs = assign(cost)
+        rows = [row for row, col in pairs]
+        cols = [col for row, col in pairs]
+        assert len(pairs) == min(shape)
+        assert len(set(rows)) == len(rows) and len(set(cols)) == len(cols)
+        assert sum(cost[row, col] for row, col in pairs) == pytest.approx(brute_force(cost))
+
+
+def test_assign_ties_and_integers():
+    cost = np.array([[1, 1, 1], [1, 1, 1], [1, 1, 0]], dtype=np.float64)
+    pairs = assign(cost)
+    assert (2, 2) in pairs
+    assert sum(cost[row, col] for row, col in pairs) == 2
+
+
+@pytest.mark.parametrize('shape', [(0, 0), (0, 3), (3, 0)])
+def test_assign_empty(shape):
+    assert assign(np.zeros(shape)) == []
+
+
+def test_assign_prefers_global_optimum():
+    # greedy nearest match for row 0 would take col 0 and force expensive pair for row 1
+    cost = np.array([[0.1, 0.2], [0.15, 0.9]])
+    assert sorted(assign(cost)) == [(0, 1), (1, 0)]
+
+
+def frame(boxes):
+    return Detections(np.array(boxes, dtype=np.float32))
+
+
+def test_tracks_keep_ids_for_moving_objects():
+    tracks = Tracks()
+    ids = None
+    for i in range(10):
+        dx = i * 0.01
+        detections = frame([[0.1 + dx, 0.1, 0.1, 0.2], [0.6 - dx, 0.5, 0.1, 0.2]])
+        if i % 2:
+            detections = detections.select([1, 0])  # order of model output changes
+        tracks.update(detections)
+        current = dict(zip(detections.boxes[:, 1].round(2).tolist(), detections.ids.tolist()))
+        if ids is not None:
+            assert current == ids
+        ids = current
+    assert len(set(ids.values())) == 2
+    assert all(track['state'] == Tracks.STATE_CONFIRMED for track in tracks.tracks.values())
+
+
+def test_tracks_lost_and_recovered():
+    tracks = Tracks()
+    for _ in range(Tracks.MIN_HITS):
+        detections = frame([[0.1, 0.1, 0.1, 0.2]])
+        tracks.update(detections)
+    id = int(detections.ids[0])
+
+    tracks.update(frame([]))
+    assert tracks.tracks[id]['state'] == Tracks.STATE_LOST
+
+    detections = frame([[0.1, 0.1, 0.1, 0.2]])
+    tracks.update(detections)
+    assert int(detections.ids[0]) == id
+    assert tracks.tracks[id]['state'] == Tracks.STATE_CONFIRMED
+
+
+def test_tracks_never_reuse_ids():
+    tracks = Tracks()
+    detections = frame([[0.1, 0.1, 0.1, 0.2]])
+    tracks.update(detections)
+    first = int(detections.ids[0])
+    tracks.update(frame([]))  # tentative track is dropped
+    assert first not in tracks.tracks
+
+    detections = frame([[0.1, 0.1, 0.1, 0.2]])
+    tracks.update(detections)
+    assert int(detections.ids[0]) != first
+
+
+def test_tracks_far_detection_is_new_track():
+    tracks = Tracks()
+    detections = frame([[0.1, 0.1, 0.1, 0.2]])
+    tracks.update(detections)
+    first = int(detections.ids[0])
+    detections = frame([[0.8, 0.7, 0.1, 0.2]])  # beyond MAX_DISTANCE
+    tracks.update(detections)
+    assert int(detections.ids[0]) != first
@@ -0,0 +1,351 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import os
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+# backend names
+BACKEND_TENSORFLOW = 'tensorflow'
+BACKEND_TFLITE = 'tflite'
+BACKEND_ONNX = 'onnx'
+
+# TensorFlow graph compile modes
+COMPILE_OFF = 'off'  # eager call of SavedModel signature
+COMPILE_FUNCTION = 'function'  # fixed-shape tf.function
+COMPILE_XLA = 'xla'  # fixed-shape tf.function with XLA JIT
+
+MODEL_DIR = os.path.join('.', 'model')
+
+
+def configure_tensorflow(threads=0, inter_threads=0):
+    """
+    Set TensorFlow thread pools, works only before TensorFlow runtime is initialized (first model load)
+
+    :param threads: intra-op threads (0 = default)
+    :param inter_threads: inter-op threads (0 = default)
+    """
+    import tensorflow as tf
+
+    try:
+        if threads > 0:
+            tf.config.threading.set_intra_op_parallelism_threads(threads)
+        if inter_threads > 0:
+            tf.config.threading.set_inter_op_parallelism_threads(inter_threads)
+    except RuntimeError:
+        pass  # already initialized
+
+
+def compile_function(func, shape, dtype, mode):
+    """
+    Wrap model call in tf.function with fixed input signature, so graph is traced once
+
+    :param func: model callable
+    :param shape: input shape
+    :param dtype: input TensorFlow dtype
+    :param mode: compile mode
+    :return: compiled callable or func if compile is off
+    """
+    import tensorflow as tf
+
+    if mode not in [COMPILE_FUNCTION, COMPILE_XLA]:
+        return func
+    return tf.function(func, input_signature=[tf.TensorSpec(shape, dtype)], jit_compile=mode == COMPILE_XLA)
+
+
+class Backend(ABC):
+    # backend name
+    NAME = None
+
+    # converted model file extension (None = SavedModel directory)
+    EXT = None
+
+    def __init__(self, threads=0, inter_threads=0, compile_mode=COMPILE_OFF, log=None):
+        """
+        Model inference backend base class
+
+        :param threads: number of CPU threads (0 = backend default)
+        :param inter_threads: number of inter-op threads (0 = backend default, TensorFlow only)
+        :param compile_mode: graph compile mode (TensorFlow only)
+        :param log: debug log function
+        """
+        self.log = log
+        self.threads = threads
+        self.inter_threads = inter_threads
+        self.compile_mode = compile_mode
+        self.compiled = None
+        self.model = None
+        self.net = None
+        self.batch = False  # model accepts batch of images in one call
+
+    @classmethod
+    def get_path(cls, model_name):
+        """
+        Get model path for backend
+
+        :param model_name: model name
+        :return: model path
+        """
+        if cls.EXT is None:
+            return os.path.join(MODEL_DIR, model_name)
+        return os.path.join(MODEL_DIR, model_name + cls.EXT)
+
+    @classmethod
+    @abstractmethod
+    def is_available(cls, model_name):
+        """
+        Check if backend runtime is installed and model exists
+
+        :param model_name: model name
+        :return: True if available
+        """
+
+    @abstractmethod
+    def load(self, model_name):
+        """
+        Load model
+
+        :param model_name: model name
+        """
+
+    @abstractmethod
+    def run(self, image):
+        """
+        Run inference
+
+        :param image: N x H x W x 3 int32 image (N = 1 if model has fixed batch size)
+        :return: model output_0 as numpy array
+        """
+
+    def compile(self, shape):
+        """
+        Compile model for fixed input shape, backends with own graph optimizer ignore it
+
+        :param shape: input shape (1 x H x W x 3)
+        """
+        pass
+
+    def run_batch(self, images):
+        """
+        Run inference on batch of images in one call, models with fixed batch size run images one by one
+
+        :param images: N x H x W x 3 int32 images
+        :return: model output_0 as numpy array (N x ...)
+        """
+        if len(images) > 1 and self.batch:
+            try:
+                return self.run(images)
+            except Exception:
+                self.batch = False  # batch dimension is fixed in model graph
+        return np.concatenate([self.run(images[i:i + 1]) for i in range(len(images))])
+
+    def unload(self):
+        """Unload model from memory"""
+        self.model = None
+        self.net = None
+        self.compiled = None
+
+
+class TensorflowBackend(Backend):
+    NAME = BACKEND_TENSORFLOW
+
+    @classmethod
+    def is_available(cls, model_name):
+        """
+        Check if TensorFlow is installed and SavedModel exists
+
+        :param model_name: model name
+        :return: True if available
+        """
+        try:
+            import tensorflow_hub  # noqa: F401
+        except ImportError:
+            return False
+        return os.path.isdir(cls.get_path(model_name))
+
+    def load(self, model_name):
+        """
+        Load SavedModel with TensorFlow Hub
+
+        :param model_name: model name
+        """
+        import tensorflow_hub as hub
+
+        configure_tensorflow(self.threads, self.inter_threads)
+        self.model = hub.load(self.get_path(model_name))
+        self.net = self.model.signatures['serving_default']
+        spec = list(self.net.structured_input_signature[1].values())[0]
+        self.batch = spec.shape[0] is None
+
+    def run(self, image):
+        """
+        Run SavedModel serving_default signature
+
+        :param image: N x H x W x 3 int32 image (N = 1 if model has fixed batch size)
+        :return: model output_0 as numpy array
+        """
+        import tensorflow as tf
+        if self.compiled is not None:
+            try:
+                return self.compiled(tf.constant(image, dtype=tf.int32)).numpy()
+            except Exception as e:
+                self.compiled = None  # graph not compilable (e.g. op not supported by XLA), run eager
+                if self.log is not None:
+                    self.log("[MODEL] Compiled graph failed ({}), using eager mode: {}".format(self.compile_mode, e))
+        outputs = self.net(tf.constant(image, dtype=tf.int32))
+        return outputs['output_0'].numpy()
+
+    def compile(self, shape):
+        """
+        Wrap serving signature in fixed-shape tf.function (optionally with XLA JIT)
+
+        :param shape: input shape (1 x H x W x 3)
+        """
+        import tensorflow as tf
+        if self.compile_mode == COMPILE_OFF:
+            return
+        net = self.net
+        self.compiled = compile_function(lambda image: net(image)['output_0'], shape, tf.int32, self.compile_mode)
+        self.batch = False  # fixed shape
+
+
+class TFLiteBackend(Backend):
+    NAME = BACKEND_TFLITE
+    EXT = '.tflite'
+
+    @classmethod
+    def get_interpreter_class(cls):
+        """
+        Get TFLite interpreter class, lightweight tflite_runtime is preferred
+
+        :return: Interpreter class or None if not installed
+        """
+        try:
+            from tflite_runtime.interpreter import Interpreter
+            return Interpreter
+        except ImportError:
+            pass
+        try:
+            import tensorflow as tf
+            return tf.lite.Interpreter
+        except ImportError:
+            return None
+
+    @classmethod
+    def is_available(cls, model_name):
+        """
+        Check if TFLite interpreter is installed and converted model exists
+
+        :param model_name: model name
+        :return: True if available
+        """
+        return os.path.isfile(cls.get_path(model_name)) and cls.get_interpreter_class() is not None
+
+    def load(self, model_name):
+        """
+        Load TFLite model
+
+        :param model_name: model name
+        """
+        interpreter = self.get_interpreter_class()
+
+        # XNNPACK delegate is applied by default on CPU, num_threads enables multi-threading
+        self.model = interpreter(model_path=self.get_path(model_name),
+                                 num_threads=self.threads if self.threads > 0 else None)
+        self.input = self.model.get_input_details()[0]
+        self.output = self.model.get_output_details()[0]
+        self.shape = None
+        self.batch = self.input.get('shape_signature', self.input['shape'])[0] == -1
+
+    def run(self, image):
+        """
+        Run TFLite interpreter
+
+        :param image: N x H x W x 3 int32 image (N = 1 if model has fixed batch size)
+        :return: model output_0 as numpy array
+        """
+        # multi pose model has dynamic input size (and batch), resize input tensor on first call (or size change)
+        if self.shape != image.shape:
+            self.shape = None
+            self.model.resize_tensor_input(self.input['index'], image.shape)
+            self.model.allocate_tensors()
+            self.shape = image.shape
+        self.model.set_tensor(self.input['index'], image.astype(self.input['dtype'], copy=False))
+        self.model.invoke()
+        return self.model.get_tensor(self.output['index'])
+
+
+class OnnxBackend(Backend):
+    NAME = BACKEND_ONNX
+    EXT = '.onnx'
+
+    @classmethod
+    def is_available(cls, model_name):
+        """
+        Check if ONNX Runtime is installed and converted model exists
+
+        :param model_name: model name
+        :return: True if available
+        """
+        try:
+            import onnxruntime  # noqa: F401
+        except ImportError:
+            return False
+        return os.path.isfile(cls.get_path(model_name))
+
+    def load(self, model_name):
+        """
+        Load ONNX model into CPU session
+
+        :param model_name: model name
+        """
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if self.threads > 0:
+            options.intra_op_num_threads = self.threads
+        self.model = ort.InferenceSession(self.get_path(model_name), options,
+                                          providers=['CPUExecutionProvider'])
+        self.input = self.model.get_inputs()[0]
+        self.dtype = np.int32 if 'int32' in self.input.type else np.float32
+        self.batch = not isinstance(self.input.shape[0], int)  # dynamic dimension is named or None
+
+    def run(self, image):
+        """
+        Run ONNX Runtime session
+
+        :param image: N x H x W x 3 int32 image (N = 1 if model has fixed batch size)
+        :return: model output_0 as numpy array
+        """
+        return self.model.run(None, {self.input.name: image.astype(self.dtype, copy=False)})[0]
+
+
+BACKENDS = {
+    BACKEND_TENSORFLOW: TensorflowBackend,
+    BACKEND_TFLITE: TFLiteBackend,
+    BACKEND_ONNX: OnnxBackend,
+}
+
+
+def get_backend(name, threads=0, inter_threads=0, compile_mode=COMPILE_OFF, log=None):
+    """
+    Create backend by name
+
+    :param name: backend name
+    :param threads: number of CPU threads (0 = backend default)
+    :param inter_threads: number of inter-op threads (0 = backend default, TensorFlow only)
+    :param compile_mode: graph compile mode (TensorFlow only)
+    :param log: debug log function
+    :return: backend instance
+    """
+    if name not in BACKENDS:
+        raise ValueError("Unknown backend: {}, available: {}".format(name, ", ".join(BACKENDS.keys())))
+    return BACKENDS[name](threads, inter_threads, compile_mode, log)
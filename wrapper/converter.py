@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+# One-time converter of bundled Movenet SavedModels (./model/*) to TFLite and ONNX.
+# Usage (from app directory): python -m wrapper.converter [--backend tflite|onnx|all] [--batch] [model_name ...]
+# Requires tensorflow (TFLite) and tf2onnx (ONNX) installed at conversion time only.
+# --batch exports models with dynamic batch dimension (N x H x W x 3) for batched inference (inference.batch),
+# models with fixed batch size in graph run images one after another inside one model call.
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from wrapper.backends import BACKEND_TFLITE, BACKEND_ONNX, TensorflowBackend, TFLiteBackend, OnnxBackend
+from wrapper.config import movenet as config
+
+# ONNX opset used for conversion
+OPSET = 13
+
+
+def export_batch(model_name, path):
+    """
+    Export SavedModel with dynamic batch dimension in serving signature
+
+    Serving signature with fixed batch size is mapped over batch (tf.map_fn), so N images
+    are predicted in one model call.
+
+    :param model_name: model name
+    :param path: output SavedModel directory
+    :return: output path
+    """
+    import tensorflow as tf
+
+    model = tf.saved_model.load(TensorflowBackend.get_path(model_name))
+    net = model.signatures['serving_default']
+    name, spec = list(net.structured_input_signature[1].items())[0]
+    w, h = config['detector'][model_name]['dims']
+    output = net.structured_outputs['output_0']
+
+    if spec.shape[0] is None:
+        def serve(image):
+            return {'output_0': net(**{name: image})['output_0']}
+    else:
+        def serve(image):
+            return {'output_0': tf.map_fn(lambda img: net(**{name: img[tf.newaxis]})['output_0'][0], image,
+                                          fn_output_signature=tf.TensorSpec(output.shape[1:], output.dtype))}
+
+    module = tf.Module()
+    module.net = model
+    module.serve = tf.function(serve, input_signature=[tf.TensorSpec([None, h, w, 3], spec.dtype, name=name)])
+    tf.saved_model.save(module, path, signatures={'serving_default': module.serve.get_concrete_function()})
+    return path
+
+
+def convert_tflite(model_name, batch=False):
+    """
+    Convert SavedModel to TFLite
+
+    :param model_name: model name
+    :param batch: export with dynamic batch dimension
+    :return: output path
+    """
+    import tensorflow as tf
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = export_batch(model_name, tmp) if batch else TensorflowBackend.get_path(model_name)
+        converter = tf.lite.TFLiteConverter.from_saved_model(src)
+        data = converter.convert()
+    path = TFLiteBackend.get_path(model_name)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+def convert_onnx(model_name, batch=False):
+    """
+    Convert SavedModel to ONNX (with tf2onnx)
+
+    :param model_name: model name
+    :param batch: export with dynamic batch dimension
+    :return: output path
+    """
+    path = OnnxBackend.get_path(model_name)
+    with tempfile.TemporaryDirectory() as tmp:
+        src = export_batch(model_name, tmp) if batch else TensorflowBackend.get_path(model_name)
+        subprocess.run([sys.executable, '-m', 'tf2onnx.convert',
+                        '--saved-model', src,
+                        '--signature_def', 'serving_default',
+                        '--output', path,
+                        '--opset', str(OPSET)], check=True)
+    return path
+
+
+CONVERTERS = {
+    BACKEND_TFLITE: convert_tflite,
+    BACKEND_ONNX: convert_onnx,
+}
+
+
+def convert(model_name, backend, batch=False):
+    """
+    Convert model for backend
+
+    :param model_name: model name
+    :param backend: backend name
+    :param batch: export with dynamic batch dimension
+    :return: output path
+    """
+    if not os.path.isdir(TensorflowBackend.get_path(model_name)):
+        raise FileNotFoundError("SavedModel not found: {}".format(TensorflowBackend.get_path(model_name)))
+    return CONVERTERS[backend](model_name, batch)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert Movenet SavedModels for TFLite / ONNX backends')
+    parser.add_argument('--backend', choices=list(CONVERTERS.keys()) + ['all'], default='all')
+    parser.add_argument('--batch', action='store_true', help='export with dynamic batch dimension (inference.batch)')
+    parser.add_argument('models', nargs='*', help='model names, all bundled Movenet models if empty')
+    args = parser.parse_args()
+
+    models = args.models if len(args.models) > 0 else list(config['detector'].keys())
+    backends = list(CONVERTERS.keys()) if args.backend == 'all' else [args.backend]
+    for model_name in models:
+        for backend in backends:
+            print("Converting {} to {}...".format(model_name, backend))
+            print("Saved: {}".format(convert(model_name, backend, args.batch)))
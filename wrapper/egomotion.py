@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import cv2
+import numpy as np
+
+
+class Egomotion:
+    # modes
+    MODE_OFF = 'off'
+    MODE_SERVO = 'servo'  # shift predicted from servo command
+    MODE_PHASE = 'phase'  # servo prediction refined with phase correlation
+
+    # phase correlation
+    WIDTH = 160  # computed on downscaled frame
+    MIN_RESPONSE = 0.2  # min correlation peak to trust measured shift
+
+    def __init__(self, tracker=None):
+        """
+        Camera ego-motion (servo movement) estimation between consecutive frames
+
+        :param tracker: tracker object
+        """
+        self.tracker = tracker
+        self.mode = self.MODE_OFF
+        self.angle = None  # servo command on previous frame
+        self.shift = (0.0, 0.0)  # last estimated shift (px)
+        self.response = 0.0  # last phase correlation peak
+
+        # phase correlation buffers
+        self.size = None
+        self.prev = None
+        self.current = None
+        self.window = None
+
+    def reset(self):
+        """Reset state"""
+        self.angle = None
+        self.prev = None
+        self.shift = (0.0, 0.0)
+
+    def is_enabled(self):
+        """
+        Check if ego-motion compensation is enabled
+
+        :return: True if enabled
+        """
+        return self.mode in [self.MODE_SERVO, self.MODE_PHASE]
+
+    def has_servo(self):
+        """
+        Check if camera is moved by servo (video file and simulator frames are never moved)
+
+        :return: True if servo moves camera
+        """
+        return self.tracker.servo.enable and not self.tracker.render.simulator \
+            and self.tracker.source != self.tracker.SOURCE_VIDEO
+
+    def predict_servo(self, w, h):
+        """
+        Predict image shift from servo command change since previous frame
+
+        :param w: image width
+        :param h: image height
+        :return: (x, y) shift in pixels
+        """
+        angle = list(self.tracker.command.next_cmd)
+        prev = self.angle
+        self.angle = angle
+        if prev is None or not self.has_servo():
+            return 0.0, 0.0
+
+        # camera turned to point, scene point moves to frame center (servo Y axis is inverted)
+        point = self.tracker.servo.angle_to_point([angle[0] - prev[0], angle[1] - prev[1]])
+        x = (0.5 - point[0]) * w if self.tracker.servo.x else 0.0
+        y = (0.5 - point[1]) * h if self.tracker.servo.y else 0.0
+        return x, y
+
+    def measure_phase(self, gray):
+        """
+        Measure image shift with phase correlation against previous frame
+
+        :param gray: grayscale image
+        :return: (x, y) shift in pixels or None if not confident
+        """
+        h, w = gray.shape[:2]
+        scale = min(1.0, self.WIDTH / w)
+        size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        if size != self.size:
+            self.size = size
+            self.prev = None
+            self.current = np.empty((size[1], size[0]), dtype=np.float32)
+            self.window = cv2.createHanningWindow(size, cv2.CV_32F)
+
+        small = cv2.resize(gray, size, interpolation=cv2.INTER_AREA) if scale < 1 else gray
+        self.current[:] = small
+        if self.prev is None:
+            self.prev, self.current = self.current, np.empty_like(self.current)
+            return None
+
+        # current becomes previous, buffers are reused
+        prev = self.prev
+        self.prev, self.current = self.current, prev
+
+        (x, y), self.response = cv2.phaseCorrelate(prev, self.prev, self.window)
+        if self.response < self.MIN_RESPONSE:
+            return None
+        return x / scale, y / scale
+
+    def estimate(self, gray):
+        """
+        Estimate shift of current frame relative to previous frame (handle every frame)
+
+        :param gray: grayscale working image
+        :return: (x, y) shift in pixels of working image
+        """
+        h, w = gray.shape[:2]
+        shift = self.predict_servo(w, h)
+        if self.mode == self.MODE_PHASE:
+            measured = self.measure_phase(gray)
+            if measured is not None:
+                shift = measured
+        self.shift = shift
+        return shift
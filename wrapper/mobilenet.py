@@ -11,7 +11,9 @@
 import tensorflow as tf
 import tensorflow_hub as hub
 import numpy as np
-import cv2
+from core.detections import Detections
+from wrapper.backends import configure_tensorflow, compile_function
+from wrapper.preprocess import Letterbox
 
 
 class Mobilenet:
@@ -25,6 +27,8 @@ class Mobilenet:
         self.objects = None
         self.model_name = None
         self.detector = None
+        self.detect = None  # detector call, compiled if enabled
+        self.letterbox = None
         self.labels = []
 
     def prepare(self, model_name):
@@ -34,7 +38,11 @@ class Mobilenet:
         :param model_name: model name
         """
         self.model_name = model_name
+        models = self.tracker.models
+        configure_tensorflow(models.threads, models.inter_threads)
         self.detector = hub.load('./model/ssd_mobilenet_2')
+        self.detect = compile_function(self.detector, (1, 256, 256, 3), tf.uint8, models.compile)
+        self.letterbox = Letterbox(256, 256, np.uint8)
         self.labels = [
             "person",
             "bicycle",
@@ -123,44 +131,31 @@ class Mobilenet:
         Predict objects in image
 
         :param img: video frame to analyze
+        :return: list of detected objects
         """
-        self.tracker.objects = []  # reset objects
-
-        dims = [256, 256]
-        tf_img = np.asarray(img)
-        tf_img = cv2.resize(tf_img, (dims[0], dims[1]))
-        tf_img = np.expand_dims(tf_img, axis=0)
-        tf_img = tf.image.resize_with_pad(tf_img, dims[0], dims[1])
-
-        # resize and pad the image to keep the aspect ratio and fit the expected size
-        image = tf.cast(tf_img, dtype=tf.uint8)
+        # resize with padding to keep the aspect ratio and fit the expected size
+        image, scale, offset = self.letterbox.apply(np.asarray(img))
 
         # run model inference
-        outputs = self.detector(image)
-
-        i = 0
-        for box in outputs["detection_boxes"]:
-            b = []
-            b.append(float(box[0][1]))
-            b.append(float(box[0][0]))
-            b.append(float(box[0][3] - box[0][1]))
-            b.append(float(box[0][2] - box[0][0]))
-            class_id = int(outputs["detection_classes"][i][0])
-            obj = {
-                self.tracker.IDX_KEYPOINTS: [],
-                self.tracker.IDX_CLASS: self.get_label(class_id),
-                self.tracker.IDX_ID: i,
-                self.tracker.IDX_BOX: b,
-                self.tracker.IDX_CENTER: self.tracker.keypoints.build_center(b),
-                self.tracker.IDX_SCORE: float(outputs["detection_scores"][i][0])
-            }
-
-            # check score and filters (min score is defined in filter)
-            if not self.tracker.filter.is_allowed(obj, self.tracker.filter.FILTER_DETECT):
-                continue
-
-            self.tracker.objects.append(obj)
-            i += 1
+        try:
+            outputs = self.detect(tf.constant(image))
+        except Exception:
+            if self.detect is self.detector:
+                raise
+            self.tracker.debug.log("[MODEL] Compiled graph failed, using eager mode")
+            self.detect = self.detector
+            outputs = self.detector(tf.constant(image))
+
+        # first detection of every output row, [ymin, xmin, ymax, xmax]
+        raw = np.array([box[0] for box in np.asarray(outputs["detection_boxes"])], dtype=np.float32).reshape(-1, 4)
+        boxes = np.stack([raw[:, 1], raw[:, 0], raw[:, 3] - raw[:, 1], raw[:, 2] - raw[:, 0]], axis=1)
+        self.letterbox.unmap_boxes(boxes)  # to frame coords
+        class_ids = np.asarray(outputs["detection_classes"])[:len(raw), 0].astype(np.int32) - 1  # 1-based
+        scores = np.asarray(outputs["detection_scores"])[:len(raw), 0]
+        objects = Detections(boxes, scores, class_ids, None, self.labels)
+
+        # check score and filters (min score is defined in filter)
+        return self.tracker.filter.apply(objects, self.tracker.filter.FILTER_DETECT)
 
     def get_label(self, idx):
         """
@@ -198,6 +193,8 @@ class Mobilenet:
     def unload(self):
         """Unload model from memory"""
         self.detector = None
+        self.detect = None
+        self.letterbox = None
         self.labels = []
 
     def get_target_point(self, name, idx):
@@ -208,5 +205,5 @@ class Mobilenet:
         :param idx: index
         :return: center point
         """
-        if self.tracker.objects is not None and idx < len(self.tracker.objects[idx]):
+        if self.tracker.objects is not None and idx < len(self.tracker.objects):
             return self.tracker.objects[idx][self.tracker.IDX_CENTER]
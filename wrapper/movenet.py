@@ -8,14 +8,19 @@
 # Updated At: 2023.03.27 02:00
 # =============================================================================
 
-import tensorflow as tf
-import tensorflow_hub as hub
 import numpy as np
-import cv2
+from core.detections import Detections
+from wrapper.backends import get_backend, BACKEND_TENSORFLOW
+from wrapper.preprocess import Letterbox
 from wrapper.config import movenet as config
 
 
 class Movenet:
+    # single pose crop region (previous pose cropping)
+    CROP_MIN_SCORE = 0.2  # min score of torso keypoints to keep crop region
+    CROP_TORSO_MARGIN = 1.9  # crop half size as multiplier of torso range
+    CROP_BODY_MARGIN = 1.2  # crop half size as multiplier of body range
+
     def __init__(self, tracker):
         """
         Movenet model wrapper
@@ -25,8 +30,10 @@ class Movenet:
         self.tracker = tracker
         self.objects = None
         self.model_name = None
-        self.model = None
-        self.net = None
+        self.backend = None
+        self.letterbox = None
+        self.letterboxes = []  # batch inputs, one per stream
+        self.crop_region = None  # [x, y, w, h] in pixels, None = full frame
         self.idx = {}
         self.joints = []
         self.target_idx = []
@@ -38,102 +45,166 @@ class Movenet:
         :param model_name: model name
         """
         self.model_name = model_name
-        self.model = hub.load('./model/' + model_name)
-        # self.model = hub.load('https://tfhub.dev/google/movenet/singlepose/thunder/3')
-        self.net = self.model.signatures['serving_default']
+        name = self.tracker.models.backend
+        self.backend = self.create_backend(name)
+
+        # fallback to SavedModel if runtime is not installed or model is not converted yet
+        if name != BACKEND_TENSORFLOW and not self.backend.is_available(model_name):
+            self.tracker.debug.log("[MODEL] Backend {} not available for {}, using {}".format(
+                name, model_name, BACKEND_TENSORFLOW))
+            self.backend = self.create_backend(BACKEND_TENSORFLOW)
+        self.backend.load(model_name)
+        dims = config['detector'][model_name]['dims']
+        self.backend.compile((1, dims[1], dims[0], 3))
+        self.letterbox = Letterbox(dims[0], dims[1], np.int32)
+        self.letterboxes = []
+        self.crop_region = None
+        self.tracker.debug.log("[MODEL] Backend: {}".format(self.backend.NAME))
         self.cache_config()
 
+    def create_backend(self, name):
+        """
+        Create backend with model config
+
+        :param name: backend name
+        :return: backend instance
+        """
+        models = self.tracker.models
+        return get_backend(name, models.threads, models.inter_threads, models.compile, self.tracker.debug.log)
+
     def reset(self):
         """Reset predictions"""
         self.objects = None
+        self.crop_region = None
+
+    def is_single_pose(self):
+        """
+        Check if current model is single pose model
+
+        :return: True if single pose
+        """
+        return self.model_name != 'movenet_multi_pose_lightning_1'
+
+    def build_crop_region(self, keypoints, w, h):
+        """
+        Build crop region for next frame from single pose keypoints
+
+        Square region around hips center containing torso and body with margin, as in MoveNet reference.
+
+        :param keypoints: 17 x 3 keypoints [x, y, score] normalized to frame
+        :param w: frame width
+        :param h: frame height
+        :return: region [x, y, w, h] in pixels or None (full frame) if torso is not visible
+        """
+        scores = keypoints[:, 2]
+        idx = self.idx
+        if max(scores[idx['left_hip']], scores[idx['right_hip']]) < self.CROP_MIN_SCORE \
+                or max(scores[idx['left_shoulder']], scores[idx['right_shoulder']]) < self.CROP_MIN_SCORE:
+            return None
+
+        points = keypoints[:, :2] * [w, h]
+        center = (points[idx['left_hip']] + points[idx['right_hip']]) / 2
+        torso = [idx['left_shoulder'], idx['right_shoulder'], idx['left_hip'], idx['right_hip']]
+        torso_range = np.abs(points[torso] - center).max()
+        visible = scores >= self.CROP_MIN_SCORE
+        body_range = np.abs(points[visible] - center).max()
+
+        half = max(torso_range * self.CROP_TORSO_MARGIN, body_range * self.CROP_BODY_MARGIN)
+        half = min(half, max(center[0], w - center[0], center[1], h - center[1]))
+        if half <= 0 or half > max(w, h) / 2:
+            return None
+        return [float(center[0] - half), float(center[1] - half), float(half * 2), float(half * 2)]
 
     def predict(self, img):
         """
         Make predictions and get objects
 
         :param img: video frame to analyze
+        :return: list of detected objects
         """
-        dims = config['detector'][self.model_name]['dims']
-        tf_img = np.asarray(img)
-        tf_img = cv2.resize(tf_img, (dims[0], dims[1]))
-        tf_img = np.expand_dims(tf_img, axis=0)
-        tf_img = tf.image.resize_with_pad(tf_img, dims[0], dims[1])
+        img = np.asarray(img)
+        h, w = img.shape[:2]
+
+        # resize with padding to keep the aspect ratio and fit the expected size,
+        # single pose models use region around previous pose if available
+        crop = self.tracker.models.crop and self.is_single_pose()
+        if not crop:
+            self.crop_region = None  # crop disabled at runtime
+        result = None
+        if self.crop_region is not None:
+            result = self.letterbox.apply_region(img, self.crop_region)
+        if result is None:
+            result = self.letterbox.apply(img)
+        image, scale, offset = result
+
+        # run model inference and parse predictions
+        objects = self.parse(self.backend.run(image)[0], self.letterbox)
+
+        # single pose: fallback to full frame when pose is lost
+        if crop:
+            self.crop_region = self.build_crop_region(objects.keypoints[0], w, h)
+
+        return self.finish(objects)
+
+    def predict_batch(self, images):
+        """
+        Make predictions on multiple frames (streams) in one batched model call
 
-        # resize and pad the image to keep the aspect ratio and fit the expected size
-        image = tf.cast(tf_img, dtype=tf.int32)
+        Frames are letterboxed into separate inputs (full frame, no crop region) and stacked,
+        backends with fixed batch size run them one by one.
 
-        # run model inference
-        outputs = self.net(image)
+        :param images: list of video frames
+        :return: list of detected objects, one per frame
+        """
+        dims = config['detector'][self.model_name]['dims']
+        while len(self.letterboxes) < len(images):
+            self.letterboxes.append(Letterbox(dims[0], dims[1], np.int32))
 
-        # parse predictions
-        self.tracker.objects = []
+        inputs = np.concatenate([self.letterboxes[i].apply(np.asarray(img))[0] for i, img in enumerate(images)])
+        outputs = self.backend.run_batch(inputs)
+        return [self.finish(self.parse(outputs[i], self.letterboxes[i])) for i in range(len(images))]
 
+    def parse(self, poses, letterbox):
+        """
+        Parse model output of single frame
+
+        :param poses: model output_0 for frame
+        :param letterbox: letterbox used to prepare model input
+        :return: Detections (not filtered) normalized to frame
+        """
         # multi pose [lightning]
         if self.model_name == 'movenet_multi_pose_lightning_1':
-            for pose in outputs['output_0'].numpy()[0]:  # output_0 is a float32 [1, 6, 56] tensor
-                obj = {
-                    self.tracker.IDX_KEYPOINTS: []
-                }
-                x = 0
-                for i in range(0, 17):  # 17 keypoints [x, y, score]
-                    obj[self.tracker.IDX_KEYPOINTS].append({
-                        self.tracker.IDX_X: pose[1 + x],  # x
-                        self.tracker.IDX_Y: pose[0 + x],  # y
-                        self.tracker.IDX_SCORE: pose[2 + x]  # score
-                    })
-                    x += 3
-
-                # build bounding box and center
-                obj[self.tracker.IDX_ID] = 0
-                obj[self.tracker.IDX_CLASS] = 'person'
-                obj[self.tracker.IDX_SCORE] = pose[55]  # score is the last value in the array
-                obj[self.tracker.IDX_BOX] = [pose[52], pose[51], (pose[54] - pose[52]), (pose[53] - pose[51])]
-                obj[self.tracker.IDX_CENTER] = self.tracker.keypoints.build_center(obj[self.tracker.IDX_BOX])
-
-                # check score and filters (min score is defined in filter)
-                if not self.tracker.filter.is_allowed(obj, self.tracker.filter.FILTER_DETECT):
-                    continue
-
-                self.tracker.objects.append(obj)
+            # output_0 is a float32 [1, 6, 56] tensor: 17 keypoints [y, x, score], box [ymin, xmin, ymax, xmax], score
+            keypoints = poses[:, :51].reshape(-1, 17, 3)[:, :, [1, 0, 2]]  # to [x, y, score]
+            boxes = np.stack([poses[:, 52], poses[:, 51],
+                              poses[:, 54] - poses[:, 52], poses[:, 53] - poses[:, 51]], axis=1)
+            scores = poses[:, 55]  # score is the last value in the array
+            letterbox.unmap_points(keypoints)  # to frame coords
+            letterbox.unmap_boxes(boxes)
         else:
-            # single pose [lightning and thunder]
-            for pose in outputs['output_0'].numpy()[0]:  # output_0 is a float32 [1, 1, 17, 3] tensor
-                obj = {
-                    self.tracker.IDX_KEYPOINTS: []
-                }
-                for coord in pose:
-                    obj[self.tracker.IDX_KEYPOINTS].append({
-                        self.tracker.IDX_X: coord[1],  # x
-                        self.tracker.IDX_Y: coord[0],  # y
-                        self.tracker.IDX_SCORE: coord[2]  # score
-                    })
-
-                # build bounding box and center
-                obj[self.tracker.IDX_ID] = 0
-                obj[self.tracker.IDX_CLASS] = 'person'
-                obj[self.tracker.IDX_SCORE] = self.calc_score(obj[self.tracker.IDX_KEYPOINTS])
-                obj[self.tracker.IDX_BOX] = self.tracker.keypoints.build_bounding(obj[self.tracker.IDX_KEYPOINTS])
-                obj[self.tracker.IDX_CENTER] = self.tracker.keypoints.build_center(obj[self.tracker.IDX_BOX])
-
-                # check score and filters (min score is defined in filter)
-                if not self.tracker.filter.is_allowed(obj, self.tracker.filter.FILTER_DETECT):
-                    continue
-
-                self.tracker.objects.append(obj)
-
-        # list of box, center and 17 keypoints (x, y, score)
-
-    def calc_score(self, keypoints):
-        """
-        Calculate score
-
-        :param keypoints: keypoints
-        :return: score
+            # single pose [lightning and thunder], output_0 is a float32 [1, 1, 17, 3] tensor
+            keypoints = poses[:, :, [1, 0, 2]]  # to [x, y, score]
+            letterbox.unmap_points(keypoints)  # to frame coords
+            mins = keypoints[:, :, :2].min(axis=1)
+            maxs = keypoints[:, :, :2].max(axis=1)
+            boxes = np.concatenate([mins, maxs - mins], axis=1)
+            scores = keypoints[:, :, 2].mean(axis=1)
+
+        return Detections(boxes, scores, None, keypoints, ['person'])
+
+    def finish(self, objects):
+        """
+        Apply detect filters and build target anchors
+
+        :param objects: Detections
+        :return: filtered Detections
         """
-        score = 0
-        for point in keypoints:
-            score += point[self.tracker.IDX_SCORE]
-        return score / len(keypoints)
+        # check score and filters (min score is defined in filter)
+        objects = self.tracker.filter.apply(objects, self.tracker.filter.FILTER_DETECT)
+        objects.anchors = self.build_anchors(objects.keypoints)
+
+        # boxes, centers and 17 keypoints (x, y, score)
+        return objects
 
     def append(self, img):
         """
@@ -171,10 +242,12 @@ class Movenet:
 
     def unload(self):
         """Unload model from memory"""
-        self.model = {}
-        self.net = {}
-        self.model = None
-        self.net = None
+        if self.backend is not None:
+            self.backend.unload()
+        self.backend = None
+        self.letterbox = None
+        self.letterboxes = []
+        self.crop_region = None
         self.idx = {}
         self.joints = []
         self.target_idx = []
@@ -309,6 +382,46 @@ class Movenet:
                     break
         return res
 
+    def build_anchors(self, keypoints):
+        """
+        Build target points for all poses at once
+
+        :param keypoints: N x 17 x 3 keypoints [x, y, score]
+        :return: dict with N x 2 points for every target point name
+        """
+        if len(self.target_idx) == 0:
+            return {}
+
+        nose, left_ear, right_ear, left_shoulder, right_shoulder, \
+            left_hip, right_hip, left_knee, right_knee = [keypoints[:, i, :2] for i in self.target_idx]
+        scores = keypoints[:, :, 2]
+
+        mid_head = (left_ear + right_ear) / 2  # head
+        mid_body = (left_shoulder + right_shoulder) / 2  # neck
+        mid_body_hip = (left_hip + right_hip) / 2  # mid hip
+        body_heart = mid_body + (mid_body_hip - mid_body) / [2, 3.5]  # heart
+        left_leg = left_hip + (left_knee - left_hip) / [3, 2]
+        right_leg = right_hip + (right_knee - right_hip) / [3, 2]
+
+        # legs: use leg with better visible knee
+        left_knee_score = scores[:, self.target_idx[7]]
+        right_knee_score = scores[:, self.target_idx[8]]
+        legs = np.where((left_knee_score > right_knee_score)[:, None], left_leg, right_leg)
+
+        # auto: head if shoulders are not visible, body otherwise
+        ear_score = scores[:, self.target_idx[1]]
+        shoulder_score = scores[:, self.target_idx[3]]
+        use_head = (ear_score > shoulder_score) & (shoulder_score < 0.3) & (ear_score - shoulder_score >= 0.5)
+        auto = np.where(use_head[:, None], mid_head, body_heart)
+
+        return {
+            self.tracker.TARGET_POINT_AUTO: auto,
+            self.tracker.TARGET_POINT_HEAD: mid_head,
+            self.tracker.TARGET_POINT_NECK: mid_body,
+            self.tracker.TARGET_POINT_BODY: body_heart,
+            self.tracker.TARGET_POINT_LEGS: legs,
+        }
+
     def get_target_point(self, name, idx=0):
         """
         Get target point
@@ -317,83 +430,10 @@ class Movenet:
         :param idx: object index
         :return: point coordinate (x, y)
         """
-        if self.tracker.objects is None or len(self.tracker.objects) == 0:
+        if not isinstance(self.tracker.objects, Detections) or len(self.tracker.objects) == 0:
             return
 
-        # if self.objects[idx][self.tracker.IDX_SCORE] < 0.35:
-        # return
-
-        point = {
-            'nose': self.tracker.objects[idx][self.tracker.IDX_KEYPOINTS][self.target_idx[0]],
-            'left_ear': self.tracker.objects[idx][self.tracker.IDX_KEYPOINTS][self.target_idx[1]],
-            'right_ear': self.tracker.objects[idx][self.tracker.IDX_KEYPOINTS][self.target_idx[2]],
-            'left_shoulder': self.tracker.objects[idx][self.tracker.IDX_KEYPOINTS][self.target_idx[3]],
-            'right_shoulder': self.tracker.objects[idx][self.tracker.IDX_KEYPOINTS][self.target_idx[4]],
-            'left_hip': self.tracker.objects[idx][self.tracker.IDX_KEYPOINTS][self.target_idx[5]],
-            'right_hip': self.tracker.objects[idx][self.tracker.IDX_KEYPOINTS][self.target_idx[6]],
-            'left_knee': self.tracker.objects[idx][self.tracker.IDX_KEYPOINTS][self.target_idx[7]],
-            'right_knee': self.tracker.objects[idx][self.tracker.IDX_KEYPOINTS][self.target_idx[8]],
-            'mid_head': {},
-            'mid_body': {},
-            'mid_body_hip': {},
-            'body_heart': {},
-            'left_leg': {},
-            'right_leg': {}
-        }
-
-        # initial
-        target = [point['nose'][0], point['nose'][1]]
-
-        # head
-        point['mid_head'][0] = (point['left_ear'][0] + point['right_ear'][0]) / 2
-        point['mid_head'][1] = (point['left_ear'][1] + point['right_ear'][1]) / 2
-
-        # neck
-        point['mid_body'][0] = (point['left_shoulder'][0] + point['right_shoulder'][0]) / 2
-        point['mid_body'][1] = (point['left_shoulder'][1] + point['right_shoulder'][1]) / 2
-
-        # mid hip
-        point['mid_body_hip'][0] = (point['left_hip'][0] + point['right_hip'][0]) / 2
-        point['mid_body_hip'][1] = (point['left_hip'][1] + point['right_hip'][1]) / 2
-
-        # heart
-        point['body_heart'][0] = point['mid_body'][0] + (point['mid_body_hip'][0] - point['mid_body'][0]) / 2
-        point['body_heart'][1] = point['mid_body'][1] + (point['mid_body_hip'][1] - point['mid_body'][1]) / 3.5
-
-        # left leg
-        point['left_leg'][0] = point['left_hip'][0] + (point['mid_head'][0] - point['left_hip'][0]) / 3
-        point['left_leg'][1] = point['left_hip'][1] + (point['mid_head'][1] - point['left_hip'][1]) / 2
-
-        # right leg
-        point['right_leg'][0] = point['right_hip'][0] + (point['right_knee'][0] - point['right_hip'][0]) / 3
-        point['right_leg'][1] = point['right_hip'][1] + (point['right_knee'][1] - point['right_hip'][1]) / 2
-
-        if name == self.tracker.TARGET_POINT_HEAD:
-            target[0] = point['mid_head'][0]
-            target[1] = point['mid_head'][1]
-        elif name == self.tracker.TARGET_POINT_NECK:
-            target[0] = point['mid_body'][0]
-            target[1] = point['mid_body'][1]
-        elif name == self.tracker.TARGET_POINT_BODY:
-            target[0] = point['body_heart'][0]
-            target[1] = point['body_heart'][1]
-        elif name == self.tracker.TARGET_POINT_LEGS:
-            if point['left_knee'].score > point['right_knee'].score:
-                target[0] = point['left_leg'][0]
-                target[1] = point['left_leg'][1]
-            else:
-                target[0] = point['right_leg'][0]
-                target[1] = point['right_leg'][1]
-        else:
-            # auto
-            if point['left_ear'][self.tracker.IDX_SCORE] > point['left_shoulder'][self.tracker.IDX_SCORE] \
-                    and point['left_shoulder'][self.tracker.IDX_SCORE] < 0.3 \
-                    and (
-                    point['left_ear'][self.tracker.IDX_SCORE] - point['left_shoulder'][self.tracker.IDX_SCORE] >= 0.5):
-                target[0] = point['mid_head'][0]
-                target[1] = point['mid_head'][1]
-            else:
-                target[0] = point['body_heart'][0]
-                target[1] = point['body_heart'][1]
-
-        return target
+        # unknown point name = auto
+        if name not in self.tracker.objects.anchors:
+            name = self.tracker.TARGET_POINT_AUTO
+        return self.tracker.objects.get_anchor(name, idx)
@@ -11,9 +11,19 @@
 import numpy as np
 import imutils
 import cv2
+from core.detections import Detections
+from wrapper.egomotion import Egomotion
 
 
 class OpenCVMovementDetector:
+    # background subtraction engines
+    ENGINE_AVG = 'avg'  # running average of frames
+    ENGINE_MOG2 = 'mog2'  # Gaussian mixture (cv2.createBackgroundSubtractorMOG2)
+    ENGINE_KNN = 'knn'  # K-nearest neighbours (cv2.createBackgroundSubtractorKNN)
+
+    # min camera shift (px of working image) compensated
+    MIN_SHIFT = 0.5
+
     def __init__(self, tracker):
         """
         OpenCV movement detector wrapper
@@ -28,6 +38,24 @@ class OpenCVMovementDetector:
         self.bg = None
         self.total = 0
         self.frameCount = 32
+        self.threshold = 25
+
+        # config
+        self.engine = self.ENGINE_AVG
+        self.width = 400  # working width, 0 = frame width
+        self.min_area = 0.0  # min contour area (fraction of frame area)
+        self.merge = 0.0  # merge boxes closer than distance (fraction of frame width)
+        self.egomotion = Egomotion(tracker)  # camera movement compensation
+
+        # working buffers, allocated once per frame size
+        self.frame_size = None
+        self.size = None
+        self.small = None
+        self.gray = None
+        self.bg8 = None
+        self.delta = None
+        self.mask = None
+        self.warped = None
 
     def prepare(self, model_name):
         """
@@ -36,56 +64,102 @@ class OpenCVMovementDetector:
         :param model_name: model name
         """
         self.model_name = model_name
-        self.total = 0
+        models = self.tracker.models
+        if models.movement_engine in [self.ENGINE_AVG, self.ENGINE_MOG2, self.ENGINE_KNN]:
+            self.engine = models.movement_engine
+        self.width = models.movement_width
+        self.min_area = models.movement_min_area
+        self.merge = models.movement_merge
+        self.egomotion.mode = models.movement_egomotion
+        self.reset()
+        self.tracker.debug.log("[MODEL] Movement engine: {}, width: {}".format(self.engine, self.width))
 
     def reset(self):
         """Reset model"""
         self.bg = None
+        self.model = None
+        self.frame_size = None
         self.total = 0
+        self.egomotion.reset()
+
+    def allocate(self, w, h):
+        """
+        Allocate working buffers and background model for frame size
+
+        :param w: frame width
+        :param h: frame height
+        """
+        scale = min(1.0, self.width / w) if self.width > 0 else 1.0
+        self.size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        sw, sh = self.size
+        self.small = np.empty((sh, sw, 3), dtype=np.uint8) if scale < 1 else None
+        self.gray = np.empty((sh, sw), dtype=np.uint8)
+        self.bg8 = np.empty((sh, sw), dtype=np.uint8)
+        self.delta = np.empty((sh, sw), dtype=np.uint8)
+        self.mask = np.empty((sh, sw), dtype=np.uint8)
+        self.warped = np.empty((sh, sw), dtype=np.float32)
+        self.bg = None
+        self.total = 0
+        if self.engine == self.ENGINE_MOG2:
+            self.model = cv2.createBackgroundSubtractorMOG2(detectShadows=False)
+        elif self.engine == self.ENGINE_KNN:
+            self.model = cv2.createBackgroundSubtractorKNN(detectShadows=False)
+        self.frame_size = (w, h)
 
     def predict(self, img):
         """
         Predict objects in image
 
         :param img: video frame to analyze
+        :return: list of detected objects
         """
-        self.tracker.objects = []  # reset objects
-
-        frame = imutils.resize(img, width=400)
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        gray = cv2.GaussianBlur(gray, (7, 7), 0)
+        h, w = img.shape[:2]
+        if self.frame_size != (w, h):
+            self.allocate(w, h)
+
+        # downscale and grayscale into preallocated buffers
+        frame = img
+        if self.small is not None:
+            frame = cv2.resize(img, self.size, dst=self.small, interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY, dst=self.gray)
+
+        # camera movement since previous frame
+        moved = False
+        if self.egomotion.is_enabled():
+            sx, sy = self.egomotion.estimate(self.gray)
+            moved = abs(sx) >= self.MIN_SHIFT or abs(sy) >= self.MIN_SHIFT
+
+        if self.engine == self.ENGINE_AVG:
+            cv2.GaussianBlur(self.gray, (7, 7), 0, dst=self.gray)
+            if moved:
+                self.align(sx, sy)
+            ready = self.total > self.frameCount and self.build_mask()
+            self.update(self.gray)
+        elif moved:
+            # subtractor model can't be shifted, relearn background from current frame
+            self.model.apply(self.gray, self.mask, 1.0)
+            ready = False
+        else:
+            self.model.apply(self.gray, self.mask)
+            ready = self.total > self.frameCount
+            if ready:
+                self.clean_mask()
 
         boxes = []
-        if self.total > self.frameCount:
+        if ready:
             # single object detection
             if self.model_name == 'opencv_movement_detect_single':
-                boxes = self.detect_single(gray)
+                boxes = self.detect_single()
 
             # multi object detection
             elif self.model_name == 'opencv_movement_detect_multi':
-                boxes = self.detect_all(gray)
-
-        self.update(gray)
+                boxes = self.detect_all()
         self.total += 1
 
-        if boxes is not None:
-            i = 0
-            for box in boxes:
-                obj = {
-                    self.tracker.IDX_KEYPOINTS: [],
-                    self.tracker.IDX_CLASS: 'any',
-                    self.tracker.IDX_ID: i,
-                    self.tracker.IDX_BOX: box,
-                    self.tracker.IDX_CENTER: self.tracker.keypoints.build_center(box),
-                    self.tracker.IDX_SCORE: 1
-                }
-
-                # check score and filters (min score is defined in filter)
-                if not self.tracker.filter.is_allowed(obj, self.tracker.filter.FILTER_DETECT):
-                    continue
-
-                self.tracker.objects.append(obj)
-                i += 1
+        objects = Detections(boxes, None, None, None, ['any'])
+
+        # check score and filters (min score is defined in filter)
+        return self.tracker.filter.apply(objects, self.tracker.filter.FILTER_DETECT)
 
     def append(self, img):
         """
@@ -106,87 +180,106 @@ class OpenCVMovementDetector:
 
     def unload(self):
         """Unload model"""
-        self.total = 0
-        self.bg = None
+        self.reset()
+        self.small = None
+        self.gray = None
+        self.bg8 = None
+        self.delta = None
+        self.mask = None
+        self.warped = None
 
     def update(self, image):
         """
-        Update background model
+        Update background model (running average)
 
         :param image: image to update background model
         """
         if self.bg is None:
-            self.bg = image.copy().astype("float")
+            self.bg = image.astype(np.float32)
             return
         cv2.accumulateWeighted(image, self.bg, self.accumWeight)
 
-    def detect_all(self, image, tVal=25):
+    def align(self, sx, sy):
         """
-        Detect all objects in image
+        Shift running average background with camera movement, uncovered area is taken from current frame
 
-        :param image: image to detect objects
-        :param tVal: threshold value
-        :return: list of objects
+        :param sx: x shift (px)
+        :param sy: y shift (px)
+        """
+        if self.bg is None:
+            return
+        matrix = np.float32([[1, 0, sx], [0, 1, sy]])
+        self.warped[:] = self.gray
+        cv2.warpAffine(self.bg, matrix, self.size, dst=self.warped, borderMode=cv2.BORDER_TRANSPARENT)
+        self.bg, self.warped = self.warped, self.bg
+
+    def build_mask(self):
         """
-        delta = cv2.absdiff(self.bg.astype("uint8"), image)
-        thresh = cv2.threshold(delta, tVal, 255, cv2.THRESH_BINARY)[1]
-        thresh = cv2.erode(thresh, None, iterations=2)
-        thresh = cv2.dilate(thresh, None, iterations=2)
-        cnts = cv2.findContours(thresh.copy(), cv2.RETR_EXTERNAL,
-                                cv2.CHAIN_APPROX_SIMPLE)
-        cnts = imutils.grab_contours(cnts)
+        Build movement mask from difference with running average background
 
-        if len(cnts) == 0:
+        :return: True if mask is built
+        """
+        if self.bg is None:
+            return False
+        cv2.convertScaleAbs(self.bg, dst=self.bg8)
+        cv2.absdiff(self.bg8, self.gray, dst=self.delta)
+        cv2.threshold(self.delta, self.threshold, 255, cv2.THRESH_BINARY, dst=self.mask)
+        self.clean_mask()
+        return True
+
+    def clean_mask(self):
+        """Remove noise from movement mask (in place)"""
+        cv2.erode(self.mask, None, dst=self.mask, iterations=2)
+        cv2.dilate(self.mask, None, dst=self.mask, iterations=2)
+
+    def find_boxes(self):
+        """
+        Find movement boxes in mask, small contours are skipped and near boxes are merged
+
+        :return: N x 4 boxes [x, y, w, h] in pixels
+        """
+        # mask is rebuilt every frame, so it can be modified by findContours (OpenCV < 4)
+        cnts = imutils.grab_contours(cv2.findContours(self.mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE))
+        sw, sh = self.size
+        min_area = self.min_area * sw * sh
+        boxes = [cv2.boundingRect(c) for c in cnts if min_area <= 0 or cv2.contourArea(c) >= min_area]
+        boxes = np.array(boxes, dtype=np.float32).reshape(-1, 4)
+        if self.merge > 0 and len(boxes) > 1:
+            boxes = merge_boxes(boxes, self.merge * sw)
+        return boxes
+
+    def detect_all(self):
+        """
+        Detect all objects in current mask
+
+        :return: list of objects
+        """
+        boxes = self.find_boxes()
+        if len(boxes) == 0:
             return None
 
-        h, w = image.shape
-        objects = []
-        for c in cnts:
-            (x, y, width, height) = cv2.boundingRect(c)
-            # append normalized coordinates
-            objects.append([
-                x / w,
-                y / h,
-                width / w,
-                height / h
-            ])
-        return objects
-
-    def detect_single(self, image, tVal=25):
-        """
-        Detect single object in image
-
-        :param image: image to detect object
-        :param tVal: threshold value
+        # append normalized coordinates
+        return (boxes / np.array(self.size * 2, dtype=np.float32)).tolist()
+
+    def detect_single(self):
+        """
+        Detect single object in current mask (box around all movement)
+
         :return: list of objects
         """
-        delta = cv2.absdiff(self.bg.astype("uint8"), image)
-        thresh = cv2.threshold(delta, tVal, 255, cv2.THRESH_BINARY)[1]
-        thresh = cv2.erode(thresh, None, iterations=2)
-        thresh = cv2.dilate(thresh, None, iterations=2)
-        cnts = cv2.findContours(thresh.copy(), cv2.RETR_EXTERNAL,
-                                cv2.CHAIN_APPROX_SIMPLE)
-        cnts = imutils.grab_contours(cnts)
-        (minX, minY) = (np.inf, np.inf)
-        (maxX, maxY) = (-np.inf, -np.inf)
-
-        if len(cnts) == 0:
+        boxes = self.find_boxes()
+        if len(boxes) == 0:
             return None
 
-        h, w = image.shape
-        objects = []
-        for c in cnts:
-            (x, y, width, height) = cv2.boundingRect(c)
-            (minX, minY) = (min(minX, x), min(minY, y))
-            (maxX, maxY) = (max(maxX, x + width), max(maxY, y + height))
-
-        objects.append([
-            minX / w,
-            minY / h,
-            (maxX - minX) / w,
-            (maxY - minY) / h
-        ])
-        return objects
+        sw, sh = self.size
+        (minX, minY) = boxes[:, :2].min(axis=0)
+        (maxX, maxY) = (boxes[:, :2] + boxes[:, 2:]).max(axis=0)
+        return [[
+            minX / sw,
+            minY / sh,
+            (maxX - minX) / sw,
+            (maxY - minY) / sh
+        ]]
 
     def get_target_point(self, name, idx):
         """
@@ -196,5 +289,35 @@ class OpenCVMovementDetector:
         :param idx: object index
         :return: center point of object (x, y)
         """
-        if self.tracker.objects is not None and idx < len(self.tracker.objects[idx]):
+        if self.tracker.objects is not None and idx < len(self.tracker.objects):
             return self.tracker.objects[idx][self.tracker.IDX_CENTER]
+
+
+def merge_boxes(boxes, gap):
+    """
+    Merge boxes overlapping or closer than gap, until no boxes can be merged
+
+    :param boxes: N x 4 boxes [x, y, w, h]
+    :param gap: max distance between merged boxes
+    :return: M x 4 merged boxes
+    """
+    boxes = [list(box) for box in boxes]
+    merged = True
+    while merged:
+        merged = False
+        i = 0
+        while i < len(boxes):
+            j = i + 1
+            while j < len(boxes):
+                a, b = boxes[i], boxes[j]
+                if a[0] - gap <= b[0] + b[2] and b[0] - gap <= a[0] + a[2] \
+                        and a[1] - gap <= b[1] + b[3] and b[1] - gap <= a[1] + a[3]:
+                    x1, y1 = min(a[0], b[0]), min(a[1], b[1])
+                    x2, y2 = max(a[0] + a[2], b[0] + b[2]), max(a[1] + a[3], b[1] + b[3])
+                    boxes[i] = [x1, y1, x2 - x1, y2 - y1]
+                    boxes.pop(j)
+                    merged = True
+                else:
+                    j += 1
+            i += 1
+    return np.array(boxes, dtype=np.float32).reshape(-1, 4)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# This file is a part of servocam.org package <servocam.org>
+# Created By: Marcin Szczygliński <info@servocam.org>
+# GitHub: https://github.com/servo-cam
+# License: MIT
+# Updated At: 2023.03.27 02:00
+# =============================================================================
+
+import cv2
+import numpy as np
+
+
+class Letterbox:
+    def __init__(self, width, height, dtype=np.uint8):
+        """
+        Aspect-preserving letterbox resize into preallocated model input buffer
+
+        Frame (or frame region) is resized once (keeping aspect ratio) and centered in 1 x H x W x 3 buffer
+        padded with zeros. Buffers are reused until frame size changes, padding is written only on reallocation.
+
+        :param width: model input width
+        :param height: model input height
+        :param dtype: model input dtype
+        """
+        self.width = width
+        self.height = height
+        self.dtype = dtype
+        self.buffer = None
+        self.resized = None
+        self.frame_size = None  # (w, h) of frame the buffers are prepared for
+        self.size = (0, 0)  # resized frame (w, h) inside buffer
+        self.scale = 1.0
+        self.offset = (0, 0)  # padding (x, y) in pixels
+        self.full = True  # buffer holds full frame (False after apply_region)
+
+        # mapping of last applied input: frame region origin (px), scale (x, y), offset in buffer (px), frame size
+        self.mapping = (0, 0, 1.0, 1.0, 0, 0, 1, 1)
+
+    def prepare(self, w, h):
+        """
+        Allocate buffers for frame size
+
+        :param w: frame width
+        :param h: frame height
+        """
+        self.scale = min(self.width / w, self.height / h)
+        nw = min(self.width, max(1, int(round(w * self.scale))))
+        nh = min(self.height, max(1, int(round(h * self.scale))))
+        self.size = (nw, nh)
+        self.offset = ((self.width - nw) // 2, (self.height - nh) // 2)
+        self.buffer = np.zeros((1, self.height, self.width, 3), dtype=self.dtype)
+        self.resized = np.empty((nh, nw, 3), dtype=np.uint8)
+        self.frame_size = (w, h)
+
+    def apply(self, img):
+        """
+        Letterbox frame into model input buffer
+
+        :param img: RGB frame (H x W x 3, uint8)
+        :return: (1 x H x W x 3 buffer, scale, (offset x, offset y))
+        """
+        h, w = img.shape[:2]
+        if self.frame_size != (w, h):
+            self.prepare(w, h)
+
+        nw, nh = self.size
+        x, y = self.offset
+        if not self.full:
+            self.buffer.fill(0)
+            self.full = True
+        interpolation = cv2.INTER_AREA if self.scale < 1 else cv2.INTER_LINEAR
+        cv2.resize(img, (nw, nh), dst=self.resized, interpolation=interpolation)
+        self.buffer[0, y:y + nh, x:x + nw] = self.resized
+        self.mapping = (0, 0, nw / w, nh / h, x, y, w, h)
+        return self.buffer, self.scale, self.offset
+
+    def apply_region(self, img, region):
+        """
+        Letterbox frame region into model input buffer, parts of region outside frame are padded
+
+        :param img: RGB frame (H x W x 3, uint8)
+        :param region: region [x, y, w, h] in pixels, may exceed frame
+        :return: (1 x H x W x 3 buffer, scale, (offset x, offset y)) or None if region is outside frame
+        """
+        h, w = img.shape[:2]
+        if self.frame_size != (w, h):
+            self.prepare(w, h)
+
+        rx, ry, rw, rh = region
+        scale = min(self.width / rw, self.height / rh)
+        ox = (self.width - rw * scale) / 2
+        oy = (self.height - rh * scale) / 2
+
+        # visible part of region
+        x0, y0 = int(np.ceil(max(0, rx))), int(np.ceil(max(0, ry)))
+        x1, y1 = int(min(w, rx + rw)), int(min(h, ry + rh))
+        dx0 = int(round(ox + (x0 - rx) * scale))
+        dy0 = int(round(oy + (y0 - ry) * scale))
+        dx1 = min(self.width, int(round(ox + (x1 - rx) * scale)))
+        dy1 = min(self.height, int(round(oy + (y1 - ry) * scale)))
+        if x1 <= x0 or y1 <= y0 or dx1 <= dx0 or dy1 <= dy0:
+            return None
+
+        self.buffer.fill(0)
+        self.full = False
+        interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+        self.buffer[0, dy0:dy1, dx0:dx1] = cv2.resize(img[y0:y1, x0:x1], (dx1 - dx0, dy1 - dy0),
+                                                      interpolation=interpolation)
+        self.mapping = (x0, y0, (dx1 - dx0) / (x1 - x0), (dy1 - dy0) / (y1 - y0), dx0, dy0, w, h)
+        return self.buffer, scale, (dx0, dy0)
+
+    def unmap_points(self, points):
+        """
+        Map points normalized to model input back to points normalized to frame (in place)
+
+        :param points: ... x 2+ array [x, y, ...]
+        :return: points
+        """
+        rx, ry, sx, sy, ox, oy, w, h = self.mapping
+        points[..., 0] = (rx + (points[..., 0] * self.width - ox) / sx) / w
+        points[..., 1] = (ry + (points[..., 1] * self.height - oy) / sy) / h
+        return points
+
+    def unmap_boxes(self, boxes):
+        """
+        Map boxes normalized to model input back to boxes normalized to frame (in place)
+
+        :param boxes: N x 4 array [x, y, w, h]
+        :return: boxes
+        """
+        rx, ry, sx, sy, ox, oy, w, h = self.mapping
+        self.unmap_points(boxes[:, :2])
+        boxes[:, 2] = boxes[:, 2] * self.width / sx / w
+        boxes[:, 3] = boxes[:, 3] * self.height / sy / h
+        return boxes